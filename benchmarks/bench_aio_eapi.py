@@ -0,0 +1,100 @@
+"""Requests per second of ``AsyncEOSDevice`` against a local eAPI stand-in.
+
+The stand-in runs in a separate process and answers every runCmds request after a
+fixed delay, modelling the device's processing time. The client is pinned to a
+single core; the threaded ``EOSDevice`` is measured on the same core for comparison.
+
+Usage:
+    python benchmarks/bench_aio_eapi.py [--devices 1000] [--requests 5] [--latency 0.02]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent import futures
+
+import aiohttp
+from aiohttp import web
+
+from pyntc.devices import AsyncEOSDevice, EOSDevice
+
+VERSION = {"modelName": "vEOS", "version": "4.20.1F", "serialNumber": "", "bootupTimestamp": 1500000000.0}
+
+
+def serve(port, latency, ready):
+    if hasattr(os, "sched_setaffinity") and os.cpu_count() > 1:
+        os.sched_setaffinity(0, {1})
+
+    async def command_api(request):
+        body = await request.json()
+        await asyncio.sleep(latency)
+        result = [{}] + [VERSION] * (len(body["params"]["cmds"]) - 1)
+        return web.json_response({"jsonrpc": "2.0", "id": body["id"], "result": result})
+
+    app = web.Application()
+    app.router.add_post("/command-api", command_api)
+    ready.set()
+    web.run_app(app, host="127.0.0.1", port=port, print=None, access_log=None, backlog=4096)
+
+
+async def run_async(port, devices, requests_per_device):
+    session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0))
+
+    async def poll(index):
+        device = AsyncEOSDevice("127.0.0.1", "admin", "admin", port=port, session=session)
+        for _ in range(requests_per_device):
+            await device.show("show version")
+
+    start = time.time()
+    await asyncio.gather(*(poll(index) for index in range(devices)))
+    elapsed = time.time() - start
+    await session.close()
+    return devices * requests_per_device / elapsed
+
+
+def run_threads(port, devices, requests_per_device, workers):
+    def poll(index):
+        device = EOSDevice("127.0.0.1", "admin", "admin", port=port)
+        for _ in range(requests_per_device):
+            device.show("show version")
+
+    start = time.time()
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(poll, range(devices)))
+    return devices * requests_per_device / (time.time() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=5, help="requests per device")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds the stand-in takes per request")
+    parser.add_argument("--port", type=int, default=18080)
+    args = parser.parse_args()
+
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(target=serve, args=(args.port, args.latency, ready))
+    server.daemon = True
+    server.start()
+    ready.wait()
+    time.sleep(0.5)
+
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {0})
+
+    print("%-28s %12s" % ("client", "requests/s"))
+    for devices in (10, 100, args.devices):
+        rate = asyncio.run(run_async(args.port, devices, args.requests))
+        print("%-28s %12.1f" % ("async, %d devices" % devices, rate))
+
+    for workers in (10, 100):
+        rate = run_threads(args.port, workers, args.requests, workers)
+        print("%-28s %12.1f" % ("threads, %d devices" % workers, rate))
+
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Lines per second pushed by ``IOSDevice.config_list`` against a local SSH stand-in.
+
+The default mode sends one line at a time and waits for its prompt; bulk mode writes
+blocks of lines and checks their output afterwards.
+
+Usage:
+    python benchmarks/bench_config_list.py [--lines 2000] [--latency 0.0005]
+"""
+
+import argparse
+import time
+
+from ssh_standin import SSHStandIn
+
+from pyntc.devices import IOSDevice
+
+
+def acl(lines):
+    return ["ip access-list extended BENCH"] + [
+        " permit tcp any host 10.0.%d.%d eq %d" % (index // 250, index % 250, 1024 + index) for index in range(lines - 1)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.0005, help="seconds the stand-in takes per command")
+    args = parser.parse_args()
+
+    standin = SSHStandIn(latency=args.latency)
+    device = IOSDevice("127.0.0.1", "admin", "admin", port=standin.port)
+
+    print("%-24s %8s %12s" % ("mode", "lines", "lines/s"))
+    start = time.time()
+    device.config_list(acl(args.lines))
+    print("%-24s %8d %12.1f" % ("per line", args.lines, args.lines / (time.time() - start)))
+
+    for block_size in (10, 50, 200):
+        start = time.time()
+        device.config_list(acl(args.lines), bulk=True, block_size=block_size)
+        rate = args.lines / (time.time() - start)
+        print("%-24s %8d %12.1f" % ("bulk, blocks of %d" % block_size, args.lines, rate))
+
+    device.close()
+    standin.close()
+
+
+if __name__ == "__main__":
+    main()
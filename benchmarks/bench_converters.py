@@ -0,0 +1,108 @@
+"""Rows per second converted with the EOS interfaces key map.
+
+Compares the per-row conversion ``convert_list_by_key`` used to do with the compiled
+converter it is now built on, on the rows of a 48-port switch repeated for many devices,
+and the columnar output with its peak memory against a list of dictionaries.
+
+Usage:
+    python benchmarks/bench_converters.py [--devices 2000] [--ports 48]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from pyntc.data_model.converters import compile_key_map, convert_dict_by_key, convert_list_by_key, recursive_key_lookup
+from pyntc.data_model.key_maps import eos_key_maps
+
+
+def legacy_convert_dict_by_key(original, key_map, fill_in=False, whitelist=[], blacklist=[]):
+    converted = {}
+    for converted_key in key_map:
+        converted[converted_key] = recursive_key_lookup(key_map[converted_key], original)
+
+    if fill_in:
+        original_key_subset = []
+        key_map_values = list(x for x in key_map.values() if not isinstance(x, list))
+        if whitelist:
+            original_key_subset.extend(list(set(whitelist) - set(key_map_values)))
+        else:
+            original_key_subset.extend(list(set(original.keys()) - set(blacklist) - set(key_map_values)))
+
+        for original_key in original_key_subset:
+            if original_key in original:
+                converted[original_key] = original[original_key]
+
+    return converted
+
+
+def interface_rows(ports):
+    return [
+        {
+            "interface": "Ethernet%d" % index,
+            "description": "port %d" % index,
+            "linkStatus": "connected",
+            "vlanInformation": {"vlanId": 1, "interfaceMode": "bridged"},
+            "bandwidth": 10000000000,
+            "duplex": "duplexFull",
+            "interfaceType": "10GBASE-T",
+        }
+        for index in range(1, ports + 1)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=2000)
+    parser.add_argument("--ports", type=int, default=48)
+    args = parser.parse_args()
+
+    rows = interface_rows(args.ports)
+    key_map = eos_key_maps.INTERFACES_KM
+    total = args.devices * args.ports
+
+    def legacy():
+        for _ in range(args.devices):
+            [legacy_convert_dict_by_key(row, key_map, fill_in=True, whitelist=["interface"]) for row in rows]
+
+    def wrapper():
+        for _ in range(args.devices):
+            convert_list_by_key(rows, key_map, fill_in=True, whitelist=["interface"])
+
+    convert = compile_key_map(key_map, fill_in=True, whitelist=["interface"])
+
+    def compiled():
+        for _ in range(args.devices):
+            [convert(row) for row in rows]
+
+    assert convert(rows[0]) == legacy_convert_dict_by_key(rows[0], key_map, fill_in=True, whitelist=["interface"])
+    assert convert(rows[0]) == convert_dict_by_key(rows[0], key_map, fill_in=True, whitelist=["interface"])
+
+    print("%-34s %12s" % ("converter", "rows/s"))
+    for name, func in (
+        ("per row (previous implementation)", legacy),
+        ("convert_list_by_key", wrapper),
+        ("compile_key_map, compiled once", compiled),
+    ):
+        start = time.time()
+        func()
+        print("%-34s %12.0f" % (name, total / (time.time() - start)))
+
+    fleet = rows * args.devices
+    print()
+    print("%-34s %12s %12s" % ("output", "rows/s", "peak MiB"))
+    for name, kwargs in (("list of dicts", {}), ("columnar", {"columnar": True})):
+        start = time.time()
+        convert_list_by_key(fleet, key_map, fill_in=True, whitelist=["interface"], **kwargs)
+        rate = total / (time.time() - start)
+
+        tracemalloc.start()
+        result = convert_list_by_key(fleet, key_map, fill_in=True, whitelist=["interface"], **kwargs)
+        peak = tracemalloc.get_traced_memory()[1] / 2.0**20
+        tracemalloc.stop()
+        del result
+        print("%-34s %12.0f %12.1f" % (name, rate, peak))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Throughput of ``F5Device._upload_image`` against a local HTTP stand-in.
+
+The stand-in accepts Content-Range chunks the way BIG-IP's software-image-uploads
+endpoint does and adds a fixed delay per request to model the round trip to the
+device. The old upload (one ``requests.post`` and one new connection per chunk,
+strictly serial) is measured next to the pooled, windowed upload.
+
+Usage:
+    python benchmarks/bench_f5_upload.py [--size-mb 64] [--latency 0.01] [--chunk-kb 512]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import requests
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+from pyntc.devices.f5_device import F5Device
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class UploadHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def legacy_upload(uri, image_filepath, chunk_size):
+    """The upload loop pyntc shipped before sessions were pooled."""
+    size = os.stat(image_filepath).st_size
+    start = 0
+    with open(image_filepath, "rb") as fileobj:
+        while True:
+            payload = fileobj.read(chunk_size)
+            if not payload:
+                break
+            end = start + len(payload)
+            headers = {
+                "Content-Type": "application/octet-stream",
+                "Content-Range": "{}-{}/{}".format(start, end - 1, size),
+                "Connection": "close",
+            }
+            requests.post(uri, data=payload, headers=headers, auth=("admin", "admin"), verify=False)
+            start = end
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds the stand-in waits per chunk")
+    parser.add_argument("--chunk-kb", type=int, default=512)
+    args = parser.parse_args()
+
+    UploadHandler.latency = args.latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), UploadHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    uri = "http://127.0.0.1:{}/mgmt/cm/autodeploy/software-image-uploads/bench.iso".format(server.server_port)
+
+    image = tempfile.NamedTemporaryFile(suffix=".iso")
+    image.write(os.urandom(args.size_mb * 2 ** 20))
+    image.flush()
+    chunk_size = args.chunk_kb * 1024
+
+    device = F5Device.__new__(F5Device)
+    device.hostname = "127.0.0.1"
+    device.username = device.password = "admin"
+    device._upload_offsets = {}
+    device._upload_uri = lambda filename: uri
+
+    print("%-24s %10s" % ("upload", "MB/s"))
+    start = time.time()
+    legacy_upload(uri, image.name, chunk_size)
+    print("%-24s %10.1f" % ("legacy (serial)", args.size_mb / (time.time() - start)))
+
+    for workers in (1, 2, 4, 8):
+        start = time.time()
+        device._upload_image(image.name, chunk_size=chunk_size, max_workers=workers)
+        print("%-24s %10.1f" % ("pooled, %d in flight" % workers, args.size_mb / (time.time() - start)))
+
+    server.shutdown()
+    image.close()
+
+
+if __name__ == "__main__":
+    main()
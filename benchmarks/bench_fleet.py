@@ -0,0 +1,59 @@
+"""Throughput of ``pyntc.fleet.run`` as the worker count grows.
+
+Devices are simulated by a driver whose connection and command each take a fixed
+amount of time, so throughput should scale linearly with ``workers`` until the
+per-vendor cap is reached.
+
+Usage:
+    python benchmarks/bench_fleet.py [--devices 200] [--latency 0.05] [--cap 16]
+"""
+
+import argparse
+import time
+
+from pyntc import fleet
+from pyntc.devices import supported_devices
+
+
+class SimulatedDevice(object):
+    def __init__(self, host, latency=0.05, **kwargs):
+        self.host = host
+        self.latency = latency
+        time.sleep(latency)
+
+    def show(self, command):
+        time.sleep(self.latency)
+        return self.host
+
+    def close(self):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--cap", type=int, default=16, help="vendor_limits value for the simulated device type")
+    args = parser.parse_args()
+
+    supported_devices["simulated"] = SimulatedDevice
+    inventory = [
+        {"device_type": "simulated", "host": "device%d" % i, "latency": args.latency} for i in range(args.devices)
+    ]
+
+    print("%8s %12s %10s" % ("workers", "devices/s", "speedup"))
+    baseline = None
+    for workers in (1, 2, 4, 8, 16, 32):
+        start = time.time()
+        for result in fleet.run(
+            inventory, lambda device: device.show("show version"), workers=workers, vendor_limits={"simulated": args.cap}
+        ):
+            if result.error is not None:
+                raise result.error
+        rate = args.devices / (time.time() - start)
+        baseline = baseline or rate
+        print("%8d %12.1f %9.1fx" % (workers, rate, rate / baseline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Throughput of hashing a local image with ``hash_file`` against the previous read loop.
+
+The read loop is what the drivers used before: 1 MiB ``read`` calls feeding MD5, and a
+second pass over the file when SHA-256 is needed as well. ``hash_file`` maps the file
+and computes both digests in one pass. The file is read once beforehand so every mode
+hashes from the page cache. The last lines compare hashing after a simulated
+handshake with ``prefetch_file_hash`` started before it.
+
+Usage:
+    python benchmarks/bench_hashing.py [--size-mib 512] [--handshake 0.5]
+"""
+
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+
+from pyntc.hashing import FileHashCache, hash_file
+
+
+def read_loop(path, algorithm, blocksize=2**20):
+    hasher = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        buf = f.read(blocksize)
+        while buf:
+            hasher.update(buf)
+            buf = f.read(blocksize)
+    return hasher.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mib", type=int, default=512)
+    parser.add_argument("--handshake", type=float, default=0.5, help="seconds the simulated handshake takes")
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile(suffix=".bin", delete=False) as f:
+        chunk = os.urandom(2**20)
+        for _ in range(args.size_mib):
+            f.write(chunk)
+    path = f.name
+    size_gb = args.size_mib * 2**20 / 1e9
+
+    try:
+        read_loop(path, "md5")
+
+        modes = (
+            ("read loop, md5", lambda: read_loop(path, "md5")),
+            ("read loop, md5 + sha256 (2 passes)", lambda: (read_loop(path, "md5"), read_loop(path, "sha256"))),
+            ("hash_file, md5", lambda: hash_file(path, algorithms=("md5",))),
+            ("hash_file, md5 + sha256 (1 pass)", lambda: hash_file(path)),
+        )
+        print("file: %d MiB" % args.size_mib)
+        print("%-38s %10s %10s" % ("mode", "seconds", "GB/s"))
+        for name, func in modes:
+            start = time.time()
+            func()
+            seconds = time.time() - start
+            print("%-38s %10.2f %10.2f" % (name, seconds, size_gb / seconds))
+
+        print()
+        print("%-38s %10s" % ("handshake then md5", "seconds"))
+        for name, prefetch in (("sequential", False), ("prefetch_file_hash", True)):
+            cache = FileHashCache(index_file="")
+            start = time.time()
+            if prefetch:
+                cache.prefetch(path)
+            time.sleep(args.handshake)
+            cache.get(path)
+            print("%-38s %10.2f" % (name, time.time() - start))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Wall-clock cost of ``import pyntc`` compared with a bare interpreter start.
+
+Each measurement runs in a fresh interpreter. The script exits non-zero when the
+median import overhead exceeds the budget, so it can gate CI.
+
+Usage:
+    python benchmarks/bench_import.py [--runs 15] [--budget-ms 50]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _median_runtime(code, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.time()
+        subprocess.check_call([sys.executable, "-c", code], cwd=REPO_DIR)
+        timings.append(time.time() - start)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    bare = _median_runtime("pass", args.runs)
+    lazy = _median_runtime("import pyntc", args.runs)
+    eager = _median_runtime("import pyntc; from pyntc.devices import supported_devices; dict(supported_devices)", args.runs)
+
+    overhead_ms = (lazy - bare) * 1000
+    print("interpreter start:           %7.1f ms" % (bare * 1000))
+    print("import pyntc overhead:       %7.1f ms (budget %.1f ms)" % (overhead_ms, args.budget_ms))
+    print("all drivers loaded overhead: %7.1f ms" % ((eager - bare) * 1000))
+
+    if overhead_ms > args.budget_ms:
+        print("FAIL: import pyntc exceeded its budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
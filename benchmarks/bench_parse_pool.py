@@ -0,0 +1,54 @@
+"""Parses per second of ``ParsePool`` as worker processes are added.
+
+Every job is the ``show ip interface brief`` of one device. The serial baseline parses
+them one after the other with ``get_structured_data``; the pool should scale close to
+linearly up to the number of CPUs.
+
+Usage:
+    python benchmarks/bench_parse_pool.py [--devices 2000] [--interfaces 200] [--max-processes N]
+"""
+
+import argparse
+import os
+import time
+
+from pyntc.templates import ParsePool, get_structured_data
+
+TEMPLATE = "cisco_ios_show_ip_int_brief.template"
+HEADER = "Interface                  IP-Address      OK? Method Status                Protocol\n"
+ROW = "GigabitEthernet0/0.%-11d 10.0.%d.1       YES NVRAM  up                    up\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=2000)
+    parser.add_argument("--interfaces", type=int, default=200)
+    parser.add_argument("--max-processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    output = HEADER + "".join(ROW % (index, index % 256) for index in range(args.interfaces))
+    jobs = [(TEMPLATE, output)] * args.devices
+
+    start = time.time()
+    expected = [get_structured_data(template_name, rawtxt) for template_name, rawtxt in jobs]
+    serial = args.devices / (time.time() - start)
+
+    print("CPUs: %d" % (os.cpu_count() or 1))
+    print("%-12s %14s %10s" % ("processes", "parses/s", "speedup"))
+    print("%-12s %14.1f %10.2f" % ("serial", serial, 1.0))
+
+    counts = sorted(set([2**power for power in range(args.max_processes.bit_length())] + [args.max_processes]))
+    for processes in counts:
+        with ParsePool(processes=processes, templates=[TEMPLATE]) as pool:
+            # Let every worker start and compile its templates before timing.
+            list(pool.imap(jobs[: processes * pool.chunksize]))
+            start = time.time()
+            results = list(pool.imap(jobs))
+            rate = args.devices / (time.time() - start)
+
+        assert results == expected
+        print("%-12d %14.1f %10.2f" % (processes, rate, rate / serial))
+
+
+if __name__ == "__main__":
+    main()
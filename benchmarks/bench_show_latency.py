@@ -0,0 +1,45 @@
+"""Latency of a single ``show`` and of ``save`` on ``IOSDevice`` against a local SSH stand-in.
+
+``show`` returns as soon as the prompt reappears; netmiko's ``send_command_timing``,
+which the driver used before, is measured on the same session for comparison.
+
+Usage:
+    python benchmarks/bench_show_latency.py [--iterations 20] [--latency 0.005]
+"""
+
+import argparse
+import time
+
+from ssh_standin import SSHStandIn
+
+from pyntc.devices import IOSDevice
+
+
+def measure(func, iterations):
+    start = time.time()
+    for _ in range(iterations):
+        func()
+    return (time.time() - start) * 1000 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds the stand-in takes per command")
+    args = parser.parse_args()
+
+    standin = SSHStandIn(latency=args.latency)
+    device = IOSDevice("127.0.0.1", "admin", "admin", port=standin.port)
+
+    print("%-34s %10s" % ("operation", "ms/call"))
+    rate = measure(lambda: device.native.send_command_timing("show version"), 2)
+    print("%-34s %10.1f" % ("show, send_command_timing", rate))
+    print("%-34s %10.1f" % ("show, prompt anchored", measure(lambda: device.show("show version"), args.iterations)))
+    print("%-34s %10.1f" % ("save", measure(device.save, args.iterations)))
+
+    device.close()
+    standin.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Commands per second of ``IOSDevice.show_list`` against a local SSH stand-in.
+
+The default mode sends one command at a time and waits for its prompt; pipeline mode
+keeps several commands in flight.
+
+Usage:
+    python benchmarks/bench_show_list.py [--commands 30] [--latency 0.005] [--show-lines 40]
+"""
+
+import argparse
+import time
+
+from ssh_standin import SSHStandIn
+
+from pyntc.devices import IOSDevice
+
+HEALTH_CHECK = [
+    "show version",
+    "show ip interface brief",
+    "show interfaces status",
+    "show ip route summary",
+    "show processes cpu",
+    "show memory statistics",
+    "show environment all",
+    "show inventory",
+    "show logging",
+    "show cdp neighbors",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds the stand-in takes per command")
+    parser.add_argument("--show-lines", type=int, default=40, help="lines printed by every show command")
+    args = parser.parse_args()
+
+    standin = SSHStandIn(latency=args.latency, show_lines=args.show_lines)
+    device = IOSDevice("127.0.0.1", "admin", "admin", port=standin.port)
+    commands = [HEALTH_CHECK[index % len(HEALTH_CHECK)] for index in range(args.commands)]
+
+    print("%-24s %9s %14s" % ("mode", "commands", "commands/s"))
+    start = time.time()
+    device.show_list(commands)
+    print("%-24s %9d %14.1f" % ("one at a time", args.commands, args.commands / (time.time() - start)))
+
+    for block_size in (1, 5, 10, 30):
+        start = time.time()
+        responses = device.show_list(commands, pipeline=True, block_size=block_size)
+        rate = args.commands / (time.time() - start)
+        assert all(response.count("\n") == args.show_lines for response in responses)
+        print("%-24s %9d %14.1f" % ("pipeline, blocks of %d" % block_size, args.commands, rate))
+
+    device.close()
+    standin.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Cost of constructing an ``IOSDevice`` with and without the SSH connection pool.
+
+Each iteration builds a device, checks its prompt and closes it, the way short-lived
+scripts do. Against the local SSH stand-in the difference is the key exchange,
+login and prompt discovery that the pool skips.
+
+Usage:
+    python benchmarks/bench_ssh_pool.py [--iterations 20]
+"""
+
+import argparse
+import time
+
+from ssh_standin import SSHStandIn
+
+from pyntc.devices import IOSDevice
+from pyntc.devices.ssh_utils import ssh_pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    standin = SSHStandIn()
+
+    print("%-10s %14s" % ("pooled", "ms/iteration"))
+    for pooled in (False, True):
+        start = time.time()
+        for _ in range(args.iterations):
+            device = IOSDevice("127.0.0.1", "admin", "admin", port=standin.port, pooled=pooled)
+            device.native.find_prompt()
+            device.close()
+        print("%-10s %14.1f" % (pooled, (time.time() - start) * 1000 / args.iterations))
+
+    print("pool hits: %d, misses: %d" % (ssh_pool.hits, ssh_pool.misses))
+    ssh_pool.clear()
+    standin.close()
+
+
+if __name__ == "__main__":
+    main()
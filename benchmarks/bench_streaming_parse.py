@@ -0,0 +1,76 @@
+"""Peak RSS of parsing a very large ``show ip interface brief`` with and without streaming.
+
+``get_structured_data`` reads the whole output and returns every row at once;
+``iter_structured_data`` reads the output line by line and yields rows as they complete.
+Each mode runs in a fresh process, whose peak RSS is reported above that of a process
+that only imports pyntc.
+
+Usage:
+    python benchmarks/bench_streaming_parse.py [--interfaces 200000]
+"""
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+TEMPLATE = "cisco_ios_show_ip_int_brief.template"
+HEADER = "Interface                  IP-Address      OK? Method Status                Protocol\n"
+ROW = "GigabitEthernet0/0.%-11d 10.%d.%d.1       YES NVRAM  up                    up\n"
+
+
+def peak_rss_mib():
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2.0**20
+
+
+def run(mode, filename):
+    from pyntc.templates import get_structured_data, iter_structured_data
+
+    start = time.time()
+    if mode == "list":
+        with open(filename) as f:
+            rows = len(get_structured_data(TEMPLATE, f.read()))
+    elif mode == "stream":
+        with open(filename) as f:
+            rows = sum(1 for _ in iter_structured_data(TEMPLATE, f))
+    else:
+        rows = 0
+    print("%d %f %f" % (rows, time.time() - start, peak_rss_mib()))
+
+
+def measure(mode, filename):
+    output = subprocess.check_output([sys.executable, __file__, "--run", mode, filename], env=dict(os.environ))
+    rows, seconds, peak = output.split()
+    return int(rows), float(seconds), float(peak)
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--run":
+        return run(sys.argv[2], sys.argv[3])
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--interfaces", type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        f.write(HEADER)
+        for index in range(args.interfaces):
+            f.write(ROW % (index, index // 256 % 256, index % 256))
+    try:
+        print("output: %.1f MiB" % (os.path.getsize(f.name) / 2.0**20))
+        baseline = measure("import", f.name)[2]
+        print("%-24s %10s %10s %16s" % ("parser", "rows", "seconds", "peak RSS MiB"))
+        for name, mode in (("get_structured_data", "list"), ("iter_structured_data", "stream")):
+            rows, seconds, peak = measure(mode, f.name)
+            print("%-24s %10d %10.2f %16.1f" % (name, rows, seconds, max(peak - baseline, 0)))
+    finally:
+        os.unlink(f.name)
+
+
+if __name__ == "__main__":
+    main()
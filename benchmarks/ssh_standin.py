@@ -0,0 +1,148 @@
+"""A local SSH server that behaves enough like a Cisco IOS CLI for netmiko.
+
+Used by the benchmarks of the SSH drivers. Commands are processed one line at a time,
+each followed by a prompt; lines starting with ``bogus`` are rejected the way IOS
+rejects invalid input, and ``show`` commands print ``show_lines`` lines of output.
+``copy running-config startup-config`` asks for the destination file name first.
+"""
+
+import socket
+import threading
+import time
+
+import paramiko
+
+INVALID_INPUT = "                  ^\r\n% Invalid input detected at '^' marker.\r\n\r\n"
+
+
+class _Server(paramiko.ServerInterface):
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+    def check_channel_pty_request(self, *args):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        return True
+
+
+class FakeCLI(object):
+    """The command interpreter behind one SSH session."""
+
+    def __init__(self, channel, hostname, latency, show_lines):
+        self.channel = channel
+        self.hostname = hostname
+        self.latency = latency
+        self.show_lines = show_lines
+        self.modes = []
+        # Output sent once the pending question is answered, instead of the prompt.
+        self.question = None
+
+    def prompt(self):
+        mode = "(%s)" % self.modes[-1] if self.modes else ""
+        return "%s%s#" % (self.hostname, mode)
+
+    def execute(self, line):
+        words = line.split()
+        if not words:
+            return ""
+        if self.latency:
+            time.sleep(self.latency)
+
+        if line == "copy running-config startup-config":
+            self.question = "Building configuration...\r\n[OK]\r\n"
+            return "Destination filename [startup-config]? "
+        if words[0] == "bogus":
+            return INVALID_INPUT
+        if line == "configure terminal":
+            self.modes = ["config"]
+            return "Enter configuration commands, one per line.  End with CNTL/Z.\r\n"
+        if line == "end":
+            self.modes = []
+        elif line == "exit":
+            self.modes.pop()
+        elif self.modes and words[0] in ("interface", "router", "line"):
+            self.modes = ["config", "config-" + words[0][:2]]
+        elif not self.modes and words[0] == "show":
+            return "".join("%s line %d\r\n" % (line, index) for index in range(self.show_lines))
+
+        return ""
+
+    def run(self):
+        self.channel.sendall(self.prompt())
+        pending = ""
+        while True:
+            data = self.channel.recv(65536)
+            if not data:
+                return
+            pending += data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+            while "\n" in pending:
+                line, pending = pending.split("\n", 1)
+                if line.strip() in ("exit", "logout") and not self.modes:
+                    return
+                if self.question is not None:
+                    output, self.question = self.question, None
+                    self.channel.sendall(line + "\r\n" + output + self.prompt())
+                    continue
+                output = self.execute(line.strip())
+                if self.question is not None:
+                    self.channel.sendall(line + "\r\n" + output)
+                else:
+                    self.channel.sendall(line + "\r\n" + output + self.prompt())
+
+
+class SSHStandIn(object):
+    """Serve ``FakeCLI`` sessions on a local port from a background thread.
+
+    Args:
+        hostname (str): The hostname shown in the prompt.
+        latency (float): Seconds each non-empty command takes.
+        show_lines (int): Lines printed by every ``show`` command.
+    """
+
+    def __init__(self, hostname="bench", latency=0.0, show_lines=20):
+        self.hostname = hostname
+        self.latency = latency
+        self.show_lines = show_lines
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.sock = socket.socket()
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(100)
+        self.port = self.sock.getsockname()[1]
+        thread = threading.Thread(target=self._accept)
+        thread.daemon = True
+        thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self.sock.accept()
+            except (socket.error, OSError):
+                return
+            thread = threading.Thread(target=self._serve, args=(client,))
+            thread.daemon = True
+            thread.start()
+
+    def _serve(self, client):
+        transport = paramiko.Transport(client)
+        transport.add_server_key(self.host_key)
+        transport.start_server(server=_Server())
+        channel = transport.accept(20)
+        if channel is None:
+            return
+        try:
+            FakeCLI(channel, self.hostname, self.latency, self.show_lines).run()
+        except (socket.error, OSError, EOFError):
+            pass
+        finally:
+            transport.close()
+
+    def close(self):
+        self.sock.close()
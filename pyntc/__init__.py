@@ -5,11 +5,7 @@ import os
 
 from .devices import supported_devices
 from .errors import UnsupportedDeviceError, DeviceNameNotFoundError, ConfFileNotFoundError
-
-try:
-    from configparser import ConfigParser as SafeConfigParser
-except ImportError:
-    from ConfigParser import SafeConfigParser
+from .inventory import Inventory, get_inventory
 
 __version__ = "0.0.9"
 
@@ -58,36 +54,22 @@ def ntc_device_by_name(name, filename=None):
             NTC configuration file.
         ConfFileNotFoundError: if no NTC configuration can be found.
     """
-    config, filename = _get_config_from_file(filename=filename)
-    sections = config.sections()
-
-    if not sections:
-        raise ConfFileNotFoundError(filename)
-
-    for section in sections:
-        if ":" in section:
-            device_type_and_conn_name = section.split(":")
-            device_type = device_type_and_conn_name[0]
-            conn_name = device_type_and_conn_name[1]
+    device_type, device_kwargs = _get_device_params_by_name(name, filename=filename)
+    return ntc_device(device_type, **device_kwargs)
 
-            if name == conn_name:
-                device_kwargs = dict(config.items(section))
-                if "host" not in device_kwargs:
-                    device_kwargs["host"] = name
 
-                return ntc_device(device_type, **device_kwargs)
-
-    raise DeviceNameNotFoundError(name, filename)
+def _get_device_params_by_name(name, filename=None):
+    """Return the ``device_type`` and initializer kwargs for ``name`` as found
+    in an NTC configuration file, without instantiating the device.
+    """
+    return get_inventory(_get_conf_filename(filename)).get(name)
 
 
-def _get_config_from_file(filename=None):
+def _get_conf_filename(filename=None):
     if filename is None:
         if LIB_PATH_ENV_VAR in os.environ:
             filename = os.path.expanduser(os.environ[LIB_PATH_ENV_VAR])
         else:
             filename = os.path.expanduser(LIB_PATH_DEFAULT)
 
-    config = SafeConfigParser()
-    config.read(filename)
-
-    return config, filename
+    return filename
@@ -5,6 +5,164 @@ received from an API to a desired format.
 import collections
 import sys
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _key_map_plan(key_map, fill_in, whitelist, blacklist):
+    """Work out the lookups of a key map once.
+
+    Returns:
+        tuple: ``(accessors, fill_keys, excluded_keys)``; ``accessors`` are ``(converted key,
+        original key, path of keys for a nested lookup or None)``, ``fill_keys`` the keys
+        filled in from a whitelist and ``excluded_keys`` the keys never filled in otherwise.
+    """
+    accessors = tuple(
+        (converted_key, original_key, tuple(original_key) if isinstance(original_key, list) else None)
+        for converted_key, original_key in key_map.items()
+    )
+    # ignore complex values in key map
+    key_map_values = frozenset(original_key for _, original_key, path in accessors if path is None)
+
+    fill_keys = excluded_keys = None
+    if fill_in:
+        if whitelist:
+            fill_keys = tuple(set(whitelist) - key_map_values)
+        else:
+            excluded_keys = frozenset(blacklist) | key_map_values
+
+    return accessors, fill_keys, excluded_keys
+
+
+def compile_key_map(key_map, fill_in=False, whitelist=[], blacklist=[]):
+    """Precompute a key map and return a function converting one dictionary with it.
+
+    The returned function gives the same result as ``convert_dict_by_key`` with the
+    same arguments, but the key paths and the fill-in key sets are worked out once
+    here instead of on every call. Later changes to ``key_map`` are not seen.
+
+    Args:
+        key_map (dict): Key map to use to convert dictionaries.
+        fill_in (bool): Whether the converted dictionaries should contain keys and
+            values from the original dictionary if not specified in the key map.
+        whitelist: If fill_in is True, and whitelist isn't empty, only fill in these keys.
+        blacklist: If fill_in is True, and whitelist is empty, fill in all keys but these.
+
+    Returns:
+        A function taking the original dictionary and returning the converted one.
+    """
+    accessors, fill_keys, excluded_keys = _key_map_plan(key_map, fill_in, whitelist, blacklist)
+
+    def convert(original):
+        get = original.get
+        converted = {}
+        for converted_key, original_key, path in accessors:
+            if path is None:
+                converted[converted_key] = get(original_key)
+            else:
+                obj = original
+                for key in path:
+                    if obj is not None:
+                        obj = obj.get(key)
+                converted[converted_key] = obj
+
+        if fill_keys is not None:
+            for original_key in fill_keys:
+                if original_key in original:
+                    converted[original_key] = original[original_key]
+        elif excluded_keys is not None:
+            for original_key in original:
+                if original_key not in excluded_keys:
+                    converted[original_key] = original[original_key]
+
+        return converted
+
+    return convert
+
+
+def convert_columns_by_key(original_list, key_map, fill_in=False, whitelist=[], blacklist=[], numeric=()):
+    """Convert a list of dictionaries with a key map into a dictionary of columns.
+
+    The result holds the same values as ``convert_list_by_key``, as one list per key
+    instead of one dictionary per row; no dictionary is built per row. A column filled
+    in from the original dictionaries holds None for the rows missing that key.
+
+    Args:
+        original_list (list): Dictionaries to be converted.
+        key_map, fill_in, whitelist, blacklist: As for ``convert_dict_by_key``.
+        numeric (list): Converted keys whose columns are returned as NumPy arrays, see
+            ``numeric_column``. Requires NumPy.
+
+    Returns:
+        dict: Converted key to its column of values, in the order of ``original_list``.
+    """
+    rows = list(original_list)
+    accessors, fill_keys, excluded_keys = _key_map_plan(key_map, fill_in, whitelist, blacklist)
+
+    columns = {}
+    for converted_key, original_key, path in accessors:
+        if path is None:
+            columns[converted_key] = [row.get(original_key) for row in rows]
+        else:
+            column = []
+            for obj in rows:
+                for key in path:
+                    if obj is not None:
+                        obj = obj.get(key)
+                column.append(obj)
+            columns[converted_key] = column
+
+    if excluded_keys is not None:
+        fill_keys = []
+        seen = set(excluded_keys)
+        for row in rows:
+            for original_key in row:
+                if original_key not in seen:
+                    seen.add(original_key)
+                    fill_keys.append(original_key)
+
+    for original_key in fill_keys or ():
+        column = columns.get(original_key)
+        if column is None:
+            if any(original_key in row for row in rows):
+                columns[original_key] = [row.get(original_key) for row in rows]
+        else:
+            # As in convert_dict_by_key, a value filled in replaces the key map's.
+            for index, row in enumerate(rows):
+                if original_key in row:
+                    column[index] = row[original_key]
+
+    for key in numeric:
+        columns[key] = numeric_column(columns[key])
+
+    return columns
+
+
+def numeric_column(values):
+    """Return a column of numbers, or of strings holding numbers, as a NumPy array.
+
+    Integers become an ``int64`` array; columns with other numbers or missing values
+    (None or an empty string) become a ``float64`` array with NaN for the missing values.
+
+    Raises:
+        ImportError: if NumPy is not installed.
+        ValueError: if a value is not a number.
+    """
+    if numpy is None:
+        raise ImportError("numeric columns require NumPy (pip install pyntc[numpy])")
+
+    values = [numpy.nan if value is None or value == "" else value for value in values]
+    array = numpy.array(values, dtype=float)
+    if len(array) and numpy.isfinite(array).all() and (array == numpy.floor(array)).all():
+        try:
+            return numpy.array(values, dtype=numpy.int64)
+        except (TypeError, ValueError, OverflowError):
+            pass
+
+    return array
+
 
 def convert_dict_by_key(original, key_map, fill_in=False, whitelist=[], blacklist=[]):
     """Use a key map to convert a dictionary to desired keys.
@@ -22,40 +180,21 @@ def convert_dict_by_key(original, key_map, fill_in=False, whitelist=[], blacklis
     Returns:
         A converted dictionary through the key map.
     """
-    converted = {}
-    for converted_key in key_map:
-        original_key = key_map[converted_key]
-
-        converted[converted_key] = recursive_key_lookup(original_key, original)
-
-    if fill_in:
-        original_key_subset = []
+    return compile_key_map(key_map, fill_in=fill_in, whitelist=whitelist, blacklist=blacklist)(original)
 
-        # ignore complex values in key map
-        key_map_values = list(x for x in key_map.values() if not isinstance(x, list))
 
-        if whitelist:
-            original_key_subset.extend(list(set(whitelist) - set(key_map_values)))
-        else:
-            original_key_subset.extend(list(set(original.keys()) - set(blacklist) - set(key_map_values)))
-
-        for original_key in original_key_subset:
-            if original_key in original:
-                converted[original_key] = original[original_key]
-
-    return converted
-
-
-def convert_list_by_key(original_list, key_map, fill_in=False, whitelist=[], blacklist=[]):
+def convert_list_by_key(original_list, key_map, fill_in=False, whitelist=[], blacklist=[], columnar=False, numeric=()):
     """Apply a dictionary conversion for all dictionaries in original_list.
+
+    With ``columnar``, return a dictionary of columns instead, see ``convert_columns_by_key``.
     """
-    converted_list = []
-    for original in list(original_list):
-        converted_list.append(
-            convert_dict_by_key(original, key_map, fill_in=fill_in, whitelist=whitelist, blacklist=blacklist)
+    if columnar:
+        return convert_columns_by_key(
+            original_list, key_map, fill_in=fill_in, whitelist=whitelist, blacklist=blacklist, numeric=numeric
         )
 
-    return converted_list
+    convert = compile_key_map(key_map, fill_in=fill_in, whitelist=whitelist, blacklist=blacklist)
+    return [convert(original) for original in list(original_list)]
 
 
 def recursive_key_lookup(keys, obj):
@@ -2,6 +2,8 @@
 
 BASIC_FACTS_KM = {"model": "modelName", "os_version": "internalVersion", "serial_number": "serialNumber"}
 
+HOSTNAME_KM = {"hostname": "hostname", "fqdn": "fqdn"}
+
 
 INTERFACES_KM = {
     "speed": "bandwidth",
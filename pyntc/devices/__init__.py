@@ -1,21 +1,117 @@
 """Supported devices are stored here. Every supported device needs a
 device_type stored as a string, and a class subclassed from BaseDevice.
+
+Driver modules pull in their vendor SDKs, so they are only imported the first
+time their device_type (or class name) is requested. The asyncio drivers
+(``AsyncEOSDevice``, ``AsyncNXOSDevice``) are only available by class name.
 """
 
-from .eos_device import EOSDevice
-from .nxos_device import NXOSDevice
-from .ios_device import IOSDevice
-from .jnpr_device import JunosDevice
-from .asa_device import ASADevice
-from .f5_device import F5Device
+import importlib
+import sys
+import types
+
 from .base_device import BaseDevice
 
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
 
-supported_devices = {
-    "cisco_asa_ssh": ASADevice,
-    "arista_eos_eapi": EOSDevice,
-    "f5_tmos_icontrol": F5Device,
-    "cisco_ios_ssh": IOSDevice,
-    "juniper_junos_netconf": JunosDevice,
-    "cisco_nxos_nxapi": NXOSDevice,
+
+# Class name to the module it is defined in, relative to this package.
+_DEVICE_CLASS_MODULES = {
+    "ASADevice": ".asa_device",
+    "AsyncEOSDevice": ".aio_eos_device",
+    "AsyncNXOSDevice": ".aio_nxos_device",
+    "EOSDevice": ".eos_device",
+    "F5Device": ".f5_device",
+    "IOSDevice": ".ios_device",
+    "JunosDevice": ".jnpr_device",
+    "NXOSDevice": ".nxos_device",
 }
+
+
+def _import_device_class(class_name):
+    module = importlib.import_module(_DEVICE_CLASS_MODULES[class_name], __name__)
+    return getattr(module, class_name)
+
+
+class DeviceRegistry(MutableMapping):
+    """Mapping of device_type to device class that imports driver modules on first access.
+
+    Values may be registered either as a class or as the name of a class listed in
+    ``_DEVICE_CLASS_MODULES``. Membership tests, iteration and ``len`` never import
+    a driver.
+    """
+
+    def __init__(self, entries=None):
+        self._entries = dict(entries or {})
+
+    def __getitem__(self, device_type):
+        entry = self._entries[device_type]
+        if not isinstance(entry, str):
+            return entry
+
+        device_class = _import_device_class(entry)
+        self._entries[device_type] = device_class
+        return device_class
+
+    def __setitem__(self, device_type, device_class):
+        self._entries[device_type] = device_class
+
+    def __delitem__(self, device_type):
+        del self._entries[device_type]
+
+    def __contains__(self, device_type):
+        return device_type in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self._entries)
+
+    def copy(self):
+        return self.__class__(self._entries)
+
+    def update(self, *args, **kwargs):
+        if len(args) == 1 and isinstance(args[0], DeviceRegistry):
+            self._entries.update(args[0]._entries)
+            args = ()
+        super(DeviceRegistry, self).update(*args, **kwargs)
+
+
+supported_devices = DeviceRegistry(
+    {
+        "cisco_asa_ssh": "ASADevice",
+        "arista_eos_eapi": "EOSDevice",
+        "f5_tmos_icontrol": "F5Device",
+        "cisco_ios_ssh": "IOSDevice",
+        "juniper_junos_netconf": "JunosDevice",
+        "cisco_nxos_nxapi": "NXOSDevice",
+    }
+)
+
+
+class _LazyDevicesModule(types.ModuleType):
+    """Module type that imports driver classes on first attribute access.
+
+    Module level ``__getattr__`` (PEP 562) needs Python 3.7, so this package replaces
+    itself in ``sys.modules`` with an instance of this type instead.
+    """
+
+    def __getattr__(self, name):
+        if name in _DEVICE_CLASS_MODULES:
+            return _import_device_class(name)
+
+        raise AttributeError("module %r has no attribute %r" % (self.__name__, name))
+
+
+_lazy_module = _LazyDevicesModule(__name__, __doc__)
+_lazy_module.__dict__.update(globals())
+# Python 2 clears a module's globals when it is garbage collected, so keep the original alive.
+_lazy_module._original_module = sys.modules[__name__]
+sys.modules[__name__] = _lazy_module
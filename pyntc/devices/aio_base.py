@@ -0,0 +1,128 @@
+"""Shared pieces of the asyncio drivers for devices with an HTTP JSON-RPC API.
+
+The drivers need the optional ``aiohttp`` dependency (``pip install pyntc[async]``).
+All devices on an event loop share one pooled ``aiohttp.ClientSession`` unless a
+session is passed to them explicitly.
+"""
+
+import asyncio
+import base64
+import weakref
+
+import aiohttp
+
+from pyntc.errors import CommandError, CommandListError
+
+# Connection limits of the shared session: overall, and per device.
+POOL_LIMIT = 100
+POOL_LIMIT_PER_HOST = 4
+
+_sessions = weakref.WeakKeyDictionary()
+
+
+def get_session():
+    """Return the shared ``aiohttp.ClientSession`` of the running event loop, creating it if needed."""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=POOL_LIMIT, limit_per_host=POOL_LIMIT_PER_HOST)
+        session = aiohttp.ClientSession(connector=connector)
+        _sessions[loop] = session
+
+    return session
+
+
+async def close_session():
+    """Close the shared session of the running event loop."""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+class AsyncBaseDevice(object):
+    """Base class of the asyncio drivers.
+
+    Subclasses implement ``show_list``, ``config_list`` and ``_get_facts`` as coroutines;
+    ``show``, ``config``, ``facts`` and ``refresh_facts`` are built on them with the same
+    semantics as the synchronous drivers.
+
+    Args:
+        host (str): The address of the device.
+        username (str): The username to authenticate with.
+        password (str): The password to authenticate with.
+        url (str): The JSON-RPC endpoint of the device.
+        timeout (int): Seconds to wait for a response.
+        verify (bool): Whether to verify the device's TLS certificate.
+        session (aiohttp.ClientSession): The session to use instead of the shared one.
+    """
+
+    vendor = None
+    device_type = None
+
+    def __init__(self, host, username, password, url, timeout=60, verify=False, session=None):
+        self.host = host
+        self.username = username
+        self.password = password
+        self.url = url
+        self.timeout = timeout
+        self.verify = verify
+        self._session = session
+        self._facts = None
+        credentials = "{0}:{1}".format(username, password).encode("utf-8")
+        self._authorization = "Basic " + base64.b64encode(credentials).decode("ascii")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @property
+    def session(self):
+        return self._session if self._session is not None else get_session()
+
+    async def _post(self, payload, headers):
+        headers = dict(headers, Authorization=self._authorization)
+        async with self.session.post(
+            self.url,
+            json=payload,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            ssl=None if self.verify else False,
+        ) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def _get_facts(self):
+        raise NotImplementedError
+
+    async def close(self):
+        """Release the device. The shared session stays open for other devices."""
+        pass
+
+    async def config(self, command):
+        try:
+            await self.config_list([command])
+        except CommandListError as e:
+            raise CommandError(e.command, e.cli_error_msg)
+
+    async def facts(self):
+        """Return the facts of the device, fetched on the first call and cached until ``refresh_facts``."""
+        if self._facts is None:
+            facts = await self._get_facts()
+            facts["vendor"] = self.vendor
+            self._facts = facts
+
+        return self._facts
+
+    async def refresh_facts(self):
+        self._facts = None
+        return await self.facts()
+
+    async def show(self, command, raw_text=False):
+        try:
+            response_list = await self.show_list([command], raw_text=raw_text)
+        except CommandListError as e:
+            raise CommandError(e.command, e.cli_error_msg)
+
+        return response_list[0] if response_list else {}
@@ -0,0 +1,70 @@
+"""Module for using an Arista EOS device over the eAPI with asyncio.
+"""
+
+import itertools
+
+from pyntc.data_model.converters import strip_unicode
+from pyntc.errors import CommandListError
+from .aio_base import AsyncBaseDevice
+from .eos_device import EAPI_PORTS, FACTS_COMMANDS, EOSDevice
+
+_request_ids = itertools.count(1)
+
+
+class AsyncEOSDevice(AsyncBaseDevice):
+    """Awaitable counterpart of ``EOSDevice``.
+
+    Example:
+        async with AsyncEOSDevice("spine1", "admin", "secret") as device:
+            version = await device.show("show version")
+    """
+
+    vendor = "arista"
+    device_type = "arista_eos_eapi"
+
+    def __init__(self, host, username, password, transport="http", port=None, timeout=60, session=None, **kwargs):
+        port = port or EAPI_PORTS[transport]
+        scheme = "http" if transport == "http" else "https"
+        url = "{0}://{1}:{2}/command-api".format(scheme, host, port)
+        super(AsyncEOSDevice, self).__init__(host, username, password, url, timeout=timeout, session=session)
+        self.transport = transport
+
+    async def _run_commands(self, commands, encoding, prefix=()):
+        """Send ``commands`` in one runCmds request after ``enable`` and ``prefix``.
+
+        Returns:
+            list: The result of each of ``commands``.
+
+        Raises:
+            CommandListError: For the command that failed.
+        """
+        prefix = ["enable"] + list(prefix)
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "runCmds",
+            "params": {"version": 1, "cmds": prefix + list(commands), "format": encoding},
+            "id": next(_request_ids),
+        }
+        response = await self._post(payload, {"Content-Type": "application/json-rpc"})
+
+        error = response.get("error")
+        if error is not None:
+            # The error data holds the output of every command up to and including the failed one.
+            failed = min(max(len(error.get("data", [])) - 1 - len(prefix), 0), len(commands) - 1)
+            message = "Error [{0}]: {1}".format(error.get("code"), error.get("message"))
+            raise CommandListError(list(commands), commands[failed], message)
+
+        return response["result"][len(prefix) :]
+
+    async def _get_facts(self):
+        return EOSDevice._parse_facts(await self.show_list(FACTS_COMMANDS))
+
+    async def config_list(self, commands):
+        await self._run_commands(commands, "json", prefix=["configure terminal"])
+
+    async def show_list(self, commands, raw_text=False):
+        if raw_text:
+            response = await self._run_commands(commands, "text")
+            return strip_unicode(list(x["output"] for x in response))
+
+        return strip_unicode(await self._run_commands(commands, "json"))
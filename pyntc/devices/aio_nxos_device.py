@@ -0,0 +1,104 @@
+"""Module for using an NXOS device over NX-API with asyncio.
+"""
+
+from pynxos.errors import CLIError
+from pynxos.lib.data_model import key_maps
+from pynxos.lib.data_model.converters import converted_list_from_table
+
+from pyntc.data_model.converters import convert_dict_by_key, strip_unicode
+from pyntc.errors import CommandListError
+from .aio_base import AsyncBaseDevice
+from .nxos_device import NXAPI_PORTS
+
+# Every command needed by the facts, sent to the device in a single NX-API request.
+FACTS_COMMANDS = ["show version", "show interface status", "show vlan"]
+
+
+class AsyncNXOSDevice(AsyncBaseDevice):
+    """Awaitable counterpart of ``NXOSDevice``.
+
+    Example:
+        async with AsyncNXOSDevice("n9k1", "admin", "secret") as device:
+            version = await device.show("show version")
+    """
+
+    vendor = "cisco"
+    device_type = "cisco_nxos_nxapi"
+
+    def __init__(
+        self, host, username, password, transport="http", port=None, timeout=30, verify=True, session=None, **kwargs
+    ):
+        port = port or NXAPI_PORTS[transport]
+        url = "{0}://{1}:{2}/ins".format(transport, host, port)
+        super(AsyncNXOSDevice, self).__init__(
+            host, username, password, url, timeout=timeout, verify=verify, session=session
+        )
+        self.transport = transport
+        self.port = port
+
+    async def _cli_command(self, commands, method="cli", optional=()):
+        """Send ``commands`` in one JSON-RPC batch and return the result of each.
+
+        Raises:
+            CommandListError: For the first command that failed, unless it is listed in
+                ``optional``, in which case its result is None.
+        """
+        payload = [
+            {"jsonrpc": "2.0", "method": method, "params": {"cmd": command, "version": 1}, "id": index}
+            for index, command in enumerate(commands, 1)
+        ]
+        response = await self._post(payload, {"Content-Type": "application/json-rpc"})
+        if isinstance(response, dict):
+            response = [response]
+
+        results = []
+        for command, command_response in zip(commands, response):
+            error = command_response.get("error")
+            if error and command not in optional:
+                message = error["data"]["msg"] if "data" in error else "Invalid command."
+                raise CommandListError(list(commands), command, str(CLIError(command, message)))
+            results.append(None if error else command_response.get("result"))
+
+        return strip_unicode(results)
+
+    async def _get_facts(self):
+        # Like NXOSDevice, report no interfaces rather than fail when the device rejects the command.
+        show_version, interface_status, show_vlan = await self._cli_command(
+            FACTS_COMMANDS, optional=["show interface status"]
+        )
+        version = show_version["body"]
+        uptime = convert_dict_by_key(version, key_maps.UPTIME_KEY_MAP)
+        up_days, up_hours, up_mins, up_secs = (
+            uptime["up_days"],
+            uptime["up_hours"],
+            uptime["up_mins"],
+            uptime["up_secs"],
+        )
+
+        facts = convert_dict_by_key(version, key_maps.BASIC_FACTS_KEY_MAP)
+        facts["uptime"] = ((up_days * 24 + up_hours) * 60 + up_mins) * 60 + up_secs
+        facts["uptime_string"] = "%02d:%02d:%02d:%02d" % (up_days, up_hours, up_mins, up_secs)
+        facts["fqdn"] = "N/A"
+
+        interfaces = []
+        if interface_status:
+            interfaces = converted_list_from_table(
+                interface_status["body"], "interface", key_maps.INTERFACE_KEY_MAP, fill_in=True
+            )
+        facts["interfaces"] = list(x["interface"] for x in interfaces)
+
+        vlans = converted_list_from_table(show_vlan["body"], "vlanbrief", key_maps.VLAN_KEY_MAP)
+        facts["vlans"] = list(str(x["id"]) for x in vlans)
+
+        return facts
+
+    async def config_list(self, commands):
+        await self._cli_command(commands)
+
+    async def show_list(self, commands, raw_text=False):
+        if raw_text:
+            response = await self._cli_command(commands, method="cli_ascii")
+            return list(x["msg"] for x in response if x)
+
+        response = await self._cli_command(commands)
+        return list(x["body"] for x in response if x)
@@ -2,9 +2,44 @@
 """
 
 import abc
+import collections
+import contextlib
+import copy
+import errno
+import functools
+import heapq
 import importlib
-
-from pyntc.errors import NTCError, FeatureNotFoundError
+import random
+import re
+import select
+import socket
+import threading
+import time
+from concurrent import futures
+
+from pyntc.errors import NTCError, FeatureNotFoundError, RebootTimeoutError
+
+try:
+    from collections.abc import Mapping, MutableMapping
+except ImportError:
+    from collections import Mapping, MutableMapping
+
+# connect_ex results meaning a non-blocking connect is still in progress.
+_CONNECT_IN_PROGRESS = set(
+    code
+    for code in (
+        errno.EINPROGRESS,
+        errno.EALREADY,
+        errno.EWOULDBLOCK,
+        getattr(errno, "WSAEWOULDBLOCK", None),
+    )
+    if code is not None
+)
+# Number of probe sockets open at the same time, well below the usual open files limit.
+_PROBE_BATCH_SIZE = 512
+# Commands whose responses may be cached: read-only shows and directory listings,
+# unless their output is redirected to a file on the device.
+_CACHEABLE_COMMAND = re.compile(r"^\s*(show|dir)\b(?!.*\|\s*(redirect|tee|append)\b)")
 
 
 def fix_docs(cls):
@@ -19,9 +54,437 @@ def fix_docs(cls):
     return cls
 
 
+def probe_ports(addresses, timeout=3):
+    """Check which of many TCP endpoints accept a connection, probing them all at once.
+
+    Args:
+        addresses (list): ``(host, port)`` tuples. A port of None is not probed and
+            counts as reachable.
+        timeout (float): Seconds to wait for connections to complete.
+
+    Returns:
+        list: A bool for each address, in the same order.
+    """
+    results = [port is None for _, port in addresses]
+    for batch_start in range(0, len(addresses), _PROBE_BATCH_SIZE):
+        pending = {}
+        for index in range(batch_start, min(batch_start + _PROBE_BATCH_SIZE, len(addresses))):
+            host, port = addresses[index]
+            if port is None:
+                continue
+
+            sock = None
+            try:
+                family, socktype, proto, _, sockaddr = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0]
+                sock = socket.socket(family, socktype, proto)
+                sock.setblocking(0)
+                result = sock.connect_ex(sockaddr)
+            except (socket.error, OSError):
+                if sock is not None:
+                    sock.close()
+                continue
+
+            if result in _CONNECT_IN_PROGRESS:
+                pending[sock] = index
+            else:
+                results[index] = result == 0
+                sock.close()
+
+        for sock in _wait_for_connects(list(pending), timeout):
+            index = pending.pop(sock)
+            results[index] = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+            sock.close()
+
+        for sock in pending:
+            sock.close()
+
+    return results
+
+
+def _wait_for_connects(sockets, timeout):
+    """Yield each socket whose non-blocking connect completes, or fails, within ``timeout`` seconds.
+
+    ``select.poll`` is used where available: ``select.select`` cannot watch file
+    descriptors numbered FD_SETSIZE (usually 1024) or higher, which a process talking
+    to many devices easily reaches.
+    """
+    end_time = time.time() + timeout
+    if hasattr(select, "poll"):
+        poller = select.poll()
+        by_fd = {}
+        for sock in sockets:
+            by_fd[sock.fileno()] = sock
+            poller.register(sock, select.POLLOUT | select.POLLERR | select.POLLHUP)
+
+        while by_fd:
+            remaining = end_time - time.time()
+            if remaining <= 0:
+                return
+
+            for fd, _ in poller.poll(remaining * 1000):
+                poller.unregister(fd)
+                yield by_fd.pop(fd)
+    else:
+        sockets = set(sockets)
+        while sockets:
+            remaining = end_time - time.time()
+            if remaining <= 0:
+                return
+
+            _, writable, failed = select.select([], list(sockets), list(sockets), remaining)
+            for sock in set(writable) | set(failed):
+                sockets.discard(sock)
+                yield sock
+
+
+def wait_for_reboot(devices, timeout=3600, initial_delay=1, max_delay=60, probe_timeout=3):
+    """Wait on a single thread for many devices to come back from a reboot.
+
+    Every device is polled on its own exponential backoff schedule with jitter, from
+    ``initial_delay`` up to ``max_delay`` seconds between attempts. Each attempt is a
+    cheap TCP probe of the port returned by the device's ``_reboot_port``; only once
+    that port accepts connections is the device's ``_reboot_check`` run, which logs in.
+    Probes of devices that are due at the same time run concurrently.
+
+    Args:
+        devices (list): Devices subclassed from BaseDevice.
+        timeout (int): Seconds to wait for all devices.
+        initial_delay (float): Seconds before a device is polled a second time.
+        max_delay (float): Upper bound of the seconds between polls of a device.
+        probe_timeout (float): Seconds a TCP probe waits for the connection.
+
+    Returns:
+        list: The devices that did not come back within ``timeout``; empty on success.
+    """
+    end_time = time.time() + timeout
+    schedule = [(time.time(), order, device, initial_delay) for order, device in enumerate(devices)]
+    heapq.heapify(schedule)
+
+    while schedule:
+        now = time.time()
+        if now >= end_time:
+            break
+
+        if schedule[0][0] > now:
+            time.sleep(min(schedule[0][0], end_time) - now)
+            continue
+
+        due = []
+        while schedule and schedule[0][0] <= now:
+            due.append(heapq.heappop(schedule))
+
+        reachable = probe_ports([(device.host, device._reboot_port()) for _, _, device, _ in due], probe_timeout)
+        for (_, order, device, delay), is_reachable in zip(due, reachable):
+            if is_reachable:
+                try:
+                    if device._reboot_check():
+                        continue
+                except Exception:
+                    pass
+
+            next_attempt = time.time() + random.uniform(delay / 2.0, delay)
+            heapq.heappush(schedule, (next_attempt, order, device, min(delay * 2, max_delay)))
+
+    return [device for _, _, device, _ in sorted(schedule, key=lambda entry: entry[1])]
+
+
+def open_many(devices, workers=10):
+    """Open the connections of many devices in parallel, typically ones built with ``lazy=True``.
+
+    Args:
+        devices (list): Devices subclassed from BaseDevice.
+        workers (int): Maximum number of connections opened at the same time.
+
+    Returns:
+        list: ``(device, exception)`` pairs of the devices that failed to open; empty on success.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    failed = []
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        opening = [(device, executor.submit(device.open)) for device in devices]
+        for device, future in opening:
+            error = future.exception()
+            if error is not None:
+                failed.append((device, error))
+
+    return failed
+
+
+class ResponseCache(object):
+    """A thread-safe LRU cache of command responses whose entries expire after ``ttl`` seconds.
+
+    Args:
+        ttl (float): Seconds a response stays valid.
+        max_entries (int): Number of responses kept; the least recently used are dropped first.
+    """
+
+    def __init__(self, ttl=60, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._generation = 0
+        self._local = threading.local()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def bypassed(self):
+        """True while the calling thread is inside ``bypass``."""
+        return getattr(self._local, "bypass_depth", 0) > 0
+
+    @contextlib.contextmanager
+    def bypass(self):
+        """Skip the cache on the calling thread only, then clear it on exit, even on error.
+
+        Other threads keep using the cache; ``bypass`` blocks may be nested.
+        """
+        self._local.bypass_depth = getattr(self._local, "bypass_depth", 0) + 1
+        try:
+            yield
+        finally:
+            self._local.bypass_depth -= 1
+            self.clear()
+
+    def get(self, key, fetch):
+        """Return the cached response for ``key``, or call ``fetch`` and cache its result.
+
+        A response fetched while the cache was cleared is returned but not stored, since
+        it may predate the change that caused the clear.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None and time.time() - entry[0] < self.ttl:
+                self._entries[key] = entry
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            self.misses += 1
+            generation = self._generation
+
+        fetched = time.time()
+        response = fetch()
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (fetched, copy.deepcopy(response))
+                while len(self._entries) > self.max_entries:
+                    del self._entries[next(iter(self._entries))]
+
+        return response
+
+    def clear(self):
+        """Drop every cached response. The hit and miss counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self):
+        """Return a dictionary of ``hits``, ``misses`` and the current ``size``."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+def cached_response(func):
+    """Decorate a driver's ``show`` to use the device's ``response_cache`` when enabled.
+
+    Responses are keyed on the command and the remaining arguments, e.g. ``raw_text``;
+    calls with unhashable arguments are not cached. Commands other than ``show`` and
+    ``dir`` are never cached and clear the cache, since they may change the device.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self, command, *args, **kwargs):
+        cache = self.response_cache
+        if cache is None or cache.bypassed:
+            return func(self, command, *args, **kwargs)
+
+        if not _CACHEABLE_COMMAND.match(command):
+            try:
+                return func(self, command, *args, **kwargs)
+            finally:
+                cache.clear()
+
+        key = (command,) + args + tuple(sorted(kwargs.items()))
+        try:
+            hash(key)
+        except TypeError:
+            return func(self, command, *args, **kwargs)
+
+        return cache.get(key, lambda: func(self, command, *args, **kwargs))
+
+    return wrapper
+
+
+def invalidates_responses(func):
+    """Decorate a driver method that changes the device to clear its ``response_cache``.
+
+    The cache is bypassed by the calling thread while the method runs, so checks it
+    makes after changing the device see fresh output, and cleared afterwards even if
+    the method fails, as the change may have been partially applied.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        cache = self.response_cache
+        if cache is None:
+            return func(self, *args, **kwargs)
+
+        with cache.bypass():
+            return func(self, *args, **kwargs)
+
+    return wrapper
+
+
+def invalidates_responses_on_write(func):
+    """Decorate a driver's ``show_list`` to clear its ``response_cache`` when it runs a
+    command that ``cached_response`` would not cache.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self, commands, *args, **kwargs):
+        try:
+            return func(self, commands, *args, **kwargs)
+        finally:
+            if self.response_cache is not None and not all(_CACHEABLE_COMMAND.match(c) for c in commands):
+                self.response_cache.clear()
+
+    return wrapper
+
+
+class FactsSource(object):
+    """Declares which facts keys are produced by a single getter on a device.
+
+    Args:
+        commands (tuple): The device commands the getter runs, for reference.
+        getter (str): Name of the device method returning a dictionary of facts.
+        keys (tuple): The facts keys found in the getter's return value.
+    """
+
+    def __init__(self, commands, getter, keys):
+        self.commands = tuple(commands)
+        self.getter = getter
+        self.keys = tuple(keys)
+
+
+class LazyFacts(MutableMapping):
+    """A facts mapping whose values are fetched from the device on first read.
+
+    Each key is backed by a ``FactsSource``; reading a key runs only that source's
+    getter, which populates every key of the source at once. A key listed in ``ttl``
+    is fetched again once it is older than its TTL in seconds (adjustable through the
+    ``ttl`` attribute), other keys are cached until ``refresh`` is called. Operations
+    that need every key, such as iteration, comparison, ``dict(facts)`` or ``copy``,
+    fetch all outstanding sources first. ``copy`` returns a plain dictionary, e.g. for
+    ``json.dumps``.
+    """
+
+    def __init__(self, device, sources, ttl=None, static=None):
+        self._data = dict(static or {})
+        self._device = device
+        self._sources = dict((key, source) for source in sources for key in source.keys)
+        self.ttl = dict(ttl or {})
+        self._fetched = {}
+        self._deleted = set()
+
+    def _is_fresh(self, key):
+        if key not in self._data:
+            return False
+
+        ttl = self.ttl.get(key)
+        return ttl is None or time.time() - self._fetched[key] < ttl
+
+    def _load(self, source):
+        values = getattr(self._device, source.getter)()
+        fetched = time.time()
+        for key in source.keys:
+            if key in values and key not in self._deleted:
+                self._data[key] = values[key]
+                self._fetched[key] = fetched
+
+    def _load_all(self):
+        for key in self._sources:
+            if key not in self._deleted and not self._is_fresh(key):
+                self._load(self._sources[key])
+
+    def __getitem__(self, key):
+        if key in self._sources and key not in self._deleted and not self._is_fresh(key):
+            self._load(self._sources[key])
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self._fetched[key] = time.time()
+        self._deleted.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+
+        if key in self._sources:
+            self._deleted.add(key)
+        self._data.pop(key, None)
+        self._fetched.pop(key, None)
+
+    def __contains__(self, key):
+        if key in self._deleted:
+            return False
+        return key in self._sources or key in self._data
+
+    def __iter__(self):
+        self._load_all()
+        return iter(list(self._data))
+
+    def __len__(self):
+        self._load_all()
+        return len(self._data)
+
+    def __eq__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return self.copy() == dict(other.items())
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def copy(self):
+        self._load_all()
+        return dict(self._data)
+
+    def refresh(self, keys=None):
+        """Expire ``keys`` (default: every device backed key) so they are fetched again on next read.
+        """
+        if keys is None:
+            keys = list(self._sources)
+
+        for key in keys:
+            if key in self._sources:
+                self._data.pop(key, None)
+                self._fetched.pop(key, None)
+                self._deleted.discard(key)
+
+
 class BaseDevice(object):
     __metaclass__ = abc.ABCMeta
 
+    #: ``FactsSource`` declarations used by drivers that build their facts with ``_lazy_facts``.
+    facts_sources = ()
+    #: Seconds each facts key stays valid; keys not listed are cached until refreshed.
+    facts_ttl = {"uptime": 60, "uptime_string": 60}
+
+    _native = None
+    #: Set by drivers built with ``lazy=True`` until their connection is opened.
+    _open_pending = False
+    #: The device's ``ResponseCache`` of ``show`` responses; None unless ``enable_response_cache`` is called.
+    response_cache = None
+
     def __init__(self, host, username, password, vendor=None, device_type=None, **kwargs):
         self.host = host
         self.username = username
@@ -30,6 +493,71 @@ class BaseDevice(object):
         self.device_type = device_type
         self._facts = None
 
+    @property
+    def native(self):
+        """The vendor library object of the device; opens a deferred connection on first access."""
+        if self._open_pending:
+            self._open_pending = False
+            try:
+                self.open()
+            except Exception:
+                self._open_pending = True
+                raise
+        return self._native
+
+    @native.setter
+    def native(self, value):
+        self._native = value
+
+    def enable_response_cache(self, ttl=60, max_entries=256):
+        """Cache the responses of ``show`` and ``dir`` commands run through ``show``.
+
+        Cached responses are dropped whenever the device is changed through pyntc:
+        ``config``, ``config_list``, ``save``, ``rollback``, ``checkpoint``, ``reboot``,
+        ``file_copy``, ``set_boot_options``, ``install_os`` and any other command run
+        through ``show`` or ``show_list``. Changes made outside of this device object
+        are only seen once the responses expire.
+
+        Args:
+            ttl (float): Seconds a response stays valid.
+            max_entries (int): Number of responses kept per device.
+
+        Returns:
+            ResponseCache: The new cache; its ``stats`` report hits and misses.
+        """
+        self.response_cache = ResponseCache(ttl=ttl, max_entries=max_entries)
+        return self.response_cache
+
+    def disable_response_cache(self):
+        """Stop caching responses and drop the cache."""
+        self.response_cache = None
+
+    def _reboot_port(self):
+        """The TCP port probed to tell whether the device is back after a reboot.
+
+        Returns:
+            int: The management port, or None to skip the probe and go straight to ``_reboot_check``.
+        """
+        return None
+
+    def _reboot_check(self):
+        """Log in to determine whether the device is usable again after a reboot.
+
+        Returns:
+            bool: True once the device is back; False or an exception otherwise.
+        """
+        self.open()
+        return True
+
+    def _wait_for_device_reboot(self, timeout=3600):
+        """Wait for the device to come back from a reboot, see ``wait_for_reboot``.
+
+        Raises:
+            RebootTimeoutError: When the device is not back within ``timeout`` seconds.
+        """
+        if wait_for_reboot([self], timeout=timeout):
+            raise RebootTimeoutError(hostname=self.host, wait_time=timeout)
+
     def _image_booted(self, image_name, **vendor_specifics):
         """Determines if a particular image is serving as the active OS.
 
@@ -347,9 +875,20 @@ class BaseDevice(object):
         """
         self.refresh_facts()
 
-    def refresh_facts(self):
+    def refresh_facts(self, fields=None):
         """Refresh cached facts.
+
+        Args:
+            fields (list): (Optional) Only refresh these facts keys. Supported by
+                drivers with lazy facts; other drivers always refresh every key.
         """
+        if self.response_cache is not None:
+            self.response_cache.clear()
+
+        if isinstance(self._facts, LazyFacts):
+            self._facts.refresh(fields)
+            return self._facts
+
         # Persist values that were not added by facts getter
         if isinstance(self._facts, dict):
             facts_backup = self._facts.copy()
@@ -361,6 +900,17 @@ class BaseDevice(object):
 
         return self.facts
 
+    def _lazy_facts(self, static_facts=None):
+        """Return the device's ``LazyFacts``, created from ``facts_sources`` on first use.
+
+        Args:
+            static_facts (dict): Facts known without querying the device, e.g. vendor.
+        """
+        if self._facts is None:
+            self._facts = LazyFacts(self, self.facts_sources, ttl=self.facts_ttl, static=static_facts)
+
+        return self._facts
+
 
 class FileTransferError(NTCError):
     pass
@@ -4,18 +4,29 @@
 import re
 import time
 
-from pyntc.data_model.converters import convert_dict_by_key, convert_list_by_key, strip_unicode
+from past.builtins import basestring
+
+from pyntc.data_model.converters import compile_key_map, strip_unicode
 from pyntc.data_model.key_maps import eos_key_maps
-from .system_features.file_copy.eos_file_copy import EOSFileCopy
+from pyntc.hashing import prefetch_file_hash
+from .system_features.file_copy.eos_file_copy import EOSFileCopy, ssh_clients
 from .system_features.vlans.eos_vlans import EOSVlans
-from .base_device import BaseDevice, RollbackError, RebootTimerError, fix_docs
+from .base_device import (
+    BaseDevice,
+    FactsSource,
+    RollbackError,
+    RebootTimerError,
+    cached_response,
+    fix_docs,
+    invalidates_responses,
+    invalidates_responses_on_write,
+)
 from pyntc.errors import (
     CommandError,
     CommandListError,
     FileSystemNotFoundError,
     NTCError,
     NTCFileNotFoundError,
-    RebootTimeoutError,
     OSInstallError,
 )
 
@@ -25,16 +36,67 @@ from pyeapi.eapilib import CommandError as EOSCommandError
 
 from .system_features.file_copy.base_file_copy import FileTransferError
 
+# Every command needed by the facts property, sent to the device in a single eAPI request.
+FACTS_COMMANDS = ["show version", "show hostname", "show interfaces status", "show vlan"]
+# Default eAPI port of each pyeapi transport, probed while the device reboots.
+EAPI_PORTS = {"http": 80, "https": 443, "https_certs": 443}
+# Key map converters shared by every device.
+_convert_version = compile_key_map(eos_key_maps.BASIC_FACTS_KM)
+_convert_hostname = compile_key_map(eos_key_maps.HOSTNAME_KM)
+_convert_interface = compile_key_map(eos_key_maps.INTERFACES_KM, fill_in=True, whitelist=["interface"])
+
 
 @fix_docs
 class EOSDevice(BaseDevice):
-    def __init__(self, host, username, password, transport="http", timeout=60, **kwargs):
+    # All facts come from one batched eAPI request, so a single source backs every key.
+    facts_sources = (
+        FactsSource(
+            FACTS_COMMANDS,
+            "_facts_from_device",
+            [
+                "model",
+                "os_version",
+                "serial_number",
+                "uptime",
+                "uptime_string",
+                "hostname",
+                "fqdn",
+                "interfaces",
+                "vlans",
+            ],
+        ),
+    )
+
+    def __init__(self, host, username, password, transport="http", timeout=60, port=None, **kwargs):
         super(EOSDevice, self).__init__(host, username, password, vendor="arista", device_type="arista_eos_eapi")
         self.transport = transport
         self.timeout = timeout
-        self.connection = eos_connect(transport, host=host, username=username, password=password, timeout=timeout)
+        self.port = port
+        self.connection = eos_connect(
+            transport, host=host, username=username, password=password, timeout=timeout, port=port
+        )
         self.native = EOSNative(self.connection)
 
+    def _facts_from_device(self):
+        return self._parse_facts(self.show_list(FACTS_COMMANDS))
+
+    @classmethod
+    def _parse_facts(cls, facts_outputs):
+        """Build the facts dictionary from the outputs of ``FACTS_COMMANDS``."""
+        sh_version_output, sh_hostname_output, sh_interfaces_output, sh_vlan_output = facts_outputs
+        facts = _convert_version(sh_version_output)
+
+        uptime = int(time.time() - sh_version_output["bootupTimestamp"])
+        facts["uptime"] = uptime
+        facts["uptime_string"] = cls._uptime_to_string(uptime)
+
+        facts.update(_convert_hostname(sh_hostname_output))
+
+        facts["interfaces"] = sorted(sh_interfaces_output["interfaceStatuses"])
+        facts["vlans"] = sorted(sh_vlan_output["vlans"])
+
+        return facts
+
     def _get_file_system(self):
         """Determines the default file system or directory for device.
 
@@ -78,7 +140,7 @@ class EOSDevice(BaseDevice):
             interface_dictionary["interface"] = key
             interfaces_list.append(interface_dictionary)
 
-        return convert_list_by_key(interfaces_list, eos_key_maps.INTERFACES_KM, fill_in=True, whitelist=["interface"])
+        return [_convert_interface(interface_dictionary) for interface_dictionary in interfaces_list]
 
     def _parse_response(self, response, raw_text):
         if raw_text:
@@ -86,7 +148,8 @@ class EOSDevice(BaseDevice):
         else:
             return list(x["result"] for x in response)
 
-    def _uptime_to_string(self, uptime):
+    @staticmethod
+    def _uptime_to_string(uptime):
         days = uptime / (24 * 60 * 60)
         uptime = uptime % (24 * 60 * 60)
 
@@ -100,33 +163,32 @@ class EOSDevice(BaseDevice):
 
         return "%02d:%02d:%02d:%02d" % (days, hours, mins, seconds)
 
-    def _wait_for_device_reboot(self, timeout=3600):
-        start = time.time()
-        while time.time() - start < timeout:
-            try:
-                self.show("show hostname")
-                return
-            except:
-                pass
+    def _reboot_check(self):
+        self.show("show hostname")
+        return True
 
-        raise RebootTimeoutError(hostname=self.facts["hostname"], wait_time=timeout)
+    def _reboot_port(self):
+        return self.port or EAPI_PORTS.get(self.transport)
 
     def backup_running_config(self, filename):
         with open(filename, "w") as f:
             f.write(self.running_config)
 
+    @invalidates_responses
     def checkpoint(self, checkpoint_file):
         self.show("copy running-config %s" % checkpoint_file)
 
     def close(self):
-        pass
+        ssh_clients.clear(self.host)
 
+    @invalidates_responses
     def config(self, command):
         try:
             self.config_list([command])
         except CommandListError as e:
             raise CommandError(e.command, e.message)
 
+    @invalidates_responses
     def config_list(self, commands):
         try:
             self.native.config(commands)
@@ -135,39 +197,52 @@ class EOSDevice(BaseDevice):
 
     @property
     def facts(self):
-        if self._facts is None:
-            sh_version_output = self.show("show version")
-            self._facts = convert_dict_by_key(sh_version_output, eos_key_maps.BASIC_FACTS_KM)
-            self._facts["vendor"] = self.vendor
-
-            uptime = int(time.time() - sh_version_output["bootupTimestamp"])
-            self._facts["uptime"] = uptime
-            self._facts["uptime_string"] = self._uptime_to_string(uptime)
-
-            sh_hostname_output = self.show("show hostname")
-            self._facts.update(
-                convert_dict_by_key(sh_hostname_output, {}, fill_in=True, whitelist=["hostname", "fqdn"])
-            )
-
-            self._facts["interfaces"] = self._get_interface_list()
-            self._facts["vlans"] = self._get_vlan_list()
-
-        return self._facts
+        return self._lazy_facts({"vendor": self.vendor})
 
+    @invalidates_responses
     def file_copy(self, src, dest=None, **kwargs):
         if not self.file_copy_remote_exists(src, dest, **kwargs):
             fc = EOSFileCopy(self, src, dest)
-            fc.send()
+            fc.send(resume=kwargs.get("resume", False))
 
             if not self.file_copy_remote_exists(src, dest, **kwargs):
                 raise FileTransferError(
                     message="Attempted file copy, but could not validate file existed after transfer"
                 )
 
+    @invalidates_responses
+    def file_copy_list(self, files, resume=False):
+        """Copy several local files to the device over one SSH connection.
+
+        The files already on the device are skipped, and the remote state of all files
+        is checked with a single eAPI request before and after the transfer.
+
+        Args:
+            files (list): Local paths, or ``(src, dest)`` pairs.
+            resume (bool): Resume partial copies over SFTP, as for ``file_copy``.
+
+        Returns:
+            list: The local paths of the files that were transferred.
+
+        Raises:
+            FileTransferError: If a file could not be transferred or validated.
+        """
+        file_copies = []
+        for item in files:
+            src, dest = (item, None) if isinstance(item, basestring) else item
+            prefetch_file_hash(src)
+            file_copies.append(EOSFileCopy(self, src, dest))
+
+        sent = EOSFileCopy.send_many(self, file_copies, resume=resume)
+        return [fc.local for fc in sent]
+
     # TODO: Make this an internal method since exposing file_copy should be sufficient
     def file_copy_remote_exists(self, src, dest=None, **kwargs):
+        # Hash the local file while the device is asked about its copy.
+        prefetch_file_hash(src)
         fc = EOSFileCopy(self, src, dest)
-        if fc.remote_file_exists() and fc.already_transferred():
+        remote_md5 = EOSFileCopy.check_remote(self, [fc])[0][0]
+        if remote_md5 is not None and remote_md5 == fc.get_local_md5():
             return True
         return False
 
@@ -176,6 +251,7 @@ class EOSDevice(BaseDevice):
         image = image.replace("flash:", "")
         return dict(sys=image)
 
+    @invalidates_responses
     def install_os(self, image_name, **vendor_specifics):
         timeout = vendor_specifics.get("timeout", 3600)
         if not self._image_booted(image_name):
@@ -192,6 +268,7 @@ class EOSDevice(BaseDevice):
     def open(self):
         pass
 
+    @invalidates_responses
     def reboot(self, confirm=False, timer=0):
         if timer != 0:
             raise RebootTimerError(self.device_type)
@@ -201,6 +278,7 @@ class EOSDevice(BaseDevice):
         else:
             print("Need to confirm reboot with confirm=True")
 
+    @invalidates_responses
     def rollback(self, rollback_to):
         try:
             self.show("configure replace %s force" % rollback_to)
@@ -211,10 +289,12 @@ class EOSDevice(BaseDevice):
     def running_config(self):
         return self.show("show running-config", raw_text=True)
 
+    @invalidates_responses
     def save(self, filename="startup-config"):
         self.show("copy running-config %s" % filename)
         return True
 
+    @invalidates_responses
     def set_boot_options(self, image_name, **vendor_specifics):
         file_system = vendor_specifics.get("file_system")
         if file_system is None:
@@ -231,6 +311,7 @@ class EOSDevice(BaseDevice):
                 message="Setting install source did not yield expected results",
             )
 
+    @cached_response
     def show(self, command, raw_text=False):
         try:
             response_list = self.show_list([command], raw_text=raw_text)
@@ -238,6 +319,7 @@ class EOSDevice(BaseDevice):
         except CommandListError as e:
             raise CommandError(e.command, e.message)
 
+    @invalidates_responses_on_write
     def show_list(self, commands, raw_text=False):
         if raw_text:
             encoding = "text"
@@ -1,31 +1,78 @@
 """Module for using an F5 TMOS device over the REST / SOAP.
 """
 
-import hashlib
 import os
 import re
 import time
+from concurrent import futures
 
 import bigsuds
 import requests
 from f5.bigip import ManagementRoot
 
+from pyntc.hashing import get_file_hash, prefetch_file_hash
 from pyntc.errors import NotEnoughFreeSpaceError, OSInstallError, \
     NTCFileNotFoundError
-from .base_device import BaseDevice
+from .base_device import BaseDevice, FactsSource
 from .system_features.file_copy.base_file_copy import FileTransferError
 
+UPLOAD_CHUNK_SIZE = 512 * 1024
+UPLOAD_MAX_WORKERS = 4
+UPLOAD_RETRIES = 3
+
 
 class F5Device(BaseDevice):
-    def __init__(self, host, username, password, **kwargs):
+    facts_sources = (
+        FactsSource(["System.SystemInfo.get_uptime"], "_facts_from_uptime", ["uptime", "uptime_string"]),
+        FactsSource(
+            [
+                "System.SystemInfo.get_marketing_name",
+                "System.SystemInfo.get_version",
+                "System.SystemInfo.get_system_information",
+            ],
+            "_facts_from_system_info",
+            ["model", "os_version", "serial_number"],
+        ),
+        FactsSource(["Management.Device.get_hostname"], "_facts_from_hostname", ["hostname", "fqdn"]),
+        FactsSource(["Networking.Interfaces.get_list"], "_facts_from_interfaces", ["interfaces"]),
+        FactsSource(
+            ["Networking.RouteDomainV2.get_list", "Networking.RouteDomainV2.get_vlan"], "_facts_from_vlans", ["vlans"]
+        ),
+    )
+
+    def __init__(self, host, username, password, lazy=False, **kwargs):
         super(F5Device, self).__init__(host, username, password, vendor="f5", device_type="f5_tmos_icontrol")
 
         self.vendor = "F5 Networks"
         self.hostname = host
         self.username = username
         self.password = password
-        self.api_handler = ManagementRoot(self.hostname, self.username, self.password)
-        self._open_soap()
+        self._upload_offsets = {}
+        # With lazy, each of the REST and SOAP sessions is opened on its first use.
+        self._api_handler = None
+        self._soap_handler = None
+        if not lazy:
+            self.open()
+
+    @property
+    def api_handler(self):
+        if self._api_handler is None:
+            self._reconnect()
+        return self._api_handler
+
+    @api_handler.setter
+    def api_handler(self, value):
+        self._api_handler = value
+
+    @property
+    def soap_handler(self):
+        if self._soap_handler is None:
+            self._open_soap()
+        return self._soap_handler
+
+    @soap_handler.setter
+    def soap_handler(self, value):
+        self._soap_handler = value
 
     def _check_free_space(self, min_space=0):
         """Checks for minimum space on the device
@@ -58,6 +105,27 @@ class F5Device(BaseDevice):
         else:
             return False
 
+    def _facts_from_hostname(self):
+        hostname = self._get_hostname()
+        return {"hostname": hostname, "fqdn": hostname}
+
+    def _facts_from_interfaces(self):
+        return {"interfaces": self._get_interfaces_list()}
+
+    def _facts_from_system_info(self):
+        return {
+            "model": self._get_model(),
+            "os_version": self._get_version(),
+            "serial_number": self._get_serial_number(),
+        }
+
+    def _facts_from_uptime(self):
+        uptime = self._get_uptime()
+        return {"uptime": uptime, "uptime_string": self._uptime_to_string(uptime)}
+
+    def _facts_from_vlans(self):
+        return {"vlans": self._get_vlans()}
+
     @staticmethod
     def _file_copy_local_file_exists(filepath):
         return os.path.isfile(filepath)
@@ -70,13 +138,7 @@ class F5Device(BaseDevice):
             None - if the file does not exist
         """
         if self._file_copy_local_file_exists(filepath):
-            m = hashlib.md5()
-            with open(filepath, "rb") as f:
-                buf = f.read(blocksize)
-                while buf:
-                    m.update(buf)
-                    buf = f.read(blocksize)
-            return m.hexdigest()
+            return get_file_hash(filepath, "md5", blocksize=blocksize)
 
     def _file_copy_remote_md5(self, filepath):
         """Gets md5 checksum of the filename
@@ -223,23 +285,11 @@ class F5Device(BaseDevice):
 
         self.api_handler.tm.sys.software.images.exec_cmd("install", name=image_name, volume=volume, options=options)
 
-    def _image_match(self, image_name, checksum):
-        """Checks if image name matches the checksum
-
-        Returns:
-            bool - True / False if image matches the checksum
-        """
-        if self._image_exists(image_name):
-            image = os.path.join("/shared/images", image_name)
-            if self._check_md5sum(image, checksum):
-                return True
-
-        return False
-
     def _open_soap(self):
         try:
-            self.soap_handler = bigsuds.BIGIP(hostname=self.hostname, username=self.username, password=self.password)
-            self.devices = self.soap_handler.Management.Device.get_list()
+            soap_handler = bigsuds.BIGIP(hostname=self.hostname, username=self.username, password=self.password)
+            self.devices = soap_handler.Management.Device.get_list()
+            self._soap_handler = soap_handler
         except bigsuds.OperationFailed as err:
             raise RuntimeError("ConfigSync API Error ({})".format(err))
 
@@ -262,38 +312,104 @@ class F5Device(BaseDevice):
         """
         self.api_handler = ManagementRoot(self.hostname, self.username, self.password)
 
-    def _upload_image(self, image_filepath):
+    def _upload_chunk(self, session, uri, payload, start, size, retries):
+        """Posts one Content-Range chunk of an image, retrying on failure.
+
+        Returns:
+            int - the offset of the first byte after the chunk
+        """
+        end = start + len(payload)
+        headers = {
+            "Content-Type": "application/octet-stream",
+            "Content-Range": "{}-{}/{}".format(start, end - 1, size),
+        }
+        for attempt in range(retries + 1):
+            try:
+                resp = session.post(uri, data=payload, headers=headers, verify=False)
+                resp.raise_for_status()
+                return end
+            except requests.RequestException:
+                if attempt == retries:
+                    raise
+                time.sleep(0.5 * 2 ** attempt)
+
+    def _upload_image(self, image_filepath, chunk_size=UPLOAD_CHUNK_SIZE, max_workers=UPLOAD_MAX_WORKERS,
+                      retries=UPLOAD_RETRIES):
         """Uploads an iso image to the device
 
+        The image is posted in ``chunk_size`` Content-Range chunks over one pooled
+        keep-alive session, with up to ``max_workers`` chunks in flight. A chunk that
+        still fails after ``retries`` attempts aborts the upload; the offset up to which
+        every chunk was acknowledged is remembered, and the next upload of the same
+        unchanged file resumes from there.
+
         Returns:
             None
+
+        Raises:
+            FileTransferError: When a chunk could not be uploaded.
         """
-        image_filename = os.path.basename(image_filepath)
-        _URI = "https://{hostname}/mgmt/cm/autodeploy/software-image-uploads/{filename}".format(
-            hostname=self.hostname, filename=image_filename
-        )
-        chunk_size = 512 * 1024
-        size = os.path.getsize(image_filepath)
-        headers = {"Content-Type": "application/octet-stream"}
+        uri = self._upload_uri(os.path.basename(image_filepath))
+        stat = os.stat(image_filepath)
+        size = stat.st_size
+        resume_key = (os.path.realpath(image_filepath), size, stat.st_mtime)
+        acked = self._upload_offsets.get(resume_key, 0)
+
         requests.packages.urllib3.disable_warnings()
-        start = 0
-
-        with open(image_filepath, "rb") as fileobj:
-            while True:
-                payload = fileobj.read(chunk_size)
-                if not payload:
-                    break
-
-                end = fileobj.tell()
-                if end < chunk_size:
-                    end = size
-                content_range = "{}-{}/{}".format(start, end - 1, size)
-                headers["Content-Range"] = content_range
-                resp = requests.post(
-                    _URI, auth=(self.username, self.password), data=payload, headers=headers, verify=False
-                )
+        session = requests.Session()
+        session.auth = (self.username, self.password)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        # Chunk end offsets by their start offset; None until the device acknowledges them.
+        completed = {}
+        error = None
+        with session, futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = set()
+            with open(image_filepath, "rb") as fileobj:
+                fileobj.seek(acked)
+                start = acked
+                while start < size and error is None:
+                    if len(in_flight) >= max_workers:
+                        done, in_flight = futures.wait(in_flight, return_when=futures.FIRST_COMPLETED)
+                        error = self._collect_chunks(done, completed) or error
+                        continue
+
+                    payload = fileobj.read(chunk_size)
+                    future = executor.submit(self._upload_chunk, session, uri, payload, start, size, retries)
+                    future.chunk_start = start
+                    in_flight.add(future)
+                    start += len(payload)
+
+            done, _ = futures.wait(in_flight)
+            error = self._collect_chunks(done, completed) or error
+
+        while acked in completed:
+            acked = completed.pop(acked)
+
+        if error is not None:
+            self._upload_offsets[resume_key] = acked
+            raise FileTransferError(
+                message="Upload of {} failed at byte {} of {}: {}".format(image_filepath, acked, size, error)
+            )
 
-                start += len(payload)
+        self._upload_offsets.pop(resume_key, None)
+
+    @staticmethod
+    def _collect_chunks(done, completed):
+        error = None
+        for future in done:
+            try:
+                completed[future.chunk_start] = future.result()
+            except requests.RequestException as e:
+                error = e
+        return error
+
+    def _upload_uri(self, filename):
+        return "https://{hostname}/mgmt/cm/autodeploy/software-image-uploads/{filename}".format(
+            hostname=self.hostname, filename=filename
+        )
 
     @staticmethod
     def _uptime_to_string(uptime):
@@ -379,26 +495,16 @@ class F5Device(BaseDevice):
 
     @property
     def facts(self):
-        if self._facts is None:
-            self._facts = {
-                "uptime": self._get_uptime(),
-                "vendor": self.vendor,
-                "model": self._get_model(),
-                "hostname": self._get_hostname(),
-                "fqdn": self._get_hostname(),
-                "os_version": self._get_version(),
-                "serial_number": self._get_serial_number(),
-                "interfaces": self._get_interfaces_list(),
-                "vlans": self._get_vlans(),
-                "uptime_string": self._uptime_to_string(self._get_uptime()),
-            }
-
-        return self._facts
+        return self._lazy_facts({"vendor": self.vendor})
 
     def file_copy(self, src, dest=None, **kwargs):
         if not self.file_copy_remote_exists(src, dest, **kwargs):
             self._check_free_space(min_space=6)
-            self._upload_image(image_filepath=src)
+            self._upload_image(
+                image_filepath=src,
+                chunk_size=kwargs.get("chunk_size", UPLOAD_CHUNK_SIZE),
+                max_workers=kwargs.get("max_workers", UPLOAD_MAX_WORKERS),
+            )
             if not self.file_copy_remote_exists(src, dest, **kwargs):
                 raise FileTransferError(
                     message="Attempted file copy, but could not validate file existed after transfer"
@@ -409,13 +515,14 @@ class F5Device(BaseDevice):
         if dest and not dest.startswith("/shared/images"):
             raise NotImplementedError("Support only for images - destination is always /shared/images")
 
-        local_md5sum = self._file_copy_local_md5(filepath=src)
         file_basename = os.path.basename(src)
-
-        if not self._image_match(image_name=file_basename, checksum=local_md5sum):
+        # Hash the local image while the device is asked for its images.
+        prefetch_file_hash(src)
+        if not self._image_exists(file_basename):
             return False
-        else:
-            return True
+
+        local_md5sum = self._file_copy_local_md5(filepath=src)
+        return self._check_md5sum(os.path.join("/shared/images", file_basename), local_md5sum)
 
     def get_boot_options(self):
         active_volume = self._get_active_volume()
@@ -470,7 +577,10 @@ class F5Device(BaseDevice):
         return False
 
     def open(self):
-        pass
+        if self._api_handler is None:
+            self._reconnect()
+        if self._soap_handler is None:
+            self._open_soap()
 
     def reboot(self, timer=0, confirm=False, volume=None):
         if confirm:
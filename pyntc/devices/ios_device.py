@@ -1,33 +1,61 @@
 """Module for using a Cisco IOS device over SSH.
 """
 
-import signal
+import itertools
 import os
 import re
-import time
 
-from pyntc.templates import get_structured_data
+from pyntc.templates import find_template, get_structured_data
 from pyntc.data_model.converters import convert_dict_by_key
 from pyntc.data_model.key_maps import ios_key_maps
 from .system_features.file_copy.base_file_copy import FileTransferError
-from .base_device import BaseDevice, RollbackError, fix_docs
+from .base_device import (
+    BaseDevice,
+    FactsSource,
+    RollbackError,
+    cached_response,
+    fix_docs,
+    invalidates_responses,
+    invalidates_responses_on_write,
+)
+from .ssh_utils import (
+    CONFIG_BLOCK_SIZE,
+    COPY_ANSWERS,
+    SHOW_BLOCK_SIZE,
+    file_transfer,
+    has_error,
+    iter_command_lines,
+    prompt_pattern,
+    send_command,
+    send_command_blocks,
+    send_config_blocks,
+    ssh_pool,
+)
+from .system_features.file_copy.resumable import resume_upload
 from pyntc.errors import (
     CommandError,
     CommandListError,
     FileSystemNotFoundError,
-    NTCError,
     NTCFileNotFoundError,
     OSInstallError,
-    RebootTimeoutError,
 )
 
 from netmiko import ConnectHandler
-from netmiko import FileTransfer
 
 
 @fix_docs
 class IOSDevice(BaseDevice):
-    def __init__(self, host, username, password, secret="", port=22, **kwargs):
+    facts_sources = (
+        FactsSource(
+            ["show version"],
+            "_facts_from_version",
+            ["model", "os_version", "serial_number", "hostname", "uptime", "uptime_string", "cisco_ios_ssh"],
+        ),
+        FactsSource(["show ip int br"], "_facts_from_interfaces", ["interfaces"]),
+        FactsSource(["show vlan"], "_facts_from_vlans", ["vlans"]),
+    )
+
+    def __init__(self, host, username, password, secret="", port=22, pooled=False, lazy=False, **kwargs):
         super(IOSDevice, self).__init__(host, username, password, vendor="cisco", device_type="cisco_ios_ssh")
 
         self.native = None
@@ -38,8 +66,26 @@ class IOSDevice(BaseDevice):
         self.port = int(port)
         self.global_delay_factor = kwargs.get("global_delay_factor", 1)
         self.delay_factor = kwargs.get("delay_factor", 1)
+        # Borrow the SSH session from pyntc.devices.ssh_utils.ssh_pool, and return it on close.
+        self.pooled = pooled
         self._connected = False
-        self.open()
+        # Defer connecting until ``native`` is first used, or until open() or open_many().
+        if lazy:
+            self._open_pending = True
+        else:
+            self.open()
+
+    def _connect(self):
+        return ConnectHandler(
+            device_type="cisco_ios",
+            ip=self.host,
+            username=self.username,
+            password=self.password,
+            port=self.port,
+            global_delay_factor=self.global_delay_factor,
+            secret=self.secret,
+            verbose=False,
+        )
 
     def _enable(self):
         self.native.exit_config_mode()
@@ -50,12 +96,33 @@ class IOSDevice(BaseDevice):
         self._enable()
         self.native.config_mode()
 
+    def _facts_from_interfaces(self):
+        return {"interfaces": list(x["intf"] for x in self._interfaces_detailed_list())}
+
+    def _facts_from_version(self):
+        version_data = self._raw_version_data()
+        facts = convert_dict_by_key(version_data, ios_key_maps.BASIC_FACTS_KM)
+
+        uptime_full_string = version_data["uptime"]
+        facts["uptime"] = self._uptime_to_seconds(uptime_full_string)
+        facts["uptime_string"] = self._uptime_to_string(uptime_full_string)
+
+        # ios-specific facts
+        facts[self.device_type] = {"config_register": version_data["config_register"]}
+
+        return facts
+
+    def _facts_from_vlans(self):
+        if self.facts["model"].startswith("WS"):
+            return {"vlans": list(str(x["vlan_id"]) for x in self._show_vlan())}
+
+        return {"vlans": []}
+
     def _file_copy_instance(self, src, dest=None, file_system="flash:"):
         if dest is None:
             dest = os.path.basename(src)
 
-        fc = FileTransfer(self.native, src, dest, file_system=file_system)
-        return fc
+        return file_transfer(self.native, src, dest, file_system)
 
     def _get_file_system(self):
         """Determines the default file system or directory for device.
@@ -89,6 +156,10 @@ class IOSDevice(BaseDevice):
     def _is_catalyst(self):
         return self.facts["model"].startswith("WS-")
 
+    @property
+    def _pool_key(self):
+        return (self.host, self.port, self.username, self.device_type)
+
     def _raw_version_data(self):
         show_version_out = self.show("show version")
         try:
@@ -104,9 +175,9 @@ class IOSDevice(BaseDevice):
             else:
                 response = self.native.send_command_expect(command)
         else:
-            response = self.native.send_command_timing(command)
+            response = send_command(self.native, command, prompt_pattern(self.native.base_prompt))
 
-        if "% " in response or "Error:" in response:
+        if has_error(response):
             raise CommandError(command, response)
 
         return response
@@ -141,86 +212,104 @@ class IOSDevice(BaseDevice):
         days, hours, minutes = self._uptime_components(uptime_full_string)
         return "%02d:%02d:%02d:00" % (days, hours, minutes)
 
-    def _wait_for_device_reboot(self, timeout=3600):
-        start = time.time()
-        while time.time() - start < timeout:
-            try:
-                self.open()
-                return
-            except:
-                pass
-
-        raise RebootTimeoutError(hostname=self.facts["hostname"], wait_time=timeout)
+    def _reboot_port(self):
+        return self.port
 
     def backup_running_config(self, filename):
         with open(filename, "w") as f:
             f.write(self.running_config)
 
+    @invalidates_responses
     def checkpoint(self, checkpoint_file):
         self.save(filename=checkpoint_file)
 
     def close(self):
         if self._connected:
-            self.native.disconnect()
+            if self.pooled:
+                # The session may be lent to another device now; borrow one again on next use.
+                ssh_pool.release(self._pool_key, self.native)
+                self.native = None
+                self._open_pending = True
+            else:
+                self.native.disconnect()
             self._connected = False
 
+    @invalidates_responses
     def config(self, command):
         self._enter_config()
         self._send_command(command)
         self.native.exit_config_mode()
 
-    def config_list(self, commands):
+    @invalidates_responses
+    def config_list(self, commands, bulk=False, block_size=CONFIG_BLOCK_SIZE):
+        """Send a list of configuration commands.
+
+        Args:
+            commands (list): The configuration commands.
+            bulk (bool): Write ``block_size`` commands at a time and check their output
+                afterwards, instead of waiting for each command's output to settle.
+                Not suitable for commands that prompt for input.
+            block_size (int): Number of commands per block in bulk mode.
+
+        Raises:
+            CommandListError: For the first command that was not successful.
+        """
         self._enter_config()
-        entered_commands = []
-        for command in commands:
-            entered_commands.append(command)
-            try:
-                self._send_command(command)
-            except CommandError as e:
-                raise CommandListError(entered_commands, command, e.cli_error_msg)
+        if bulk:
+            send_config_blocks(self.native, list(commands), block_size=block_size)
+        else:
+            entered_commands = []
+            for command in commands:
+                entered_commands.append(command)
+                try:
+                    self._send_command(command)
+                except CommandError as e:
+                    raise CommandListError(entered_commands, command, e.cli_error_msg)
         self.native.exit_config_mode()
 
     @property
     def facts(self):
-        if self._facts is None:
-            version_data = self._raw_version_data()
-            self._facts = convert_dict_by_key(version_data, ios_key_maps.BASIC_FACTS_KM)
-            self._facts["vendor"] = self.vendor
-
-            uptime_full_string = version_data["uptime"]
-            self._facts["uptime"] = self._uptime_to_seconds(uptime_full_string)
-            self._facts["uptime_string"] = self._uptime_to_string(uptime_full_string)
-            self._facts["fqdn"] = "N/A"
-            self._facts["interfaces"] = list(x["intf"] for x in self._interfaces_detailed_list())
-
-            if self._facts["model"].startswith("WS"):
-                self._facts["vlans"] = list(str(x["vlan_id"]) for x in self._show_vlan())
-            else:
-                self._facts["vlans"] = []
-
-            # ios-specific facts
-            self._facts[self.device_type] = {"config_register": version_data["config_register"]}
-
-        return self._facts
+        return self._lazy_facts({"vendor": self.vendor, "fqdn": "N/A"})
+
+    def _file_copy_resume(self, src, dest, file_system):
+        """Upload over SFTP, resuming a partial copy; False if the device has no SFTP server."""
+        remote = "{0}/{1}".format(file_system.rstrip("/"), dest or os.path.basename(src))
+        sent = resume_upload(self.host, self.username, self.password, src, remote, port=self.port)
+        return sent is not None
+
+    @invalidates_responses
+    def file_copy(self, src, dest=None, file_system=None, resume=False):
+        """Copy a local file to the device unless an identical copy is already there.
+
+        Args:
+            src (str): Path of the local file.
+            dest (str): Name of the file on the device; the name of ``src`` by default.
+            file_system (str): File system on the device; the default one when omitted.
+            resume (bool): Upload over SFTP and send only what a partial copy left by an
+                interrupted transfer lacks. Falls back to a full SCP copy when the device
+                has no SFTP server.
 
-    def file_copy(self, src, dest=None, file_system=None):
+        Raises:
+            FileTransferError: If the transfer fails or the copy cannot be verified.
+        """
         self._enable()
         if file_system is None:
             file_system = self._get_file_system()
 
         if not self.file_copy_remote_exists(src, dest, file_system):
-            fc = self._file_copy_instance(src, dest, file_system=file_system)
-            #        if not self.fc.verify_space_available():
-            #            raise FileTransferError('Not enough space available.')
-
-            try:
-                fc.enable_scp()
-                fc.establish_scp_conn()
-                fc.transfer_file()
-            except:
-                raise FileTransferError
-            finally:
-                fc.close_scp_chan()
+            if not (resume and self._file_copy_resume(src, dest, file_system)):
+                fc = self._file_copy_instance(src, dest, file_system=file_system)
+                #        if not self.fc.verify_space_available():
+                #            raise FileTransferError('Not enough space available.')
+
+                try:
+                    fc.enable_scp()
+                    fc.establish_scp_conn()
+                    fc.transfer_file()
+                except:
+                    raise FileTransferError
+                finally:
+                    fc.close_scp_chan()
 
             if not self.file_copy_remote_exists(src, dest, file_system):
                 raise FileTransferError(
@@ -268,6 +357,7 @@ class IOSDevice(BaseDevice):
 
         return {"sys": boot_image}
 
+    @invalidates_responses
     def install_os(self, image_name, **vendor_specifics):
         timeout = vendor_specifics.get("timeout", 3600)
         if not self._image_booted(image_name):
@@ -287,46 +377,35 @@ class IOSDevice(BaseDevice):
                 self.native.find_prompt()
             except:
                 self._connected = False
+                if self.pooled:
+                    ssh_pool.discard(self._pool_key, self.native)
 
         if not self._connected:
-            self.native = ConnectHandler(
-                device_type="cisco_ios",
-                ip=self.host,
-                username=self.username,
-                password=self.password,
-                port=self.port,
-                global_delay_factor=self.global_delay_factor,
-                secret=self.secret,
-                verbose=False,
-            )
+            if self.pooled:
+                self.native = ssh_pool.acquire(self._pool_key, self._connect)
+            else:
+                self.native = self._connect()
             self._connected = True
+        self._open_pending = False
 
+    @invalidates_responses
     def reboot(self, timer=0, confirm=False):
         if confirm:
-
-            def handler(signum, frame):
-                raise RebootSignal("Interrupting after reload")
-
-            signal.signal(signal.SIGALRM, handler)
-            signal.alarm(10)
-
-            try:
-                if timer > 0:
-                    first_response = self.show("reload in %d" % timer)
-                else:
-                    first_response = self.show("reload")
-
-                if "System configuration" in first_response:
-                    self.native.send_command_timing("no")
-
-                self.native.send_command_timing("\n")
-            except RebootSignal:
-                signal.alarm(0)
-
-            signal.alarm(0)
+            self._enable()
+            response = self._send_command("reload in %d" % timer if timer > 0 else "reload")
+            if "System config" in response:
+                self._send_command("no")
+
+            if timer > 0:
+                # Confirm, and wait for the prompt back while the reload is scheduled.
+                self._send_command("")
+            else:
+                # Confirm; the device drops the session instead of returning a prompt.
+                self.native.write_channel("\n")
         else:
             print("Need to confirm reboot with confirm=True")
 
+    @invalidates_responses
     def rollback(self, rollback_to):
         try:
             self.show("configure replace flash:%s force" % rollback_to)
@@ -337,18 +416,19 @@ class IOSDevice(BaseDevice):
     def running_config(self):
         return self.show("show running-config", expect=True)
 
+    @invalidates_responses
     def save(self, filename="startup-config"):
         command = "copy running-config %s" % filename
-        # Changed to send_command_timing to not require a direct prompt return.
-        self.native.send_command_timing(command)
-        # If the user has enabled 'file prompt quiet' which dose not require any confirmation or feedback.
-        # This will send return without requiring an OK.
-        # Send a return to pass the [OK]? message - Incease delay_factor for looking for response.
-        self.native.send_command_timing("\n", delay_factor=2)
-        # Confirm that we have a valid prompt again before returning.
-        self.native.find_prompt()
+        self._enable()
+        response = send_command(
+            self.native, command, prompt_pattern(self.native.base_prompt), answers=COPY_ANSWERS, stop=None
+        )
+        if has_error(response):
+            raise CommandError(command, response)
+
         return True
 
+    @invalidates_responses
     def set_boot_options(self, image_name, **vendor_specifics):
         file_system = vendor_specifics.get("file_system")
         if file_system is None:
@@ -374,12 +454,72 @@ class IOSDevice(BaseDevice):
                 message="Setting boot command did not yield expected results, found {0}".format(new_boot_options),
             )
 
-    def show(self, command, expect=False, expect_string=""):
+    @cached_response
+    def show(self, command, expect=False, expect_string="", structured=False):
+        """Send a non-configuration command.
+
+        Args:
+            command (str): The command to send to the device.
+            expect (bool): Read the output until ``expect_string``, or netmiko's prompt, is seen.
+            expect_string (str): Pattern marking the end of the output when ``expect`` is set.
+            structured (bool): Parse the output with the template indexed for the command,
+                see ``pyntc.templates.find_template``; abbreviations such as ``sh ip int br`` match.
+
+        Returns:
+            The raw text output, or with ``structured`` a list of dictionaries, one per row.
+
+        Raises:
+            TemplateNotFoundError: if ``structured`` is set and no template parses the command;
+                raised before the command is sent.
+        """
+        template_name = find_template("cisco_ios", command) if structured else None
+        self._enable()
+        response = self._send_command(command, expect=expect, expect_string=expect_string)
+        if template_name is not None:
+            return get_structured_data(template_name, response)
+        return response
+
+    def show_lines(self, command):
+        """Send a show command and yield the lines of its output as they arrive.
+
+        For outputs too large to hold in memory, e.g. parsed with
+        ``pyntc.templates.iter_structured_data``. The response cache is not used.
+
+        Raises:
+            CommandError: If the output starts with an error.
+        """
         self._enable()
-        return self._send_command(command, expect=expect, expect_string=expect_string)
+        lines = iter_command_lines(self.native, command, prompt_pattern(self.native.base_prompt))
+        # Errors follow at most a line marking the rejected part of the command.
+        head = list(itertools.islice(lines, 2))
+        if any(has_error(line) for line in head):
+            raise CommandError(command, "\n".join(head + list(lines)))
+
+        for line in head:
+            yield line
+        for line in lines:
+            yield line
+
+    @invalidates_responses_on_write
+    def show_list(self, commands, pipeline=False, block_size=SHOW_BLOCK_SIZE):
+        """Send a list of commands and return their output.
+
+        Args:
+            commands (list): The commands.
+            pipeline (bool): Write ``block_size`` commands at a time and split the output
+                on the prompts that follow them, instead of waiting for each command's
+                output to settle. Not suitable for commands that prompt for input.
+            block_size (int): Number of commands in flight in pipeline mode.
+
+        Returns:
+            list: The output of each command.
 
-    def show_list(self, commands):
+        Raises:
+            CommandListError: For the first command that was not successful.
+        """
         self._enable()
+        if pipeline:
+            return send_command_blocks(self.native, list(commands), block_size=block_size)
 
         responses = []
         entered_commands = []
@@ -395,7 +535,3 @@ class IOSDevice(BaseDevice):
     @property
     def startup_config(self):
         return self.show("show startup-config")
-
-
-class RebootSignal(NTCError):
-    pass
@@ -1,9 +1,8 @@
 import os
 import re
-import time
-import hashlib
 from tempfile import NamedTemporaryFile
 
+from lxml import etree
 from jnpr.junos import Device as JunosNativeDevice
 from jnpr.junos.utils.config import Config as JunosNativeConfig
 from jnpr.junos.utils.fs import FS as JunosNativeFS
@@ -13,37 +12,108 @@ from jnpr.junos.op.ethport import EthPortTable
 from jnpr.junos.exception import ConfigLoadError
 
 from .tables.jnpr.loopback import LoopbackTable
-from .base_device import BaseDevice, fix_docs
-
-from pyntc.errors import CommandError, CommandListError, RebootTimeoutError
+from .base_device import (
+    BaseDevice,
+    FactsSource,
+    cached_response,
+    fix_docs,
+    invalidates_responses,
+    invalidates_responses_on_write,
+)
+
+from pyntc.errors import CommandError, CommandListError
+from pyntc.hashing import get_file_hash, prefetch_file_hash
 from .system_features.file_copy.base_file_copy import FileTransferError
 
 
 @fix_docs
 class JunosDevice(BaseDevice):
+    facts_sources = (
+        FactsSource(
+            ["get-software-information", "get-route-engine-information"],
+            "_facts_from_native",
+            ["hostname", "fqdn", "model", "uptime", "uptime_string", "serial_number", "version"],
+        ),
+        FactsSource(["get-interface-information"], "_facts_from_interfaces", ["interfaces"]),
+    )
+
     def __init__(self, host, username, password, *args, **kwargs):
+        lazy = kwargs.pop("lazy", False)
         super(JunosDevice, self).__init__(
             host, username, password, *args, vendor="juniper", device_type="juniper_junos_netconf", **kwargs
         )
 
         self.native = JunosNativeDevice(*args, host=host, user=username, passwd=password, **kwargs)
-        self.open()
-        self.cu = JunosNativeConfig(self.native)
-        self.fs = JunosNativeFS(self.native)
-        self.sw = JunosNativdSW(self.native)
+        # The PyEZ utilities read from the session when created, so they are built on first use.
+        self._cu = self._fs = self._sw = None
+        # Defer connecting until ``native`` is first used, or until open() or open_many().
+        if lazy:
+            self._open_pending = True
+        else:
+            self.open()
+
+    @property
+    def cu(self):
+        if self._cu is None:
+            self._cu = JunosNativeConfig(self.native)
+        return self._cu
+
+    @cu.setter
+    def cu(self, value):
+        self._cu = value
+
+    @property
+    def fs(self):
+        if self._fs is None:
+            self._fs = JunosNativeFS(self.native)
+        return self._fs
+
+    @fs.setter
+    def fs(self, value):
+        self._fs = value
+
+    @property
+    def sw(self):
+        if self._sw is None:
+            self._sw = JunosNativdSW(self.native)
+        return self._sw
+
+    @sw.setter
+    def sw(self, value):
+        self._sw = value
+
+    def _facts_from_interfaces(self):
+        return {"interfaces": self._get_interfaces()}
+
+    def _facts_from_native(self):
+        native_facts = self.native.facts
+        try:
+            native_uptime_string = native_facts["RE0"]["up_time"]
+        except (AttributeError, TypeError):
+            native_uptime_string = None
+
+        facts = {
+            "hostname": native_facts.get("hostname"),
+            "fqdn": native_facts.get("fqdn"),
+            "model": native_facts.get("model"),
+            "uptime": None,
+            "uptime_string": None,
+            "serial_number": native_facts.get("serialnumber"),
+            "version": native_facts.get("version"),
+        }
+        # TODO: Use a more reliable method for determining uptime (show system uptime)
+        if native_uptime_string is not None:
+            facts["uptime"] = self._uptime_to_seconds(native_uptime_string)
+            facts["uptime_string"] = self._uptime_to_string(native_uptime_string)
+
+        return facts
 
     def _file_copy_local_file_exists(self, filepath):
         return os.path.isfile(filepath)
 
     def _file_copy_local_md5(self, filepath, blocksize=2 ** 20):
         if self._file_copy_local_file_exists(filepath):
-            m = hashlib.md5()
-            with open(filepath, "rb") as f:
-                buf = f.read(blocksize)
-                while buf:
-                    m.update(buf)
-                    buf = f.read(blocksize)
-            return m.hexdigest()
+            return get_file_hash(filepath, "md5", blocksize=blocksize)
 
     def _file_copy_remote_md5(self, filename):
         return self.fs.checksum(filename)
@@ -89,21 +159,14 @@ class JunosDevice(BaseDevice):
         days, hours, minutes, seconds = self._uptime_components(uptime_full_string)
         return "%02d:%02d:%02d:%02d" % (days, hours, minutes, seconds)
 
-    def _wait_for_device_reboot(self, timeout=3600):
-        start = time.time()
-        while time.time() - start < timeout:
-            try:
-                self.open()
-                return
-            except:
-                pass
-
-        raise RebootTimeoutError(hostname=self.facts["hostname"], wait_time=timeout)
+    def _reboot_port(self):
+        return self.native.port
 
     def backup_running_config(self, filename):
         with open(filename, "w") as f:
             f.write(self.running_config)
 
+    @invalidates_responses
     def checkpoint(self, filename):
         self.save(filename)
 
@@ -111,6 +174,7 @@ class JunosDevice(BaseDevice):
         if self.connected:
             self.native.close()
 
+    @invalidates_responses
     def config(self, command, format="set"):
         try:
             self.cu.load(command, format=format)
@@ -118,46 +182,71 @@ class JunosDevice(BaseDevice):
         except ConfigLoadError as e:
             raise CommandError(command, e.message)
 
-    def config_list(self, commands, format="set"):
+    @invalidates_responses
+    def config_list(self, commands, format="set", confirm=None):
+        """Load a list of configuration commands as one candidate and commit it.
+
+        The commands are merged into a single load: ``set`` and ``text`` commands are
+        joined line by line, and ``xml`` snippets are merged under one ``<configuration>``.
+
+        Args:
+            commands (list): The configuration commands or snippets.
+            format (str): One of ``set``, ``text`` or ``xml``.
+            confirm (int): When given, use ``commit confirmed``; the commit is rolled back
+                after this many minutes unless confirmed by another commit.
+
+        Raises:
+            CommandListError: When the load fails. The failing command is the first one
+                containing the element the device reported as bad, or the last command
+                when the device does not name one.
+        """
         try:
-            for command in commands:
-                self.cu.load(command, format=format)
+            self.cu.load(self._merge_config(commands, format), format=format)
+        except ConfigLoadError as e:
+            raise CommandListError(commands, self._config_error_command(commands, e), e.message)
 
+        if confirm:
+            self.cu.commit(confirm=confirm)
+        else:
             self.cu.commit()
-        except ConfigLoadError as e:
-            raise CommandListError(commands, command, e.message)
+
+    @staticmethod
+    def _merge_config(commands, format):
+        if format != "xml":
+            return "\n".join(commands)
+
+        configuration = etree.Element("configuration")
+        for command in commands:
+            snippet = etree.fromstring(command)
+            if snippet.tag == "configuration":
+                configuration.extend(list(snippet))
+            else:
+                configuration.append(snippet)
+
+        return etree.tostring(configuration, encoding="unicode")
+
+    @staticmethod
+    def _config_error_command(commands, error):
+        for rpc_error in error.errs or []:
+            bad_element = (rpc_error or {}).get("bad_element")
+            if not bad_element:
+                continue
+            pattern = re.compile(r"(?<![\w-]){0}(?![\w-])".format(re.escape(bad_element)))
+            for command in commands:
+                if pattern.search(command):
+                    return command
+
+        return commands[-1]
 
     @property
     def connected(self):
-        return self.native.connected
+        return self._native.connected
 
     @property
     def facts(self):
-        if self._facts is None:
-            native_facts = self.native.facts
-            try:
-                native_uptime_string = native_facts["RE0"]["up_time"]
-            except (AttributeError, TypeError):
-                native_uptime_string = None
-
-            self._facts = {
-                "hostname": native_facts.get("hostname"),
-                "fqdn": native_facts.get("fqdn"),
-                "model": native_facts.get("model"),
-                "uptime": None,
-                "uptime_string": None,
-                "serial_number": native_facts.get("serialnumber"),
-                "interfaces": self._get_interfaces(),
-                "vendor": self.vendor,
-                "version": native_facts.get("version"),
-            }
-            # TODO: Use a more reliable method for determining uptime (show system uptime)
-            if native_uptime_string is not None:
-                self._facts["uptime"] = self._uptime_to_seconds(native_uptime_string)
-                self._facts["uptime_string"] = self._uptime_to_string(native_uptime_string)
-
-        return self._facts
+        return self._lazy_facts({"vendor": self.vendor})
 
+    @invalidates_responses
     def file_copy(self, src, dest=None, **kwargs):
         if not self.file_copy_remote_exists(src, dest, **kwargs):
             if dest is None:
@@ -176,8 +265,10 @@ class JunosDevice(BaseDevice):
         if dest is None:
             dest = os.path.basename(src)
 
-        local_hash = self._file_copy_local_md5(src)
+        # Hash the local file while the device computes the checksum of its copy.
+        prefetch_file_hash(src)
         remote_hash = self._file_copy_remote_md5(dest)
+        local_hash = self._file_copy_local_md5(src)
         if local_hash is not None and local_hash == remote_hash:
             return True
         return False
@@ -185,19 +276,23 @@ class JunosDevice(BaseDevice):
     def get_boot_options(self):
         return self.facts["os_version"]
 
+    @invalidates_responses
     def install_os(self, image_name, **vendor_specifics):
         raise NotImplementedError
 
     def open(self):
         if not self.connected:
-            self.native.open()
+            self._native.open()
+        self._open_pending = False
 
+    @invalidates_responses
     def reboot(self, timer=0, confirm=False):
         if confirm:
             self.sw.reboot(in_min=timer)
         else:
             print("Need to confirm reboot with confirm=True")
 
+    @invalidates_responses
     def rollback(self, filename):
         self.native.timeout = 60
 
@@ -217,6 +312,7 @@ class JunosDevice(BaseDevice):
     def running_config(self):
         return self.show("show config")
 
+    @invalidates_responses
     def save(self, filename=None):
         if filename is None:
             self.cu.commit()
@@ -232,9 +328,11 @@ class JunosDevice(BaseDevice):
         temp_file.close()
         return True
 
+    @invalidates_responses
     def set_boot_options(self, sys):
         raise NotImplementedError
 
+    @cached_response
     def show(self, command, raw_text=True):
         if not raw_text:
             raise ValueError(
@@ -247,6 +345,7 @@ class JunosDevice(BaseDevice):
 
         return self.native.cli(command, warning=False)
 
+    @invalidates_responses_on_write
     def show_list(self, commands, raw_text=True):
         responses = []
         for command in commands:
@@ -2,17 +2,27 @@
 """
 import os
 import re
-import time
 
 from pyntc.data_model.converters import strip_unicode
 from .system_features.file_copy.base_file_copy import FileTransferError
-from .base_device import BaseDevice, RollbackError, RebootTimerError, fix_docs
-from pyntc.errors import CommandError, CommandListError, NTCFileNotFoundError, RebootTimeoutError, OSInstallError
+from .base_device import (
+    BaseDevice,
+    RollbackError,
+    RebootTimerError,
+    cached_response,
+    fix_docs,
+    invalidates_responses,
+    invalidates_responses_on_write,
+)
+from pyntc.errors import CommandError, CommandListError, NTCFileNotFoundError, OSInstallError
 
 from pynxos.device import Device as NXOSNative
 from pynxos.features.file_copy import FileTransferError as NXOSFileTransferError
 from pynxos.errors import CLIError
 
+# Default NX-API port of each transport, probed while the device reboots.
+NXAPI_PORTS = {"http": 80, "https": 443}
+
 
 @fix_docs
 class NXOSDevice(BaseDevice):
@@ -20,6 +30,7 @@ class NXOSDevice(BaseDevice):
         super(NXOSDevice, self).__init__(host, username, password, vendor="cisco", device_type="cisco_nxos_nxapi")
         self.transport = transport
         self.timeout = timeout
+        self.port = port
         self.native = NXOSNative(host, username, password, transport=transport, timeout=timeout, port=port)
 
     def _image_booted(self, image_name, **vendor_specifics):
@@ -29,33 +40,34 @@ class NXOSDevice(BaseDevice):
 
         return False
 
-    def _wait_for_device_reboot(self, timeout=600):
-        start = time.time()
-        while time.time() - start < timeout:
-            try:
-                self.refresh_facts()
-                if self.facts["uptime"] < 180:
-                    return
-            except:
-                pass
+    def _reboot_check(self):
+        self.refresh_facts()
+        return self.facts["uptime"] < 180
 
-        raise RebootTimeoutError(hostname=self.facts["hostname"], wait_time=timeout)
+    def _reboot_port(self):
+        return self.port or NXAPI_PORTS.get(self.transport)
+
+    def _wait_for_device_reboot(self, timeout=600):
+        super(NXOSDevice, self)._wait_for_device_reboot(timeout=timeout)
 
     def backup_running_config(self, filename):
         self.native.backup_running_config(filename)
 
+    @invalidates_responses
     def checkpoint(self, filename):
         return self.native.checkpoint(filename)
 
     def close(self):
         pass
 
+    @invalidates_responses
     def config(self, command):
         try:
             self.native.config(command)
         except CLIError as e:
             raise CommandError(command, str(e))
 
+    @invalidates_responses
     def config_list(self, commands):
         try:
             self.native.config_list(commands)
@@ -72,6 +84,7 @@ class NXOSDevice(BaseDevice):
             self._facts["vendor"] = self.vendor
         return self._facts
 
+    @invalidates_responses
     def file_copy(self, src, dest=None, file_system="bootflash:"):
         if not self.file_copy_remote_exists(src, dest, file_system):
             dest = dest or os.path.basename(src)
@@ -94,6 +107,7 @@ class NXOSDevice(BaseDevice):
     def get_boot_options(self):
         return self.native.get_boot_options()
 
+    @invalidates_responses
     def install_os(self, image_name, **vendor_specifics):
         timeout = vendor_specifics.get("timeout", 3600)
         if not self._image_booted(image_name):
@@ -110,12 +124,14 @@ class NXOSDevice(BaseDevice):
     def open(self):
         pass
 
+    @invalidates_responses
     def reboot(self, confirm=False, timer=0):
         if timer != 0:
             raise RebootTimerError(self.device_type)
 
         self.native.reboot(confirm=confirm)
 
+    @invalidates_responses
     def rollback(self, filename):
         try:
             self.native.rollback(filename)
@@ -126,9 +142,11 @@ class NXOSDevice(BaseDevice):
     def running_config(self):
         return self.native.running_config
 
+    @invalidates_responses
     def save(self, filename="startup-config"):
         return self.native.save(filename=filename)
 
+    @invalidates_responses
     def set_boot_options(self, image_name, kickstart=None, **vendor_specifics):
         file_system = vendor_specifics.get("file_system")
         if file_system is None:
@@ -154,12 +172,14 @@ class NXOSDevice(BaseDevice):
     def set_timeout(self, timeout):
         self.native.timeout = timeout
 
+    @cached_response
     def show(self, command, raw_text=False):
         try:
             return strip_unicode(self.native.show(command, raw_text=raw_text))
         except CLIError as e:
             raise CommandError(command, str(e))
 
+    @invalidates_responses_on_write
     def show_list(self, commands, raw_text=False):
         try:
             return strip_unicode(self.native.show_list(commands, raw_text=raw_text))
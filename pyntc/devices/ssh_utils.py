@@ -0,0 +1,402 @@
+"""Helpers shared by the drivers that talk to a CLI over a netmiko SSH channel.
+"""
+
+import atexit
+import collections
+import re
+import threading
+import time
+
+from netmiko.ssh_dispatcher import FILE_TRANSFER_MAP
+
+from pyntc.errors import CommandError, CommandListError, ConnectionPoolExhaustedError
+from pyntc.hashing import get_file_hash
+
+# Number of configuration lines written to the channel before waiting for their prompts.
+CONFIG_BLOCK_SIZE = 50
+# Number of show commands in flight at once; kept small as their output is much larger.
+SHOW_BLOCK_SIZE = 10
+# Substrings of a command's output that mean the device rejected it.
+ERROR_MARKERS = ("% ", "Error:")
+# Seconds without new output after which a command is considered stuck.
+COMMAND_TIMEOUT = 60
+# Output ending in an interactive question, such as ``[confirm]`` or ``Destination filename [startup-config]?``.
+QUESTION = re.compile(r"(\[confirm\]|\[yes/no\]:?|\[Y\]es/\[N\]o:?|\[[^\]\n]*\]\?)\s*$")
+# Replies accepting the questions of ``copy``: keep the proposed file names, confirm overwrites.
+COPY_ANSWERS = (
+    (re.compile(r"(Source|Destination) filename \[[^\]\n]*\]\?\s*$"), "\n"),
+    (re.compile(r"\[confirm\]\s*$"), "\n"),
+)
+
+
+def has_error(response):
+    return any(marker in response for marker in ERROR_MARKERS)
+
+
+def prompt_pattern(base_prompt):
+    """Compile a regex matching any prompt of the device at the start of a line.
+
+    Config mode prompts, such as ``router(config-if)#``, match as well as the exec prompts.
+    """
+    return re.compile(r"^{0}[^\n#>]*[#>]".format(re.escape(base_prompt)), re.MULTILINE)
+
+
+def _strip_echo(output):
+    return output.split("\n", 1)[1] if "\n" in output else ""
+
+
+def send_command(native, command, prompt, answers=(), stop=QUESTION, timeout=COMMAND_TIMEOUT, loop_delay=0.01):
+    """Send a command and return its output as soon as the device prompt reappears.
+
+    Args:
+        native (netmiko.BaseConnection): A connection sitting at a prompt.
+        command (str): The command to send.
+        prompt (re.RegexObject): Pattern of the device prompt, see ``prompt_pattern``.
+        answers (tuple): ``(pattern, reply)`` pairs; when the output ends with a match of
+            ``pattern``, ``reply`` is written and the output is read further.
+        stop (re.RegexObject): Return as soon as the output ends with a match that is not
+            answered, leaving the question for the caller. By default any ``QUESTION``.
+        timeout (float): Seconds without new output after which the device is considered stuck.
+        loop_delay (float): Seconds to sleep when the channel has no data.
+
+    Returns:
+        str: The output without the echoed command and, unless stopped, the trailing prompt.
+
+    Raises:
+        CommandError: When neither the prompt nor a question follows within ``timeout`` seconds.
+    """
+    native.write_channel(command + "\n")
+
+    output = ""
+    answered = 0
+    last_data = time.time()
+    while True:
+        data = native.read_channel()
+        if data:
+            output += data.replace("\r\n", "\n").replace("\r", "")
+            last_data = time.time()
+
+            line_start = output.rfind("\n") + 1
+            match = prompt.match(output, line_start)
+            if match and not output[match.end() :].strip():
+                return _strip_echo(output[:line_start])
+
+            for pattern, reply in answers:
+                if pattern.search(output, answered):
+                    native.write_channel(reply)
+                    answered = len(output)
+                    break
+            else:
+                if stop is not None and stop.search(output, answered):
+                    return _strip_echo(output)
+        elif time.time() - last_data > timeout:
+            raise CommandError(command, "Timed out waiting for the prompt after %r" % output[-200:])
+        else:
+            time.sleep(loop_delay)
+
+
+def iter_command_lines(native, command, prompt, timeout=COMMAND_TIMEOUT, loop_delay=0.01):
+    """Send a command and yield the lines of its output as they arrive.
+
+    Only the line being received is buffered, so very large outputs can be processed
+    without holding them in memory. The command must not prompt for input.
+
+    Args:
+        native (netmiko.BaseConnection): A connection sitting at a prompt.
+        command (str): The command to send.
+        prompt (re.RegexObject): Pattern of the device prompt, see ``prompt_pattern``.
+        timeout (float): Seconds without new output after which the device is considered stuck.
+        loop_delay (float): Seconds to sleep when the channel has no data.
+
+    Yields:
+        str: The lines of the output without line endings, the echoed command and the trailing prompt.
+
+    Raises:
+        CommandError: When the prompt does not reappear within ``timeout`` seconds of the last output.
+    """
+    native.write_channel(command + "\n")
+
+    pending = ""
+    echoed = False
+    last_data = time.time()
+    while True:
+        data = native.read_channel()
+        if data:
+            pending += data.replace("\r\n", "\n").replace("\r", "")
+            last_data = time.time()
+
+            lines = pending.split("\n")
+            pending = lines.pop()
+            for line in lines:
+                if echoed:
+                    yield line
+                echoed = True
+
+            match = prompt.match(pending)
+            if echoed and match and not pending[match.end() :].strip():
+                return
+        elif time.time() - last_data > timeout:
+            raise CommandError(command, "Timed out waiting for the prompt after %r" % pending[-200:])
+        else:
+            time.sleep(loop_delay)
+
+
+def send_lines(native, lines, prompt, timeout=30, loop_delay=0.01):
+    """Write several lines to the channel at once and split the output per line.
+
+    Every line is followed by exactly one prompt, so the output is read until one
+    prompt per line has been seen rather than waiting for the channel to go quiet.
+
+    Args:
+        native (netmiko.BaseConnection): A connection sitting at a prompt.
+        lines (list): The commands to send.
+        prompt (re.RegexObject): Pattern of the device prompt, see ``prompt_pattern``.
+        timeout (float): Seconds without new output after which the device is considered stuck.
+        loop_delay (float): Seconds to sleep when the channel has no data.
+
+    Returns:
+        list: The output of each line, without the echoed command and the trailing prompt.
+
+    Raises:
+        CommandListError: When no prompt follows a line within ``timeout`` seconds.
+    """
+    native.write_channel("".join(line + "\n" for line in lines))
+
+    output = ""
+    prompts = []
+    last_data = time.time()
+    while len(prompts) < len(lines):
+        data = native.read_channel()
+        if data:
+            # Only rescan from the start of the last incomplete line, past any prompt already found.
+            scan_from = output.rfind("\n") + 1
+            if prompts:
+                scan_from = max(scan_from, prompts[-1].end())
+            output += data.replace("\r\n", "\n").replace("\r", "")
+            prompts.extend(prompt.finditer(output, scan_from))
+            last_data = time.time()
+        elif time.time() - last_data > timeout:
+            stuck = len(prompts)
+            message = "Timed out waiting for the prompt after %r" % output[-200:]
+            raise CommandListError(lines[: stuck + 1], lines[stuck], message)
+        else:
+            time.sleep(loop_delay)
+
+    responses = []
+    start = 0
+    for match in prompts[: len(lines)]:
+        # Drop the echoed command, which is the rest of the previous prompt's line.
+        responses.append(_strip_echo(output[start : match.start()]))
+        start = match.end()
+
+    return responses
+
+
+def send_command_blocks(native, commands, block_size=CONFIG_BLOCK_SIZE, timeout=30):
+    """Send commands in blocks and check the output of every command.
+
+    The channel must be sitting at a prompt. A block is written in one go, and a failing
+    command is found from the block's output. Commands after the failing one in the
+    same block have already been sent to the device; later blocks are not sent.
+
+    Returns:
+        list: The output of each command.
+
+    Raises:
+        CommandListError: For the first command whose output contains an error.
+    """
+    prompt = prompt_pattern(native.base_prompt)
+    responses = []
+    for block_start in range(0, len(commands), block_size):
+        block = commands[block_start : block_start + block_size]
+        try:
+            block_responses = send_lines(native, block, prompt, timeout=timeout)
+        except CommandListError as e:
+            failed = block_start + len(e.commands) - 1
+            raise CommandListError(commands[: failed + 1], e.command, e.cli_error_msg)
+
+        for offset, response in enumerate(block_responses):
+            if has_error(response):
+                failed = block_start + offset
+                raise CommandListError(commands[: failed + 1], commands[failed], response)
+        responses.extend(block_responses)
+
+    return responses
+
+
+def send_config_blocks(native, commands, block_size=CONFIG_BLOCK_SIZE, timeout=30):
+    """Send configuration commands in blocks, see ``send_command_blocks``.
+
+    The channel must already be in configuration mode.
+
+    Raises:
+        CommandListError: For the first command whose output contains an error.
+    """
+    send_command_blocks(native, commands, block_size=block_size, timeout=timeout)
+
+
+_file_transfer_classes = {}
+
+
+def _cached_hash_class(base):
+    """Subclass netmiko's ``base`` transfer to hash local files through ``pyntc.hashing``."""
+    if base not in _file_transfer_classes:
+
+        def file_md5(self, file_name, *args, **kwargs):
+            # ``add_newline`` hashes content that is not on disk as is.
+            if args or kwargs.get("add_newline"):
+                return base.file_md5(self, file_name, *args, **kwargs)
+            return get_file_hash(file_name)
+
+        _file_transfer_classes[base] = type(base.__name__, (base,), {"file_md5": file_md5})
+    return _file_transfer_classes[base]
+
+
+def file_transfer(native, src, dest, file_system):
+    """Return netmiko's SCP transfer of ``src`` for the platform of ``native``.
+
+    netmiko hashes the source file whenever a transfer is built; the subclass returned here
+    takes the digest from ``pyntc.hashing``, so an image is read once however many transfers
+    are built for it.
+    """
+    cls = _cached_hash_class(FILE_TRANSFER_MAP[native.device_type])
+    return cls(native, src, dest, file_system=file_system)
+
+
+class SSHConnectionPool(object):
+    """Process-wide pool of open netmiko connections.
+
+    Connections are keyed by ``(host, port, username, device_type)``; the host is the
+    first item of the key. A borrowed connection is health-checked with ``find_prompt``
+    and replaced when the check fails. Connections idle for longer than ``idle_timeout``
+    seconds are disconnected, and at most ``max_per_host`` connections, idle or borrowed,
+    are open to a host at any time.
+
+    Args:
+        max_per_host (int): Connections allowed per host.
+        idle_timeout (float): Seconds an unused connection is kept open.
+        acquire_timeout (float): Seconds ``acquire`` waits for a connection when a host is at its cap.
+    """
+
+    def __init__(self, max_per_host=4, idle_timeout=300, acquire_timeout=60):
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.hits = 0
+        self.misses = 0
+        self._condition = threading.Condition()
+        # Key to a list of (connection, time returned), most recently returned last.
+        self._idle = collections.defaultdict(list)
+        self._open_per_host = collections.Counter()
+
+    def _pop_expired(self, now):
+        expired = []
+        for key, idle in self._idle.items():
+            while idle and now - idle[0][1] > self.idle_timeout:
+                expired.append(idle.pop(0)[0])
+                self._open_per_host[key[0]] -= 1
+
+        return expired
+
+    def _pop_idle_of_host(self, host):
+        """Take the longest idle connection of ``host`` kept under any key."""
+        candidates = [(idle[0][1], key) for key, idle in self._idle.items() if key[0] == host and idle]
+        if not candidates:
+            return None
+
+        _, key = min(candidates)
+        self._open_per_host[host] -= 1
+        return self._idle[key].pop(0)[0]
+
+    @staticmethod
+    def _disconnect(connections):
+        for connection in connections:
+            try:
+                connection.disconnect()
+            except Exception:
+                pass
+
+    def acquire(self, key, connect):
+        """Borrow a healthy connection for ``key``, or open one with ``connect()``.
+
+        Raises:
+            ConnectionPoolExhaustedError: When the host stays at ``max_per_host`` for ``acquire_timeout`` seconds.
+        """
+        host = key[0]
+        deadline = time.time() + self.acquire_timeout
+        while True:
+            connection = None
+            stale = []
+            with self._condition:
+                while True:
+                    stale.extend(self._pop_expired(time.time()))
+                    if self._idle.get(key):
+                        connection = self._idle[key].pop()[0]
+                        break
+                    if self._open_per_host[host] < self.max_per_host:
+                        self._open_per_host[host] += 1
+                        break
+                    # Make room by closing a connection of the same host kept for another user or port.
+                    other = self._pop_idle_of_host(host)
+                    if other is not None:
+                        stale.append(other)
+                        continue
+
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        self._disconnect(stale)
+                        raise ConnectionPoolExhaustedError(host, self.max_per_host, self.acquire_timeout)
+                    self._condition.wait(remaining)
+
+            self._disconnect(stale)
+            if connection is None:
+                try:
+                    connection = connect()
+                except Exception:
+                    self._forget(host)
+                    raise
+                self.misses += 1
+                return connection
+
+            try:
+                connection.find_prompt()
+            except Exception:
+                self.discard(key, connection)
+                continue
+
+            self.hits += 1
+            return connection
+
+    def release(self, key, connection):
+        """Return a borrowed connection to the pool."""
+        with self._condition:
+            self._idle[key].append((connection, time.time()))
+            stale = self._pop_expired(time.time())
+            self._condition.notify_all()
+
+        self._disconnect(stale)
+
+    def discard(self, key, connection):
+        """Disconnect a borrowed connection that must not be reused."""
+        self._disconnect([connection])
+        self._forget(key[0])
+
+    def _forget(self, host):
+        with self._condition:
+            self._open_per_host[host] -= 1
+            self._condition.notify_all()
+
+    def clear(self):
+        """Disconnect every idle connection."""
+        with self._condition:
+            idle = [connection for key in self._idle for connection, _ in self._idle[key]]
+            for key in self._idle:
+                self._open_per_host[key[0]] -= len(self._idle[key])
+            self._idle.clear()
+            self._condition.notify_all()
+
+        self._disconnect(idle)
+
+
+ssh_pool = SSHConnectionPool()
+atexit.register(ssh_pool.clear)
@@ -1,9 +1,85 @@
+import atexit
 import paramiko
 import os
-import hashlib
 import re
+import threading
 from scp import SCPClient
+from pyntc.errors import CommandError, CommandListError
+from pyntc.hashing import get_file_hash
 from .base_file_copy import BaseFileCopy, FileTransferError
+from .resumable import open_sftp, sftp_resume_put
+
+# Output of ``verify /md5``, e.g. ``verify /md5 (flash:/EOS.swi) = d1389e46bbe1cd84f4de840621d36529``.
+MD5_RE = re.compile(r"=\s*([0-9a-fA-F]{32})")
+BYTES_FREE_RE = re.compile(r"(\d+) bytes free")
+
+
+class SSHClientCache(object):
+    """Connected paramiko clients shared by the file copies to a device.
+
+    Every ``paramiko.SSHClient`` costs a TCP connection, a key exchange and a login;
+    keeping one per host, port and username lets consecutive transfers open channels
+    on the same transport instead. Clients whose transport died are replaced.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}
+
+    @staticmethod
+    def _is_active(client):
+        transport = client.get_transport() if client is not None else None
+        return transport is not None and transport.is_active()
+
+    def get(self, device, port=22):
+        key = (device.host, port, device.username)
+        with self._lock:
+            client = self._clients.get(key)
+        if self._is_active(client):
+            return client
+
+        # Connect without holding the lock, so handshakes to different devices run concurrently.
+        ssh = paramiko.SSHClient()
+        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        ssh.connect(
+            hostname=device.host,
+            username=device.username,
+            password=device.password,
+            port=port,
+            allow_agent=False,
+            look_for_keys=False,
+        )
+
+        with self._lock:
+            current = self._clients.get(key)
+            if current is not client and self._is_active(current):
+                # Another thread connected to the same device first; keep its client.
+                stale, ssh = ssh, current
+            else:
+                stale = current
+                self._clients[key] = ssh
+        if stale is not None:
+            stale.close()
+        return ssh
+
+    def discard(self, device, port=22):
+        """Close and forget the client of a device, e.g. after a failed transfer."""
+        with self._lock:
+            client = self._clients.pop((device.host, port, device.username), None)
+        if client is not None:
+            client.close()
+
+    def clear(self, host=None):
+        """Close the clients of ``host``, or all clients."""
+        with self._lock:
+            keys = [key for key in self._clients if host is None or key[0] == host]
+            clients = [self._clients.pop(key) for key in keys]
+        for client in clients:
+            client.close()
+
+
+ssh_clients = SSHClientCache()
+atexit.register(ssh_clients.clear)
 
 
 class EOSFileCopy(BaseFileCopy):
@@ -35,13 +111,7 @@ class EOSFileCopy(BaseFileCopy):
 
     def get_local_md5(self, blocksize=2 ** 20):
         if self.local_file_exists():
-            m = hashlib.md5()
-            with open(self.local, "rb") as f:
-                buf = f.read(blocksize)
-                while buf:
-                    m.update(buf)
-                    buf = f.read(blocksize)
-            return m.hexdigest()
+            return get_file_hash(self.local, "md5", blocksize=blocksize)
 
     def get_remote_md5(self):
         try:
@@ -53,10 +123,7 @@ class EOSFileCopy(BaseFileCopy):
 
     def get_remote_size(self):
         dir_out = self.device.show("dir", raw_text=True)
-        match = re.search(r"(\d+) bytes free", dir_out)
-        bytes_free = match.group(1)
-
-        return int(bytes_free)
+        return _parse_bytes_free(dir_out)
 
     def local_file_exists(self):
         return os.path.isfile(self.local)
@@ -69,10 +136,18 @@ class EOSFileCopy(BaseFileCopy):
 
         return True
 
-    def send(self):
-        self.transfer_file()
+    def send(self, resume=False):
+        self.transfer_file(resume=resume)
 
-    def transfer_file(self, pull=False):
+    def transfer_file(self, pull=False, resume=False):
+        """Copy the file to or from the device over SCP, on the device's cached SSH transport.
+
+        Args:
+            pull (bool): Copy the remote file to the local path instead.
+            resume (bool): When sending, upload over SFTP and send only what a partial
+                remote file from an interrupted transfer lacks; see ``resumable``.
+                Falls back to a full SCP copy when the device has no SFTP server.
+        """
         if pull is False:
             if not self.local_file_exists():
                 raise FileTransferError("Could not transfer file. Local file doesn't exist.")
@@ -80,26 +155,124 @@ class EOSFileCopy(BaseFileCopy):
             if not self.enough_remote_space():
                 raise FileTransferError("Could not transfer file. Not enough space on device.")
 
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(
-            hostname=self.device.host,
-            username=self.device.username,
-            password=self.device.password,
-            port=self.port,
-            allow_agent=False,
-            look_for_keys=False,
-        )
+        _transfer(self.device, [self], pull=pull, resume=resume, port=self.port)
+        return True
+
+    @staticmethod
+    def check_remote(device, file_copies):
+        """Return the MD5 of each file's remote copy and the bytes free on the device.
+
+        The ``dir`` and all the ``verify /md5`` commands are sent in one ``show_list``.
+        If a file is missing, the device stops at its ``verify``; the files on the
+        flash listing are then verified in a second ``show_list``.
+
+        Returns:
+            tuple: ``(md5s, bytes_free)``, with None for the files missing on the device,
+            and for ``bytes_free`` if the flash could not be listed.
+        """
+        verify = ["verify /md5 {}".format(fc.remote) for fc in file_copies]
+        try:
+            responses = device.show_list(["dir"] + verify, raw_text=True)
+            return [_parse_md5(response) for response in responses[1:]], _parse_bytes_free(responses[0])
+        except CommandListError:
+            pass
+
+        try:
+            listing = device.show("dir", raw_text=True)
+        except CommandError:
+            return [fc.get_remote_md5() for fc in file_copies], None
+
+        listed = set(line.split()[-1] for line in listing.splitlines() if line.strip())
+        # Files in subdirectories are not on the listing; their verify tells.
+        present = [index for index, fc in enumerate(file_copies) if "/" in fc.remote or fc.remote in listed]
+        md5s = [None] * len(file_copies)
+        if present:
+            try:
+                responses = device.show_list([verify[index] for index in present], raw_text=True)
+                for index, response in zip(present, responses):
+                    md5s[index] = _parse_md5(response)
+            except CommandListError:
+                for index in present:
+                    md5s[index] = file_copies[index].get_remote_md5()
+
+        return md5s, _parse_bytes_free(listing)
+
+    @classmethod
+    def send_many(cls, device, file_copies, resume=False, port=22):
+        """Send the files that are not on the device yet over one SSH connection.
+
+        The remote state of all files is read with one ``check_remote`` before and one after
+        the transfer, instead of several eAPI calls per file.
+
+        Args:
+            device: The EOSDevice.
+            file_copies (list): ``EOSFileCopy`` instances of the device.
+            resume (bool): Resume partial copies over SFTP, see ``transfer_file``.
+
+        Returns:
+            list: The file copies that were transferred.
+
+        Raises:
+            FileTransferError: If a local file does not exist, the files do not fit on the
+                device, or a transferred file does not match its local file afterwards.
+        """
+        for fc in file_copies:
+            if not fc.local_file_exists():
+                raise FileTransferError("Could not transfer file {}. Local file doesn't exist.".format(fc.local))
+
+        md5s, bytes_free = cls.check_remote(device, file_copies)
+        pending = [fc for fc, md5 in zip(file_copies, md5s) if md5 is None or md5 != fc.get_local_md5()]
+        if not pending:
+            return []
+
+        if bytes_free is None:
+            bytes_free = pending[0].get_remote_size()
+        if sum(os.path.getsize(fc.local) for fc in pending) > bytes_free:
+            raise FileTransferError("Could not transfer files. Not enough space on device.")
+
+        _transfer(device, pending, resume=resume, port=port)
+
+        md5s, _ = cls.check_remote(device, pending)
+        for fc, md5 in zip(pending, md5s):
+            if md5 is None or md5 != fc.get_local_md5():
+                message = "Attempted file copy of {}, but could not validate file existed after transfer"
+                raise FileTransferError(message=message.format(fc.local))
+
+        return pending
+
+
+def _parse_md5(response):
+    match = MD5_RE.search(response)
+    return match.group(1).lower() if match else None
+
+
+def _parse_bytes_free(dir_out):
+    return int(BYTES_FREE_RE.search(dir_out).group(1))
+
+
+def _transfer(device, file_copies, pull=False, resume=False, port=22):
+    """Copy files over one SCP session, or SFTP when resuming, on the device's cached SSH client."""
+    ssh = ssh_clients.get(device, port=port)
+    try:
+        sftp = open_sftp(ssh.get_transport()) if resume and not pull else None
+        if sftp is not None:
+            try:
+                for fc in file_copies:
+                    sftp_resume_put(sftp, fc.local, fc.remote)
+            finally:
+                sftp.close()
+            return
 
         scp = SCPClient(ssh.get_transport(), socket_timeout=30.0)
         try:
-            if pull:
-                scp.get(self.remote, self.local)
-            else:
-                scp.put(self.local, self.remote)
-        except Exception as e:
-            raise FileTransferError
+            for fc in file_copies:
+                if pull:
+                    scp.get(fc.remote, fc.local)
+                else:
+                    scp.put(fc.local, fc.remote)
         finally:
             scp.close()
-
-        return True
+    except Exception:
+        # The session may be unusable; the next transfer connects again.
+        ssh_clients.discard(device, port=port)
+        raise FileTransferError
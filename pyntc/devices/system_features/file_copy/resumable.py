@@ -0,0 +1,109 @@
+"""Resumable uploads over SFTP.
+
+An interrupted transfer leaves a partial file on the device. ``resume_upload`` checks
+that file against the local one and sends only the missing tail. Devices without an
+SFTP server get ``None`` back, so drivers can fall back to a full SCP copy.
+"""
+
+import os
+
+import paramiko
+
+from .base_file_copy import FileTransferError
+
+# Bytes at the end of a partial remote file compared with the local file before resuming.
+RESUME_CHECK_SIZE = 64 * 1024
+# Bytes read from the local file per write; paramiko splits them into SFTP packets.
+UPLOAD_BLOCK_SIZE = 2 ** 20
+
+
+def open_sftp(transport):
+    """Return an SFTP client on ``transport``, or None if the device has no SFTP server."""
+    try:
+        return paramiko.SFTPClient.from_transport(transport)
+    except (paramiko.SSHException, EOFError):
+        return None
+
+
+def resume_offset(sftp, local, remote, check_size=RESUME_CHECK_SIZE):
+    """Return how many bytes of ``local`` the partial file ``remote`` already holds.
+
+    The transfer starts over (0) when ``remote`` does not exist, is not smaller than
+    ``local`` (then it is another file, as the copy was not verified), or its last
+    ``check_size`` bytes differ from the local file at the same offset.
+    """
+    try:
+        remote_size = sftp.stat(remote).st_size
+    except IOError:
+        return 0
+
+    if not remote_size or remote_size >= os.path.getsize(local):
+        return 0
+
+    start = max(remote_size - check_size, 0)
+    with sftp.open(remote, "rb") as f:
+        f.seek(start)
+        remote_tail = f.read(remote_size - start)
+    with open(local, "rb") as f:
+        f.seek(start)
+        local_tail = f.read(remote_size - start)
+
+    return remote_size if remote_tail == local_tail else 0
+
+
+def sftp_resume_put(sftp, local, remote, block_size=UPLOAD_BLOCK_SIZE):
+    """Upload ``local`` to ``remote``, sending only what a partial remote file lacks.
+
+    Returns:
+        int: The number of bytes sent.
+    """
+    offset = resume_offset(sftp, local, remote)
+    sent = 0
+    with open(local, "rb") as source:
+        with sftp.open(remote, "r+b" if offset else "wb") as target:
+            target.set_pipelined(True)
+            source.seek(offset)
+            target.seek(offset)
+            buf = source.read(block_size)
+            while buf:
+                target.write(buf)
+                sent += len(buf)
+                buf = source.read(block_size)
+
+    return sent
+
+
+def resume_upload(host, username, password, local, remote, port=22, timeout=30.0):
+    """Connect to a device and upload ``local`` over SFTP, resuming a partial ``remote``.
+
+    Returns:
+        int: The number of bytes sent, or None if the device has no SFTP server and
+        the caller should fall back to a full copy.
+
+    Raises:
+        FileTransferError: If connecting or the transfer fails.
+    """
+    ssh = paramiko.SSHClient()
+    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    try:
+        ssh.connect(
+            hostname=host,
+            username=username,
+            password=password,
+            port=port,
+            allow_agent=False,
+            look_for_keys=False,
+            timeout=timeout,
+        )
+        sftp = open_sftp(ssh.get_transport())
+        if sftp is None:
+            return None
+
+        try:
+            return sftp_resume_put(sftp, local, remote)
+        finally:
+            sftp.close()
+    except (EnvironmentError, paramiko.SSHException) as e:
+        raise FileTransferError(message="Resumable transfer of {0} failed: {1}".format(local, e))
+    finally:
+        ssh.close()
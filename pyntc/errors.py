@@ -26,6 +26,18 @@ class ConfFileNotFoundError(NTCError):
         super(ConfFileNotFoundError, self).__init__(message)
 
 
+class InventoryFormatError(NTCError):
+    def __init__(self, filename, message):
+        message = "Inventory file %s could not be read: %s" % (filename, message)
+        super(InventoryFormatError, self).__init__(message)
+
+
+class TemplateNotFoundError(NTCError):
+    def __init__(self, platform, command):
+        message = "No TextFSM template found for command %s on platform %s." % (command, platform)
+        super(TemplateNotFoundError, self).__init__(message)
+
+
 class CommandError(NTCError):
     def __init__(self, command, message):
         self.cli_error_msg = message
@@ -37,6 +49,7 @@ class CommandListError(NTCError):
     def __init__(self, commands, command, message):
         self.commands = commands
         self.command = command
+        self.cli_error_msg = message
         message = "\nCommand %s failed with message: %s" % (command, message)
         message += "\nCommand List: \n"
         for command in commands:
@@ -78,3 +91,17 @@ class NTCFileNotFoundError(NTCError):
     def __init__(self, hostname, file, dir):
         message = "{0} was not found in {1} on {2}".format(file, dir, hostname)
         super(NTCFileNotFoundError, self).__init__(message)
+
+
+class DeviceTimeoutError(NTCError):
+    def __init__(self, name, timeout):
+        message = "{0} did not finish within {1} seconds".format(name, timeout)
+        super(DeviceTimeoutError, self).__init__(message)
+
+
+class ConnectionPoolExhaustedError(NTCError):
+    def __init__(self, host, max_per_host, timeout):
+        message = "No SSH session to {0} became available within {1} seconds ({2} sessions allowed)".format(
+            host, timeout, max_per_host
+        )
+        super(ConnectionPoolExhaustedError, self).__init__(message)
@@ -0,0 +1,150 @@
+"""Run a callable against many devices concurrently.
+"""
+
+import collections
+import threading
+import time
+
+from . import ntc_device, _get_device_params_by_name
+from .devices import supported_devices
+from .errors import DeviceTimeoutError, NTCError, UnsupportedDeviceError
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+
+FleetResult = collections.namedtuple("FleetResult", ["name", "device_type", "result", "error"])
+
+
+def run(inventory, func, workers=10, timeout=None, vendor_limits=None, filename=None):
+    """Run ``func`` against every device in ``inventory`` and yield a ``FleetResult``
+    for each device as soon as it completes.
+
+    Each device is instantiated with ``ntc_device`` inside a worker thread, passed to
+    ``func`` and closed afterwards. Exceptions raised while connecting or by ``func``
+    are reported in the ``error`` field of the result instead of being raised.
+
+    Arguments:
+        inventory (list): Device names as found in the NTC configuration file, or
+            dictionaries of ``ntc_device`` kwargs that include ``device_type``.
+            A dictionary may include ``name``, which otherwise defaults to ``host``.
+        func (callable): Called with the device instance; its return value is
+            reported in the ``result`` field.
+        workers (int): Maximum number of devices worked on at the same time.
+        timeout (int): (Optional) Seconds a single device may take before a
+            ``DeviceTimeoutError`` is reported for it. The worker thread cannot be
+            interrupted, so it finishes in the background and its result is discarded;
+            until then it still counts against ``workers`` and ``vendor_limits``.
+        vendor_limits (dict): (Optional) Maximum concurrency per ``device_type``,
+            e.g. ``{"cisco_ios_ssh": 5}``. Device types not listed are only bound
+            by ``workers``.
+        filename (string): (Optional) Path to the NTC configuration file used
+            to look up device names.
+
+    Yields:
+        FleetResult: namedtuple of ``name``, ``device_type``, ``result`` and ``error``.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    vendor_limits = vendor_limits or {}
+    if any(limit < 1 for limit in vendor_limits.values()):
+        raise ValueError("vendor_limits must be at least 1")
+
+    pending = collections.OrderedDict()
+    for item in inventory:
+        try:
+            name, device_type, device_kwargs = _resolve(item, filename)
+        except NTCError as e:
+            yield FleetResult(_item_name(item), None, None, e)
+            continue
+
+        pending.setdefault(device_type, collections.deque()).append((name, device_type, device_kwargs))
+
+    results = queue.Queue()
+    running = {}
+    timed_out = set()
+    active = collections.defaultdict(int)
+
+    # Once nothing is left to start, workers that timed out are not waited for.
+    while pending or len(running) > len(timed_out):
+        for device_type in list(pending):
+            jobs = pending[device_type]
+            limit = vendor_limits.get(device_type, workers)
+            while jobs and len(running) < workers and active[device_type] < limit:
+                name, _, device_kwargs = jobs.popleft()
+                token = object()
+                deadline = time.time() + timeout if timeout is not None else None
+                running[token] = (name, device_type, deadline)
+                active[device_type] += 1
+                thread = threading.Thread(
+                    target=_worker, args=(token, results, func, device_type, device_kwargs)
+                )
+                thread.daemon = True
+                thread.start()
+
+            if not jobs:
+                del pending[device_type]
+
+        deadlines = [deadline for _, _, deadline in running.values() if deadline is not None]
+        wait_time = max(min(deadlines) - time.time(), 0) if deadlines else None
+        try:
+            token, result, error = results.get(timeout=wait_time)
+        except queue.Empty:
+            pass
+        else:
+            name, device_type, _ = running.pop(token)
+            active[device_type] -= 1
+            # Results of devices that already timed out are discarded.
+            if token in timed_out:
+                timed_out.remove(token)
+            else:
+                yield FleetResult(name, device_type, result, error)
+
+        now = time.time()
+        for token, (name, device_type, deadline) in list(running.items()):
+            if deadline is not None and deadline <= now:
+                # The slot stays taken until the worker thread actually returns.
+                running[token] = (name, device_type, None)
+                timed_out.add(token)
+                yield FleetResult(name, device_type, None, DeviceTimeoutError(name, timeout))
+
+
+def _item_name(item):
+    if isinstance(item, dict):
+        return item.get("name", item.get("host"))
+    return item
+
+
+def _resolve(item, filename):
+    if isinstance(item, dict):
+        device_kwargs = dict(item)
+        name = device_kwargs.pop("name", device_kwargs.get("host"))
+        device_type = device_kwargs.pop("device_type", None)
+    else:
+        name = item
+        device_type, device_kwargs = _get_device_params_by_name(name, filename=filename)
+
+    if device_type not in supported_devices:
+        raise UnsupportedDeviceError(device_type)
+
+    return name, device_type, device_kwargs
+
+
+def _worker(token, results, func, device_type, device_kwargs):
+    result = error = None
+    try:
+        device = ntc_device(device_type, **device_kwargs)
+        try:
+            result = func(device)
+        finally:
+            try:
+                device.close()
+            except Exception:
+                pass
+    except Exception as e:
+        error = e
+
+    results.put((token, result, error))
@@ -0,0 +1,269 @@
+"""Hashing of local files, cached by file identity.
+
+Drivers compare the hash of a local image with the copy on the device before and
+after every transfer. Digests are cached per file identity (st_dev, inode, size and
+mtime_ns), so an unchanged file is read at most once per process. Setting the
+``PYNTC_HASH_INDEX`` environment variable to a file path also persists them to a
+small on-disk index, so later runs skip hashing entirely.
+
+Files are memory-mapped and every digest is computed in the same pass. Hashing a
+large image can be started in a background thread with ``prefetch_file_hash``, so it
+overlaps with connecting to the device; the later ``get_file_hash`` waits for it.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent import futures
+
+HASH_INDEX_ENV_VAR = "PYNTC_HASH_INDEX"
+HASH_ALGORITHMS = ("md5", "sha256")
+
+
+def _file_key(stat):
+    mtime_ns = getattr(stat, "st_mtime_ns", None)
+    if mtime_ns is None:
+        mtime_ns = int(stat.st_mtime * 1e9)
+
+    return "{0}:{1}:{2}:{3}".format(stat.st_dev, stat.st_ino, stat.st_size, mtime_ns)
+
+
+def _map_file(f):
+    """Map an open file read-only, or return None for files that cannot be mapped, e.g. empty ones."""
+    try:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, EnvironmentError):
+        return None
+
+    if hasattr(data, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+        data.madvise(mmap.MADV_SEQUENTIAL)
+    return data
+
+
+def _hash_mapping(data, hashes, blocksize):
+    try:
+        view = memoryview(data)
+    except TypeError:
+        # Python 2 mmap objects do not support memoryview, so hash copies of each block.
+        for offset in range(0, len(data), blocksize):
+            block = data[offset : offset + blocksize]
+            for _, hasher in hashes:
+                hasher.update(block)
+        return
+
+    with view:
+        for offset in range(0, len(view), blocksize):
+            with view[offset : offset + blocksize] as block:
+                for _, hasher in hashes:
+                    hasher.update(block)
+
+
+def hash_file(path, algorithms=HASH_ALGORITHMS, blocksize=2 ** 20):
+    """Read ``path`` once and return a dictionary of hex digests keyed by algorithm name.
+
+    The file is memory-mapped and each block is passed to every hasher as a view of the
+    mapping, so no data is copied into Python buffers however many digests are computed.
+    On Python 2, which cannot take a view of a mapping, each block is copied once.
+    """
+    hashes = [(algorithm, hashlib.new(algorithm)) for algorithm in algorithms]
+    with open(path, "rb") as f:
+        data = _map_file(f)
+        if data is None:
+            buf = f.read(blocksize)
+            while buf:
+                for _, hasher in hashes:
+                    hasher.update(buf)
+                buf = f.read(blocksize)
+        else:
+            try:
+                _hash_mapping(data, hashes, blocksize)
+            finally:
+                data.close()
+
+    return dict((algorithm, hasher.hexdigest()) for algorithm, hasher in hashes)
+
+
+_hash_executor = None
+_hash_executor_lock = threading.Lock()
+
+
+def _background_executor():
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            _hash_executor = futures.ThreadPoolExecutor(max_workers=2)
+        return _hash_executor
+
+
+class FileHashCache(object):
+    """Cache of local file digests keyed by file identity.
+
+    Args:
+        index_file (str): Path of the persistent index. Defaults to the ``PYNTC_HASH_INDEX``
+            environment variable. If neither is set, or either is an empty string, the
+            cache is kept in memory only.
+        max_entries (int): Number of files remembered; the oldest entries are dropped first.
+    """
+
+    def __init__(self, index_file=None, max_entries=1024):
+        self.index_file = index_file
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._loaded_from = None
+        self._pending = {}
+
+    def _index_path(self):
+        if self.index_file is not None:
+            index_file = self.index_file
+        else:
+            index_file = os.environ.get(HASH_INDEX_ENV_VAR)
+
+        return os.path.expanduser(index_file) if index_file else None
+
+    def _read_index(self, index_path):
+        try:
+            with open(index_path) as f:
+                entries = json.load(f, object_pairs_hook=OrderedDict)
+        except (IOError, OSError, ValueError):
+            return OrderedDict()
+
+        return entries if isinstance(entries, dict) else OrderedDict()
+
+    def _write_index(self, index_path, key, digests):
+        # Merge with the index on disk so concurrent processes do not drop each other's entries.
+        entries = self._read_index(index_path)
+        entries.pop(key, None)
+        entries[key] = digests
+        for stale_key in list(entries)[: max(len(entries) - self.max_entries, 0)]:
+            del entries[stale_key]
+
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(index_path) or ".")
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f)
+            getattr(os, "replace", os.rename)(temp_path, index_path)
+        except (IOError, OSError):
+            # The index is only an optimization.
+            pass
+
+    def _load(self, index_path):
+        if self._loaded_from != index_path:
+            self._entries = self._read_index(index_path) if index_path else OrderedDict()
+            self._loaded_from = index_path
+
+    def _lookup(self, path, algorithm):
+        """Return ``(key, index path, cached digests or None)``, counting a hit or a miss."""
+        key = _file_key(os.stat(path))
+        index_path = self._index_path()
+        with self._lock:
+            self._load(index_path)
+            digests = self._entries.get(key)
+            if digests is not None and algorithm in digests:
+                self.hits += 1
+                return key, index_path, digests
+            self.misses += 1
+
+        return key, index_path, None
+
+    def _hash(self, path, key, index_path, algorithm, blocksize):
+        algorithms = HASH_ALGORITHMS if algorithm in HASH_ALGORITHMS else HASH_ALGORITHMS + (algorithm,)
+        digests = hash_file(path, algorithms=algorithms, blocksize=blocksize)
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = digests
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+            if index_path:
+                self._write_index(index_path, key, digests)
+
+        return digests
+
+    def _hash_pending(self, path, key, index_path, algorithm, blocksize):
+        try:
+            return self._hash(path, key, index_path, algorithm, blocksize)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def get(self, path, algorithm="md5", blocksize=2 ** 20):
+        """Return the hex digest of ``path``, or None if it is not a file.
+
+        Every algorithm in ``HASH_ALGORITHMS`` is computed in the same pass over the
+        file, so asking for another digest of the same file later is free. If the file
+        is being hashed by ``prefetch``, its result is waited for instead.
+        """
+        if not os.path.isfile(path):
+            return None
+
+        key, index_path, digests = self._lookup(path, algorithm)
+        if digests is not None:
+            return digests[algorithm]
+
+        with self._lock:
+            # A prefetch may have finished since the lookup.
+            digests = self._entries.get(key)
+            pending = self._pending.get(key)
+        if digests is None and pending is not None:
+            digests = pending.result()
+        if digests is not None and algorithm in digests:
+            return digests[algorithm]
+
+        return self._hash(path, key, index_path, algorithm, blocksize)[algorithm]
+
+    def prefetch(self, path, algorithm="md5", blocksize=2 ** 20):
+        """Start hashing ``path`` in a background thread unless its digests are cached.
+
+        Drivers call this before connecting to a device for a transfer, so hashing a
+        large image overlaps with the handshake instead of following it.
+
+        Returns:
+            concurrent.futures.Future: Of the digests, or None if ``path`` is not a file
+            or is already hashed.
+        """
+        if not os.path.isfile(path):
+            return None
+
+        key, index_path, digests = self._lookup(path, algorithm)
+        if digests is not None:
+            return None
+
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = _background_executor().submit(
+                    self._hash_pending, path, key, index_path, algorithm, blocksize
+                )
+
+        return pending
+
+    def clear(self):
+        """Forget all in-memory digests and reset the counters. The on-disk index is kept.
+        """
+        with self._lock:
+            self._entries = OrderedDict()
+            self._loaded_from = None
+            self.hits = 0
+            self.misses = 0
+
+
+file_hash_cache = FileHashCache()
+
+
+def get_file_hash(path, algorithm="md5", blocksize=2 ** 20):
+    """Return the cached hex digest of a local file, or None if the file does not exist.
+    """
+    return file_hash_cache.get(path, algorithm=algorithm, blocksize=blocksize)
+
+
+def prefetch_file_hash(path, algorithm="md5", blocksize=2 ** 20):
+    """Start hashing a local file in the background, see ``FileHashCache.prefetch``.
+    """
+    return file_hash_cache.prefetch(path, algorithm=algorithm, blocksize=blocksize)
@@ -0,0 +1,192 @@
+"""Device inventories indexed by name.
+
+An inventory file is parsed once into a ``name -> (device_type, kwargs)`` index and
+parsed again only when the file's mtime or size changes. Three formats are read,
+chosen by the file extension:
+
+* INI (the NTC configuration file), one ``[device_type:name]`` section per device.
+* JSON (``.json``) and YAML (``.yml``, ``.yaml``), a mapping of device name to the
+  device's ``ntc_device`` kwargs, which must include ``device_type``::
+
+      spine1:
+        device_type: arista_eos_eapi
+        host: 10.0.0.1
+        username: admin
+        password: admin
+
+YAML inventories need PyYAML (``pip install pyntc[yaml]``). As with the NTC
+configuration file, ``host`` defaults to the device name.
+"""
+
+import json
+import os
+import threading
+
+from .errors import ConfFileNotFoundError, DeviceNameNotFoundError, InventoryFormatError
+
+try:
+    from configparser import ConfigParser as SafeConfigParser
+except ImportError:
+    from ConfigParser import SafeConfigParser
+
+YAML_EXTENSIONS = (".yml", ".yaml")
+
+
+class Inventory(object):
+    """A device inventory file, indexed by device name.
+
+    Args:
+        filename (str): Path of the inventory file.
+    """
+
+    def __init__(self, filename):
+        self.filename = os.path.abspath(os.path.expanduser(filename))
+        self._lock = threading.Lock()
+        self._index = {}
+        self._stamp = None
+
+    def __contains__(self, name):
+        return name in self._load()
+
+    def __iter__(self):
+        return iter(self.names())
+
+    def __len__(self):
+        return len(self._load())
+
+    def _load(self):
+        """Return the index, parsing the file again if it changed since it was last read."""
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            raise ConfFileNotFoundError(self.filename)
+
+        stamp = (getattr(stat, "st_mtime_ns", stat.st_mtime), stat.st_size)
+        with self._lock:
+            if stamp != self._stamp:
+                self._index = self._parse()
+                self._stamp = stamp
+
+            index = self._index
+
+        if not index:
+            raise ConfFileNotFoundError(self.filename)
+
+        return index
+
+    def _params(self, index, name, overrides=None):
+        try:
+            device_type, device_kwargs = index[name]
+        except KeyError:
+            raise DeviceNameNotFoundError(name, self.filename)
+
+        device_kwargs = dict(device_kwargs, **(overrides or {}))
+        device_kwargs.setdefault("host", name)
+        return device_type, device_kwargs
+
+    def _parse(self):
+        extension = os.path.splitext(self.filename)[1].lower()
+        if extension == ".json" or extension in YAML_EXTENSIONS:
+            return self._parse_mapping(extension)
+
+        return self._parse_ini()
+
+    def _parse_ini(self):
+        config = SafeConfigParser()
+        config.read(self.filename)
+
+        index = {}
+        for section in config.sections():
+            if ":" in section:
+                device_type, name = section.split(":")[:2]
+                # The first section of a name wins, as it always has for ntc_device_by_name.
+                if name not in index:
+                    index[name] = (device_type, dict(config.items(section)))
+
+        return index
+
+    def _parse_mapping(self, extension):
+        if extension == ".json":
+            load, parse_errors = json.load, (ValueError,)
+        else:
+            # PyYAML is imported here rather than with the module, so import pyntc stays cheap.
+            try:
+                import yaml
+            except ImportError:
+                raise InventoryFormatError(self.filename, "reading YAML inventories requires PyYAML")
+            load, parse_errors = yaml.safe_load, (ValueError, yaml.YAMLError)
+
+        with open(self.filename) as f:
+            try:
+                devices = load(f)
+            except parse_errors as e:
+                raise InventoryFormatError(self.filename, str(e))
+
+        if devices is None:
+            return {}
+        if not isinstance(devices, dict):
+            raise InventoryFormatError(self.filename, "expected a mapping of device name to parameters")
+
+        index = {}
+        for name, params in devices.items():
+            if not isinstance(params, dict) or "device_type" not in params:
+                raise InventoryFormatError(self.filename, "device %s has no device_type" % name)
+
+            device_kwargs = dict(params)
+            index[str(name)] = (device_kwargs.pop("device_type"), device_kwargs)
+
+        return index
+
+    def get(self, name):
+        """Return the ``device_type`` and ``ntc_device`` kwargs of ``name``.
+
+        Raises:
+            DeviceNameNotFoundError: if ``name`` is not in the inventory.
+            ConfFileNotFoundError: if the file does not exist or lists no devices.
+        """
+        return self._params(self._load(), name)
+
+    def names(self):
+        """Return the names of all devices in the inventory, sorted."""
+        return sorted(self._load())
+
+    def device(self, name, **kwargs):
+        """Instantiate the device ``name``; ``kwargs`` override the inventory's, e.g. ``lazy=True``."""
+        return self.devices([name], **kwargs)[0]
+
+    def devices(self, names=None, **kwargs):
+        """Instantiate several devices with a single check of the file.
+
+        Args:
+            names (list): Device names; all devices in the inventory when omitted.
+            kwargs: Passed to every device, overriding the inventory's values, e.g. ``lazy=True``.
+
+        Returns:
+            list: The devices, in the order of ``names``.
+
+        Raises:
+            DeviceNameNotFoundError: if a name is not in the inventory; no device is created then.
+        """
+        from . import ntc_device
+
+        index = self._load()
+        if names is None:
+            names = sorted(index)
+
+        params = [self._params(index, name, kwargs) for name in names]
+        return [ntc_device(device_type, **device_kwargs) for device_type, device_kwargs in params]
+
+
+_inventories = {}
+_inventories_lock = threading.Lock()
+
+
+def get_inventory(filename):
+    """Return the shared ``Inventory`` of ``filename``, so each file is indexed once per process."""
+    key = os.path.abspath(os.path.expanduser(filename))
+    with _inventories_lock:
+        inventory = _inventories.get(key)
+        if inventory is None:
+            inventory = _inventories[key] = Inventory(key)
+
+    return inventory
@@ -1,28 +1,336 @@
+import collections
+import itertools
+import multiprocessing
 import os
+import threading
+from concurrent import futures
+
 import textfsm
 
+from ..data_model.converters import numeric_column
+from ..errors import TemplateNotFoundError
+
 TEMPLATE_PATH_ENV_VAR = "NTC_TEMPLATES"
+TEMPLATE_EXTENSION = ".template"
+# Shortest keyword of a template name taken as an abbreviation of a longer word in a
+# command, e.g. ``int`` for ``interface``; shorter ones such as ``ip`` must match exactly.
+MIN_ABBREVIATION = 3
+
+
+class CompiledTemplate(object):
+    """A TextFSM template that has been read and compiled once.
+
+    Compiled ``textfsm.TextFSM`` objects are stateful, so instances are kept in a
+    small free list and handed out one per parse. An instance is ``Reset`` before
+    being reused, which is far cheaper than re-reading and re-compiling the template.
+    """
+
+    def __init__(self, path, stamp):
+        self.path = path
+        self.stamp = stamp
+        self._lock = threading.Lock()
+        self._free = [self._compile()]
+        self.header = [field.lower() for field in self._free[0].header]
+
+    def _compile(self):
+        with open(self.path) as template:
+            return textfsm.TextFSM(template)
+
+    def acquire(self):
+        """Return a compiled FSM in its start state, compiling another if all are in use.
+        """
+        with self._lock:
+            fsm = self._free.pop() if self._free else None
+
+        if fsm is None:
+            return self._compile()
+
+        fsm.Reset()
+        return fsm
+
+    def release(self, fsm):
+        """Return an FSM obtained from ``acquire`` to the free list.
+        """
+        with self._lock:
+            self._free.append(fsm)
+
+    def parse(self, rawtxt):
+        """Parse ``rawtxt`` and return the table as a list of lists.
+        """
+        fsm = self.acquire()
+        try:
+            return fsm.ParseText(rawtxt)
+        finally:
+            self.release(fsm)
+
+    def iter_parse(self, lines):
+        """Parse an iterable of lines, yielding each row as a list once its record is complete.
+
+        Rows are yielded while ``lines`` is still being read, so neither the whole text nor
+        the whole table is held in memory. Templates with ``Fillup`` values change rows
+        already recorded, so they, and versions of textfsm that ``_stream_rows`` does not
+        support, parse the whole text with ``ParseText`` instead.
+        """
+        fsm = self.acquire()
+        try:
+            fillup = any("Fillup" in value.OptionNames() for value in fsm.values)
+            if fillup or not all(hasattr(fsm, member) for member in _STREAMING_MEMBERS):
+                rows = fsm.ParseText("".join(line.rstrip("\r\n") + "\n" for line in lines))
+            else:
+                rows = _stream_rows(fsm, lines)
+            for row in rows:
+                yield row
+        finally:
+            self.release(fsm)
+
+
+# textfsm has no public API to feed a line at a time, so _stream_rows replays ParseText
+# with these private members.
+_STREAMING_MEMBERS = ("_AppendRecord", "_CheckLine", "_cur_state_name", "_result")
+
+
+def _stream_rows(fsm, lines):
+    """Feed ``lines`` to ``fsm`` as ``ParseText`` does, yielding rows as they are recorded."""
+    result = fsm._result
+    for line in lines:
+        fsm._CheckLine(line.rstrip("\r\n"))
+        for row in result:
+            yield row
+        del result[:]
+        if fsm._cur_state_name in ("End", "EOF"):
+            break
+
+    # As ParseText does, the end of the input records the current record unless
+    # the template has an EOF state of its own.
+    if fsm._cur_state_name != "End" and "EOF" not in fsm.states:
+        fsm._AppendRecord()
+    for row in result:
+        yield row
+
+
+class TemplateCache(object):
+    """Process-wide cache of compiled TextFSM templates.
+
+    Entries are keyed by the resolved template path, so changing ``NTC_TEMPLATES``
+    naturally selects different entries, and are invalidated when the file's
+    mtime or size changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._templates = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, template_file):
+        """Return the ``CompiledTemplate`` for ``template_file``.
+        """
+        path = os.path.realpath(template_file)
+        stat = os.stat(path)
+        stamp = (stat.st_mtime, stat.st_size)
+
+        with self._lock:
+            template = self._templates.get(path)
+            if template is not None and template.stamp == stamp:
+                self.hits += 1
+                return template
+            self.misses += 1
+
+        template = CompiledTemplate(path, stamp)
+        with self._lock:
+            self._templates[path] = template
+
+        return template
+
+    def clear(self):
+        """Drop all compiled templates and reset the counters.
+        """
+        with self._lock:
+            self._templates.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Return a dictionary of cache statistics.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._templates)}
+
+
+template_cache = TemplateCache()
+
+
+class _CommandNode(object):
+    """A keyword of the command tree of a platform's templates."""
+
+    __slots__ = ("children", "prefixes", "template_name")
+
+    def __init__(self):
+        self.children = {}
+        # Every prefix of a child keyword that selects only that keyword.
+        self.prefixes = {}
+        self.template_name = None
+
+    def add(self, keyword):
+        node = self.children.get(keyword)
+        if node is None:
+            node = self.children[keyword] = _CommandNode()
+            for end in range(1, len(keyword)):
+                prefix = keyword[:end]
+                if prefix not in self.children:
+                    self.prefixes[prefix] = keyword if prefix not in self.prefixes else None
+            self.prefixes[keyword] = keyword
+        return node
+
+    def child(self, word):
+        keyword = self.prefixes.get(word)
+        if keyword is None:
+            # The template name may itself abbreviate the word, as in ``show_ip_int_brief``.
+            for end in range(len(word) - 1, MIN_ABBREVIATION - 1, -1):
+                if word[:end] in self.children:
+                    keyword = word[:end]
+                    break
+            else:
+                return None
+        return self.children[keyword]
+
+
+class TemplateIndex(object):
+    """Index of the templates of a directory by platform and command.
+
+    Template files are named ``<platform>_<command words>.template`` with the words
+    joined by underscores, e.g. ``cisco_ios_show_ip_int_brief.template``. The directory
+    is listed once; a command is then matched word by word against the keyword tree
+    of its platform, accepting the abbreviations the CLI accepts (``show ip int br``,
+    ``sh ip interface brief``), and remembered so later lookups are a dictionary hit.
+
+    Args:
+        template_dir (str): Directory holding the templates.
+    """
+
+    # Remembered lookups, including misses, kept per index before starting over.
+    max_resolved = 4096
+
+    def __init__(self, template_dir):
+        self.template_dir = template_dir
+        self._platforms = {}
+        self._resolved = {}
+        for filename in sorted(os.listdir(template_dir)):
+            if not filename.endswith(TEMPLATE_EXTENSION):
+                continue
+            words = filename[: -len(TEMPLATE_EXTENSION)].split("_")
+            if len(words) < 3:
+                continue
+
+            node = self._platforms.setdefault("_".join(words[:2]), _CommandNode())
+            for keyword in words[2:]:
+                node = node.add(keyword)
+            node.template_name = filename
+
+    def platforms(self):
+        """Return the platforms that have templates, sorted."""
+        return sorted(self._platforms)
+
+    def _resolve(self, platform, words):
+        node = self._platforms.get(platform)
+        for word in words:
+            if node is None:
+                return None
+            node = node.child(word)
+        return node.template_name if node is not None else None
+
+    def lookup(self, platform, command):
+        """Return the name of the template parsing ``command`` on ``platform``.
+
+        Raises:
+            TemplateNotFoundError: if no template matches the whole command.
+        """
+        key = (platform, " ".join(command.lower().split()))
+        try:
+            template_name = self._resolved[key]
+        except KeyError:
+            template_name = self._resolve(platform, key[1].split(" "))
+            if len(self._resolved) >= self.max_resolved:
+                self._resolved.clear()
+            self._resolved[key] = template_name
+
+        if template_name is None:
+            raise TemplateNotFoundError(platform, command)
+        return template_name
+
 
+_template_indexes = {}
+_template_indexes_lock = threading.Lock()
 
-def get_structured_data(template_name, rawtxt):
+
+def get_template_index(template_dir=None):
+    """Return the ``TemplateIndex`` of ``template_dir``, by default the current template directory.
+
+    Each directory is indexed once per process, the first time a template is looked up in it.
+    """
+    template_dir = os.path.realpath(template_dir or get_template_dir())
+    index = _template_indexes.get(template_dir)
+    if index is None:
+        with _template_indexes_lock:
+            index = _template_indexes.get(template_dir)
+            if index is None:
+                index = _template_indexes[template_dir] = TemplateIndex(template_dir)
+
+    return index
+
+
+def find_template(platform, command):
+    """Return the name of the template parsing ``command`` on ``platform``, e.g. ``cisco_ios``.
+
+    Raises:
+        TemplateNotFoundError: if no template matches the command.
+    """
+    return get_template_index().lookup(platform, command)
+
+
+def get_structured_data(template_name, rawtxt, columnar=False, numeric=()):
     """Returns structured data given raw text using
     TextFSM templates
+
+    With ``columnar``, return one list per template field instead of one dictionary
+    per row; the fields named in ``numeric`` are returned as NumPy arrays (see
+    ``pyntc.data_model.converters.numeric_column``).
     """
-    template_file = get_template(template_name)
-    with open(template_file) as template:
-        fsm = textfsm.TextFSM(template)
-        table = fsm.ParseText(rawtxt)
+    template = template_cache.get(get_template(template_name))
+    table = template.parse(rawtxt)
 
-        structured_data = []
-        for row in table:
-            temp_dict = {}
-            for index, element in enumerate(row):
-                temp_dict[fsm.header[index].lower()] = element
-            structured_data.append(temp_dict)
+    if columnar:
+        columns = dict(zip(template.header, (list(column) for column in zip(*table))))
+        for field in template.header:
+            columns.setdefault(field, [])
+        for field in numeric:
+            columns[field] = numeric_column(columns[field])
+        return columns
+
+    structured_data = []
+    for row in table:
+        structured_data.append(dict(zip(template.header, row)))
 
     return structured_data
 
 
+def iter_structured_data(template_name, lines):
+    """Yield structured data, a dictionary per row, from raw text read line by line.
+
+    The streaming counterpart of ``get_structured_data`` for very large outputs: rows
+    are yielded as their records complete, so memory stays flat however long the output.
+
+    Args:
+        template_name (str): Name of the TextFSM template.
+        lines: Iterable of lines, with or without line endings, e.g. an open file or
+            the generator returned by a driver's ``show_lines``.
+    """
+    template = template_cache.get(get_template(template_name))
+    header = template.header
+    for row in template.iter_parse(lines):
+        yield dict(zip(header, row))
+
+
 def get_template(template_name):
     template_dir = get_template_dir()
     return os.path.join(template_dir, template_name)
@@ -33,3 +341,146 @@ def get_template_dir():
         return os.environ[TEMPLATE_PATH_ENV_VAR]
     except KeyError:
         return os.path.realpath(os.path.dirname(__file__))
+
+
+def template_cache_info():
+    """Return hit/miss counters and the number of compiled templates in the cache.
+    """
+    return template_cache.info()
+
+
+def clear_template_cache():
+    """Drop every compiled template, forcing the next parse to re-read its file.
+    """
+    template_cache.clear()
+
+
+_worker_setup = None
+
+
+def _init_parse_worker(template_dir, template_names):
+    """Point a pool worker at the parent's templates and compile the given ones up front."""
+    if template_dir is not None:
+        os.environ[TEMPLATE_PATH_ENV_VAR] = template_dir
+    for template_name in template_names:
+        template_cache.get(get_template(template_name))
+
+
+def _parse_chunk(jobs, setup):
+    """Parse ``(template_name, rawtxt)`` jobs in a pool worker, returning ``(result, error)`` pairs.
+
+    ``setup`` is the ``_init_parse_worker`` arguments, applied the first time a worker
+    sees them; the Python 2 ``ProcessPoolExecutor`` has no ``initializer``.
+    """
+    global _worker_setup
+    if setup != _worker_setup:
+        _init_parse_worker(*setup)
+        _worker_setup = setup
+
+    results = []
+    for template_name, rawtxt in jobs:
+        try:
+            results.append((get_structured_data(template_name, rawtxt), None))
+        except Exception as e:
+            results.append((None, e))
+    return results
+
+
+class ParsePool(object):
+    """Parse many raw outputs with TextFSM on a pool of worker processes.
+
+    TextFSM is pure Python, so parsing in threads serializes on the GIL. Jobs are
+    sent to the workers in chunks, and every worker keeps its compiled templates in
+    its own ``template_cache``, so each template is compiled once per worker. Only
+    a few chunks per worker are in flight at a time, so a long stream of jobs is
+    not read ahead of the results.
+
+    Args:
+        processes (int): Number of worker processes; the number of CPUs by default.
+        templates (list): Template names each worker compiles when it starts.
+        chunksize (int): Number of jobs sent to a worker at once.
+
+    Example:
+        >>> with ParsePool() as pool:
+        ...     for rows in pool.imap(("cisco_ios_show_version.template", text) for text in outputs):
+        ...         print(rows)
+    """
+
+    def __init__(self, processes=None, templates=(), chunksize=8):
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1")
+
+        self.processes = processes or multiprocessing.cpu_count()
+        self.chunksize = chunksize
+        self._setup = (os.environ.get(TEMPLATE_PATH_ENV_VAR), tuple(templates))
+        self._executor = futures.ProcessPoolExecutor(max_workers=self.processes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _submit_chunks(self, jobs):
+        """Yield ``(first index, future)`` per chunk, submitting each chunk when it is asked for."""
+        jobs = iter(jobs)
+        for index in itertools.count(0, self.chunksize):
+            chunk = list(itertools.islice(jobs, self.chunksize))
+            if not chunk:
+                return
+            yield index, self._executor.submit(_parse_chunk, chunk, self._setup)
+
+    def imap(self, jobs):
+        """Parse ``(template_name, rawtxt)`` jobs and yield their structured data in the order of ``jobs``.
+
+        Raises:
+            The exception parsing a job raised, e.g. ``textfsm.TextFSMError``, when its result is reached.
+        """
+        chunks = self._submit_chunks(jobs)
+        in_flight = collections.deque(future for _, future in itertools.islice(chunks, self.processes * 2))
+        while in_flight:
+            results = in_flight.popleft().result()
+            for _, future in itertools.islice(chunks, 1):
+                in_flight.append(future)
+            for result, error in results:
+                if error is not None:
+                    raise error
+                yield result
+
+    def imap_unordered(self, jobs):
+        """Parse ``(template_name, rawtxt)`` jobs and yield ``(index, structured data)`` as chunks complete.
+
+        ``index`` is the position of the job in ``jobs``.
+
+        Raises:
+            The exception parsing a job raised, e.g. ``textfsm.TextFSMError``, when its result is reached.
+        """
+        chunks = self._submit_chunks(jobs)
+        in_flight = dict((future, index) for index, future in itertools.islice(chunks, self.processes * 2))
+        while in_flight:
+            done, _ = futures.wait(in_flight, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                index = in_flight.pop(future)
+                for next_index, next_future in itertools.islice(chunks, 1):
+                    in_flight[next_future] = next_index
+                for offset, (result, error) in enumerate(future.result()):
+                    if error is not None:
+                        raise error
+                    yield index + offset, result
+
+    def close(self):
+        """Shut the worker processes down, waiting for the chunks in flight."""
+        self._executor.shutdown(wait=True)
+
+
+def parse_many(jobs, processes=None, ordered=True, chunksize=8):
+    """Parse ``(template_name, rawtxt)`` jobs on a temporary ``ParsePool``.
+
+    Returns:
+        list: The structured data of every job in the order of ``jobs``, or with
+        ``ordered=False``, ``(index, structured data)`` pairs in the order they completed.
+    """
+    with ParsePool(processes=processes, chunksize=chunksize) as pool:
+        if ordered:
+            return list(pool.imap(jobs))
+        return list(pool.imap_unordered(jobs))
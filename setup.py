@@ -26,8 +26,12 @@ install_requires = [
     "pyeapi",
     "junos-eznc",
     "scp",
+    'futures; python_version < "3"',
 ]
 
+# The asyncio drivers (AsyncEOSDevice, AsyncNXOSDevice) need Python 3.7 or later.
+extras_require = {"async": ['aiohttp; python_version >= "3.7"'], "yaml": ["pyyaml"], "numpy": ["numpy"]}
+
 dependency_links = []
 
 author = "Network To Code"
@@ -42,6 +46,7 @@ setup(
     packages=packages,
     package_data=package_data,
     install_requires=install_requires,
+    extras_require=extras_require,
     dependency_links=dependency_links,
     url=url,
     download_url=download_url,
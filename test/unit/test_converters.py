@@ -0,0 +1,97 @@
+import unittest
+
+from pyntc.data_model.converters import compile_key_map, convert_dict_by_key, convert_list_by_key, numeric_column
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+KEY_MAP = {
+    'name': 'interface',
+    'speed': ['status', 'bandwidth'],
+    'vlan': ['vlanInformation', 'vlanId'],
+}
+ROW = {
+    'interface': 'Ethernet1',
+    'status': {'bandwidth': 10000},
+    'vlanInformation': None,
+    'description': 'uplink',
+    'duplex': 'full',
+}
+
+
+class TestConverters(unittest.TestCase):
+
+    def test_convert_dict_by_key(self):
+        self.assertEqual(
+            convert_dict_by_key(ROW, KEY_MAP),
+            {'name': 'Ethernet1', 'speed': 10000, 'vlan': None},
+        )
+
+    def test_fill_in(self):
+        self.assertEqual(
+            convert_dict_by_key(ROW, KEY_MAP, fill_in=True),
+            {'name': 'Ethernet1', 'speed': 10000, 'vlan': None, 'status': {'bandwidth': 10000},
+             'vlanInformation': None, 'description': 'uplink', 'duplex': 'full'},
+        )
+
+    def test_fill_in_whitelist(self):
+        converted = convert_dict_by_key(ROW, KEY_MAP, fill_in=True, whitelist=['interface', 'duplex', 'missing'])
+        self.assertEqual(converted, {'name': 'Ethernet1', 'speed': 10000, 'vlan': None, 'duplex': 'full'})
+
+    def test_fill_in_blacklist(self):
+        converted = convert_dict_by_key(ROW, KEY_MAP, fill_in=True, blacklist=['status', 'vlanInformation'])
+        self.assertEqual(
+            converted,
+            {'name': 'Ethernet1', 'speed': 10000, 'vlan': None, 'description': 'uplink', 'duplex': 'full'},
+        )
+
+    def test_compile_key_map(self):
+        convert = compile_key_map(KEY_MAP, fill_in=True, whitelist=['description'])
+        rows = [dict(ROW, interface='Ethernet%d' % index) for index in range(3)]
+        self.assertEqual([convert(row) for row in rows], convert_list_by_key(rows, KEY_MAP, fill_in=True,
+                                                                             whitelist=['description']))
+        self.assertEqual(convert(rows[2])['name'], 'Ethernet2')
+
+    def test_compile_key_map_snapshot(self):
+        key_map = dict(KEY_MAP)
+        convert = compile_key_map(key_map)
+        key_map['extra'] = 'duplex'
+        self.assertNotIn('extra', convert(ROW))
+
+    def test_columnar_matches_rows(self):
+        rows = [ROW, {'interface': 'Ethernet2', 'mtu': 9214}, {}]
+        for kwargs in ({}, {'fill_in': True}, {'fill_in': True, 'whitelist': ['mtu', 'interface']},
+                       {'fill_in': True, 'blacklist': ['status']}):
+            converted = convert_list_by_key(rows, KEY_MAP, **kwargs)
+            columns = convert_list_by_key(rows, KEY_MAP, columnar=True, **kwargs)
+            keys = set(key for row in converted for key in row)
+            self.assertEqual(set(columns), keys)
+            for key in keys:
+                self.assertEqual(columns[key], [row.get(key) for row in converted])
+
+    def test_columnar_empty(self):
+        self.assertEqual(convert_list_by_key([], KEY_MAP, columnar=True), {'name': [], 'speed': [], 'vlan': []})
+
+    @unittest.skipIf(numpy is None, 'requires numpy')
+    def test_columnar_numeric(self):
+        rows = [ROW, {'interface': 'Ethernet2', 'status': {'bandwidth': '1000'}}]
+        columns = convert_list_by_key(rows, KEY_MAP, columnar=True, numeric=['speed'])
+        self.assertEqual(columns['speed'].dtype, numpy.int64)
+        self.assertEqual(columns['speed'].tolist(), [10000, 1000])
+        self.assertEqual(columns['name'], ['Ethernet1', 'Ethernet2'])
+
+    @unittest.skipIf(numpy is None, 'requires numpy')
+    def test_numeric_column_missing_values(self):
+        column = numeric_column(['1.5', None, ''])
+        self.assertEqual(column.dtype, numpy.float64)
+        self.assertEqual(column[0], 1.5)
+        self.assertTrue(numpy.isnan(column[1:]).all())
+        with self.assertRaises(ValueError):
+            numeric_column(['up'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+# Imported by test_aio_devices on Python 3.7 and later only.
+import asyncio
+import json
+import unittest
+
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+
+from pyeapi.eapilib import CommandError as EOSCommandError
+
+from .device_mocks.eos import enable, config
+from .device_mocks.nxos import show
+from pyntc.errors import CommandError, CommandListError
+
+
+NXOS_VERSION = {
+    'kickstart_ver_str': '7.0(3)I2(1)',
+    'chassis_id': 'Nexus9000 C9396PX Chassis',
+    'host_name': 'n9k1',
+    'proc_board_id': 'SAL1819S6LU',
+    'kern_uptm_days': 1,
+    'kern_uptm_hrs': 2,
+    'kern_uptm_mins': 3,
+    'kern_uptm_secs': 4,
+}
+NXOS_VLANS = {
+    'TABLE_vlanbrief': {'ROW_vlanbrief': [{'vlanshowbr-vlanid-utf': 1}, {'vlanshowbr-vlanid-utf': 10}]},
+}
+
+
+async def command_api(request):
+    body = await request.json()
+    results = []
+    config_mode = False
+    for command in body['params']['cmds']:
+        try:
+            if command == 'enable':
+                results.append({})
+            elif command == 'configure terminal':
+                config_mode = True
+                results.append({})
+            elif config_mode:
+                config([command])
+                results.append({})
+            else:
+                results.append(enable([command], encoding=body['params']['format'])[0]['result'])
+        except EOSCommandError:
+            error = {'code': 1002, 'message': "CLI command failed: '%s'" % command,
+                     'data': results + [{'errors': ['Invalid input']}]}
+            return web.json_response({'jsonrpc': '2.0', 'id': body['id'], 'error': error})
+
+    return web.json_response({'jsonrpc': '2.0', 'id': body['id'], 'result': results})
+
+
+async def ins(request):
+    responses = []
+    for rpc in await request.json():
+        command = rpc['params']['cmd']
+        if command == 'show version':
+            result = {'body': NXOS_VERSION}
+        elif command == 'show vlan':
+            result = {'body': NXOS_VLANS}
+        elif command.startswith('interface') or command == 'no shutdown':
+            result = None
+        else:
+            try:
+                output = show(command, raw_text=rpc['method'] == 'cli_ascii')
+            except Exception:
+                responses.append({'jsonrpc': '2.0', 'id': rpc['id'],
+                                  'error': {'code': -32602, 'message': 'Invalid params',
+                                            'data': {'msg': '% Invalid command\n'}}})
+                continue
+            result = {'msg': output} if rpc['method'] == 'cli_ascii' else {'body': output}
+        responses.append({'jsonrpc': '2.0', 'id': rpc['id'], 'result': result})
+
+    return web.Response(text=json.dumps(responses[0] if len(responses) == 1 else responses))
+
+
+@unittest.skipIf(web is None, 'aiohttp is not installed')
+class AsyncDeviceTestCase(unittest.TestCase):
+    device_class = None
+
+    def run_with_device(self, test):
+        async def run():
+            from pyntc.devices.aio_base import close_session
+
+            app = web.Application()
+            app.router.add_post('/command-api', command_api)
+            app.router.add_post('/ins', ins)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            try:
+                async with self.device_class('127.0.0.1', 'user', 'pass', port=port) as device:
+                    return await test(device)
+            finally:
+                await close_session()
+                await runner.cleanup()
+
+        return asyncio.run(run())
+
+
+class TestAsyncEOSDevice(AsyncDeviceTestCase):
+
+    def setUp(self):
+        from pyntc.devices import AsyncEOSDevice
+        self.device_class = AsyncEOSDevice
+
+    def test_show(self):
+        result = self.run_with_device(lambda device: device.show('show hostname'))
+        self.assertEqual(result, {'hostname': 'eos-spine1', 'fqdn': 'eos-spine1.ntc.com'})
+
+    def test_show_raw_text(self):
+        result = self.run_with_device(lambda device: device.show('show hostname', raw_text=True))
+        self.assertEqual(result, 'Hostname: spine1\nFQDN:     spine1.ntc.com\n')
+
+    def test_bad_show_list(self):
+        with self.assertRaisesRegexp(CommandListError, 'show badcommand'):
+            self.run_with_device(lambda device: device.show_list(['show clock', 'show badcommand']))
+
+    def test_bad_show(self):
+        with self.assertRaises(CommandError):
+            self.run_with_device(lambda device: device.show('show microsoft'))
+
+    def test_config_list(self):
+        self.assertIsNone(self.run_with_device(lambda device: device.config_list(['interface Eth1', 'no shutdown'])))
+
+    def test_bad_config_list(self):
+        with self.assertRaises(CommandListError) as context:
+            self.run_with_device(lambda device: device.config_list(['interface Eth1', 'apons', 'no shutdown']))
+        self.assertEqual(context.exception.command, 'apons')
+
+    def test_facts(self):
+        facts = self.run_with_device(lambda device: device.facts())
+        self.assertEqual(facts['vendor'], 'arista')
+        self.assertEqual(facts['hostname'], 'eos-spine1')
+        self.assertEqual(facts['vlans'], ['1', '10', '20'])
+        self.assertIsInstance(facts['uptime'], int)
+
+
+class TestAsyncNXOSDevice(AsyncDeviceTestCase):
+
+    def setUp(self):
+        from pyntc.devices import AsyncNXOSDevice
+        self.device_class = AsyncNXOSDevice
+
+    def test_show(self):
+        result = self.run_with_device(lambda device: device.show('show hostname'))
+        self.assertEqual(result, show('show hostname'))
+
+    def test_show_list_raw_text(self):
+        result = self.run_with_device(
+            lambda device: device.show_list(['show hostname', 'show running-config'], raw_text=True))
+        self.assertEqual(result, [show('show hostname', raw_text=True), show('show running-config', raw_text=True)])
+
+    def test_bad_show_list(self):
+        with self.assertRaises(CommandListError) as context:
+            self.run_with_device(lambda device: device.show_list(['show hostname', 'show bogus']))
+        self.assertEqual(context.exception.command, 'show bogus')
+
+    def test_config_list(self):
+        self.assertIsNone(self.run_with_device(lambda device: device.config_list(['interface Eth1', 'no shutdown'])))
+
+    def test_facts(self):
+        facts = self.run_with_device(lambda device: device.facts())
+        self.assertEqual(facts['hostname'], 'n9k1')
+        self.assertEqual(facts['uptime'], 93784)
+        self.assertEqual(facts['uptime_string'], '01:02:03:04')
+        self.assertEqual(facts['interfaces'], [])
+        self.assertEqual(facts['vlans'], ['1', '10'])
+        self.assertEqual(facts['vendor'], 'cisco')
+
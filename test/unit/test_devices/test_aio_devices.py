@@ -0,0 +1,10 @@
+import sys
+import unittest
+
+# The asyncio drivers and their tests use syntax that does not compile before Python 3.7.
+if sys.version_info >= (3, 7):
+    from .aio_device_cases import TestAsyncEOSDevice, TestAsyncNXOSDevice  # noqa: F401
+
+
+if __name__ == '__main__':
+    unittest.main()
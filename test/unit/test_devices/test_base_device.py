@@ -0,0 +1,451 @@
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+import mock
+
+from netmiko.ssh_dispatcher import FILE_TRANSFER_MAP
+
+from pyntc import hashing
+from pyntc.devices.base_device import (
+    BaseDevice,
+    FactsSource,
+    LazyFacts,
+    ResponseCache,
+    cached_response,
+    invalidates_responses,
+    invalidates_responses_on_write,
+    open_many,
+    probe_ports,
+    wait_for_reboot,
+)
+from pyntc.devices.asa_device import ASADevice
+from pyntc.devices.ios_device import IOSDevice
+from pyntc.devices.ssh_utils import SSHConnectionPool
+from pyntc.errors import TemplateNotFoundError
+
+
+class FakeDevice(object):
+
+    def __init__(self):
+        self.version_calls = 0
+        self.interface_calls = 0
+
+    def facts_from_version(self):
+        self.version_calls += 1
+        return {'os_version': '1.0', 'uptime': 100 * self.version_calls}
+
+    def facts_from_interfaces(self):
+        self.interface_calls += 1
+        return {'interfaces': ['Ethernet1']}
+
+
+SOURCES = (
+    FactsSource(['show version'], 'facts_from_version', ['os_version', 'uptime']),
+    FactsSource(['show interfaces'], 'facts_from_interfaces', ['interfaces']),
+)
+
+
+class TestLazyFacts(unittest.TestCase):
+
+    def setUp(self):
+        self.device = FakeDevice()
+        self.facts = LazyFacts(self.device, SOURCES, ttl={'uptime': 60}, static={'vendor': 'fake'})
+
+    def test_only_requested_source_is_fetched(self):
+        self.assertEqual(self.facts['os_version'], '1.0')
+        self.assertEqual(self.facts['uptime'], 100)
+        self.assertEqual(self.device.version_calls, 1)
+        self.assertEqual(self.device.interface_calls, 0)
+
+    def test_static_facts(self):
+        self.assertEqual(self.facts['vendor'], 'fake')
+        self.assertEqual(self.device.version_calls, 0)
+
+    def test_contains_does_not_fetch(self):
+        self.assertIn('interfaces', self.facts)
+        self.assertNotIn('bogus', self.facts)
+        self.assertEqual(self.device.interface_calls, 0)
+
+    def test_materialized(self):
+        expected = {'vendor': 'fake', 'os_version': '1.0', 'uptime': 100, 'interfaces': ['Ethernet1']}
+        self.assertEqual(self.facts, expected)
+        self.assertEqual(json.loads(json.dumps(self.facts.copy())), expected)
+        self.assertEqual(self.device.version_calls, 1)
+        self.assertEqual(self.device.interface_calls, 1)
+
+    def test_conversions_fetch_every_key(self):
+        expected = {'vendor': 'fake', 'os_version': '1.0', 'uptime': 100, 'interfaces': ['Ethernet1']}
+        for convert in (dict, lambda facts: facts.copy(), lambda facts: dict(**facts)):
+            facts = LazyFacts(FakeDevice(), SOURCES, static={'vendor': 'fake'})
+            self.assertEqual(convert(facts), expected)
+        self.assertEqual(sorted(LazyFacts(FakeDevice(), SOURCES).keys()), ['interfaces', 'os_version', 'uptime'])
+
+    @mock.patch('pyntc.devices.base_device.time.time')
+    def test_ttl(self, mock_time):
+        mock_time.return_value = 1000
+        self.assertEqual(self.facts['uptime'], 100)
+
+        mock_time.return_value = 1030
+        self.assertEqual(self.facts['uptime'], 100)
+        self.assertEqual(self.facts['os_version'], '1.0')
+
+        mock_time.return_value = 1061
+        self.assertEqual(self.facts['os_version'], '1.0')
+        self.assertEqual(self.device.version_calls, 1)
+        self.assertEqual(self.facts['uptime'], 200)
+        self.assertEqual(self.device.version_calls, 2)
+
+    def test_refresh_subset(self):
+        self.facts.copy()
+        self.facts.refresh(['interfaces'])
+        self.facts.copy()
+
+        self.assertEqual(self.device.version_calls, 1)
+        self.assertEqual(self.device.interface_calls, 2)
+
+    def test_user_values_survive_refresh(self):
+        self.facts['custom'] = 'value'
+        self.facts.refresh()
+        self.assertEqual(self.facts['custom'], 'value')
+
+    def test_delete(self):
+        del self.facts['uptime']
+        self.assertNotIn('uptime', self.facts)
+        self.assertEqual(self.facts, {'vendor': 'fake', 'os_version': '1.0', 'interfaces': ['Ethernet1']})
+
+        self.facts.refresh(['uptime'])
+        self.assertEqual(self.facts['uptime'], 200)
+
+
+class RebootingDevice(object):
+
+    def __init__(self, host, checks_until_up, port=None):
+        self.host = host
+        self.port = port
+        self.checks_until_up = checks_until_up
+        self.checks = 0
+
+    def _reboot_port(self):
+        return self.port
+
+    def _reboot_check(self):
+        self.checks += 1
+        if self.checks < self.checks_until_up:
+            raise ValueError('still booting')
+        return True
+
+
+class TestWaitForReboot(unittest.TestCase):
+
+    def test_probe_ports(self):
+        listener = socket.socket()
+        self.addCleanup(listener.close)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(1)
+        open_port = listener.getsockname()[1]
+
+        closed = socket.socket()
+        closed.bind(('127.0.0.1', 0))
+        closed_port = closed.getsockname()[1]
+        closed.close()
+
+        addresses = [('127.0.0.1', open_port), ('127.0.0.1', closed_port), ('127.0.0.1', None)]
+        self.assertEqual(probe_ports(addresses, timeout=1), [True, False, True])
+
+    def test_probe_ports_high_file_descriptors(self):
+        try:
+            import resource
+        except ImportError:
+            self.skipTest('resource is not available')
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < 1200:
+            if hard != resource.RLIM_INFINITY and hard < 1200:
+                self.skipTest('cannot open 1200 files')
+            resource.setrlimit(resource.RLIMIT_NOFILE, (1200, hard))
+            self.addCleanup(resource.setrlimit, resource.RLIMIT_NOFILE, (soft, hard))
+
+        listener = socket.socket()
+        self.addCleanup(listener.close)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(5)
+
+        # Push the probe sockets past FD_SETSIZE, which select() cannot watch.
+        filler = []
+        self.addCleanup(lambda: [os.close(fd) for fd in filler])
+        while not filler or filler[-1] < 1100:
+            filler.append(os.dup(listener.fileno()))
+
+        addresses = [('127.0.0.1', listener.getsockname()[1])] * 3
+        self.assertEqual(probe_ports(addresses, timeout=1), [True, True, True])
+
+    def test_wait_for_reboot(self):
+        devices = [RebootingDevice('fast', 1), RebootingDevice('slow', 3)]
+        self.assertEqual(wait_for_reboot(devices, timeout=5, initial_delay=0.01), [])
+        self.assertEqual([device.checks for device in devices], [1, 3])
+
+    def test_wait_for_reboot_skips_login_until_port_opens(self):
+        device = RebootingDevice('127.0.0.1', 1, port=1)
+        with mock.patch('pyntc.devices.base_device.probe_ports', side_effect=[[False], [False], [True]]) as probe:
+            self.assertEqual(wait_for_reboot([device], timeout=5, initial_delay=0.01), [])
+
+        self.assertEqual(probe.call_count, 3)
+        self.assertEqual(device.checks, 1)
+
+    def test_wait_for_reboot_timeout(self):
+        devices = [RebootingDevice('up', 1), RebootingDevice('down', 1000)]
+        self.assertEqual(wait_for_reboot(devices, timeout=0.2, initial_delay=0.01, max_delay=0.05), [devices[1]])
+
+
+class TestLazyOpen(unittest.TestCase):
+
+    def setUp(self):
+        connect_patcher = mock.patch.object(IOSDevice, '_connect', autospec=True)
+        self.connect = connect_patcher.start()
+        self.addCleanup(connect_patcher.stop)
+
+    def test_lazy_connects_on_first_use(self):
+        device = IOSDevice('host', 'user', 'pass', lazy=True)
+        self.assertFalse(self.connect.called)
+
+        device.native.find_prompt()
+        device.native.find_prompt()
+        self.assertEqual(self.connect.call_count, 1)
+
+    def test_lazy_close_without_use(self):
+        device = IOSDevice('host', 'user', 'pass', lazy=True)
+        device.close()
+        self.assertFalse(self.connect.called)
+
+    def test_lazy_retries_failed_open(self):
+        device = IOSDevice('host', 'user', 'pass', lazy=True)
+        self.connect.side_effect = [ValueError('refused'), mock.DEFAULT]
+        with self.assertRaises(ValueError):
+            device.native
+        self.assertIs(device.native, self.connect.return_value)
+
+    def test_closed_pooled_device_cannot_use_leased_session(self):
+        for device_class in (IOSDevice, ASADevice):
+            pool = SSHConnectionPool(max_per_host=2)
+            with mock.patch.object(device_class, '_connect', side_effect=lambda: mock.Mock()), \
+                    mock.patch.object(device_class, '_enable'), \
+                    mock.patch('pyntc.devices.%s.ssh_pool' % device_class.__module__.split('.')[-1], pool):
+                first = device_class('host', 'user', 'pass', pooled=True)
+                session = first.native
+                first.close()
+                self.assertIsNone(first._native)
+
+                second = device_class('host', 'user', 'pass', pooled=True)
+                self.assertIs(second.native, session)
+                self.assertIsNot(first.native, session)
+
+    def test_open_many(self):
+        devices = [IOSDevice('host%d' % index, 'user', 'pass', lazy=True) for index in range(5)]
+        self.assertEqual(open_many(devices, workers=3), [])
+        self.assertEqual(self.connect.call_count, 5)
+
+        for device in devices:
+            device.native.find_prompt()
+        self.assertEqual(self.connect.call_count, 5)
+
+    def test_open_many_reports_failures(self):
+        devices = [IOSDevice(host, 'user', 'pass', lazy=True) for host in ('down', 'up')]
+        error = ValueError('refused')
+
+        def connect(device):
+            if device.host == 'down':
+                raise error
+            return mock.Mock()
+
+        self.connect.side_effect = connect
+        self.assertEqual(open_many(devices), [(devices[0], error)])
+        self.assertTrue(devices[0]._open_pending)
+
+
+class TestFileCopyHashing(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.image = os.path.join(self.temp_dir, 'image.bin')
+        with open(self.image, 'wb') as f:
+            f.write(b'pyntc' * 1000)
+        self.addCleanup(hashing.file_hash_cache.clear)
+
+    def test_image_hashed_once_per_file_copy(self):
+        for device_class, device_type in ((IOSDevice, 'cisco_ios'), (ASADevice, 'cisco_asa')):
+            hashing.file_hash_cache.clear()
+            transfer_class = FILE_TRANSFER_MAP[device_type]
+            with mock.patch.object(device_class, '_connect', return_value=mock.Mock(device_type=device_type)), \
+                    mock.patch.object(device_class, '_enable'), \
+                    mock.patch.object(transfer_class, 'check_file_exists', side_effect=[False, True]), \
+                    mock.patch.object(transfer_class, 'compare_md5', return_value=True), \
+                    mock.patch.object(transfer_class, 'enable_scp'), \
+                    mock.patch.object(transfer_class, 'establish_scp_conn'), \
+                    mock.patch.object(transfer_class, 'transfer_file') as transfer_file, \
+                    mock.patch.object(transfer_class, 'close_scp_chan'), \
+                    mock.patch('pyntc.hashing.hash_file', wraps=hashing.hash_file) as hash_file:
+                device = device_class('host', 'user', 'pass')
+                device.file_copy(self.image, file_system='flash:')
+
+            self.assertEqual(transfer_file.call_count, 1)
+            self.assertEqual(hash_file.call_count, 1)
+            self.assertEqual(
+                device._file_copy_instance(self.image).source_md5, '5047b21afe15c36b8445e3a58c10988c'
+            )
+
+
+class CachingDevice(BaseDevice):
+
+    def __init__(self):
+        super(CachingDevice, self).__init__('host', 'user', 'pass')
+        self.sent = []
+
+    @cached_response
+    def show(self, command, raw_text=False):
+        self.sent.append(command)
+        return {'command': command, 'raw_text': raw_text, 'count': len(self.sent)}
+
+    @invalidates_responses_on_write
+    def show_list(self, commands, raw_text=False):
+        return [self.show(command, raw_text=raw_text) for command in commands]
+
+    @invalidates_responses
+    def config(self, command):
+        self.sent.append(command)
+        return self.show('show running-config')
+
+
+# Only the methods above are exercised; Python 2 would otherwise refuse to instantiate it.
+CachingDevice.__abstractmethods__ = frozenset()
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.device = CachingDevice()
+
+    def test_disabled_by_default(self):
+        self.device.show('show version')
+        self.device.show('show version')
+        self.assertEqual(self.device.sent, ['show version', 'show version'])
+
+    def test_cache_by_command_and_raw_text(self):
+        cache = self.device.enable_response_cache()
+        self.assertEqual(self.device.show('show version')['count'], 1)
+        self.assertEqual(self.device.show('show version')['count'], 1)
+        self.assertEqual(self.device.show('show version', raw_text=True)['count'], 2)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 2, 'size': 2})
+
+    def test_cached_response_is_a_copy(self):
+        self.device.enable_response_cache()
+        self.device.show('show version')['count'] = 99
+        self.assertEqual(self.device.show('show version')['count'], 1)
+
+    def test_ttl(self):
+        self.device.enable_response_cache(ttl=10)
+        with mock.patch('pyntc.devices.base_device.time.time', return_value=100):
+            self.device.show('show version')
+        with mock.patch('pyntc.devices.base_device.time.time', return_value=105):
+            self.device.show('show version')
+        with mock.patch('pyntc.devices.base_device.time.time', return_value=111):
+            self.device.show('show version')
+        self.assertEqual(self.device.sent, ['show version', 'show version'])
+
+    def test_lru_bound(self):
+        self.device.enable_response_cache(max_entries=2)
+        for command in ('show a', 'show b', 'show a', 'show c', 'show a', 'show b'):
+            self.device.show(command)
+        self.assertEqual(self.device.sent, ['show a', 'show b', 'show c', 'show b'])
+
+    def test_config_invalidates_and_bypasses_cache(self):
+        cache = self.device.enable_response_cache()
+        self.device.show('show running-config')
+        self.assertEqual(self.device.config('hostname new')['count'], 3)
+        self.assertIs(self.device.response_cache, cache)
+        self.assertEqual(len(cache), 0)
+
+    def test_bypass_is_per_thread(self):
+        cache = self.device.enable_response_cache()
+        self.device.show('show version')
+        with cache.bypass():
+            self.device.show('show version')
+            self.assertEqual(len(self.device.sent), 2)
+
+            other_thread = threading.Thread(target=self.device.show, args=('show version',))
+            other_thread.start()
+            other_thread.join()
+            self.assertEqual(len(self.device.sent), 2)
+
+            with cache.bypass():
+                self.assertTrue(cache.bypassed)
+            self.assertTrue(cache.bypassed)
+
+        self.assertFalse(cache.bypassed)
+        self.assertIs(self.device.response_cache, cache)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'size': 0})
+
+    def test_unhashable_arguments_are_not_cached(self):
+        cache = self.device.enable_response_cache()
+        self.device.show('show version', raw_text=['unhashable'])
+        self.device.show('show version', raw_text=['unhashable'])
+        self.assertEqual(len(self.device.sent), 2)
+        self.assertEqual(len(cache), 0)
+
+    def test_uncacheable_commands_invalidate(self):
+        cache = self.device.enable_response_cache()
+        self.device.show('dir flash:')
+        self.device.show('show running-config | redirect flash:backup')
+        self.assertEqual(len(cache), 0)
+
+        self.device.show_list(['show version', 'dir flash:'])
+        self.assertEqual(len(cache), 2)
+        self.device.show_list(['show version', 'copy running-config startup-config'])
+        self.assertEqual(len(cache), 0)
+
+    def test_response_fetched_during_clear_is_not_stored(self):
+        cache = ResponseCache()
+
+        def fetch():
+            cache.clear()
+            return 'stale'
+
+        self.assertEqual(cache.get('show version', fetch), 'stale')
+        self.assertEqual(len(cache), 0)
+
+
+class TestStructuredShow(unittest.TestCase):
+
+    IP_INT_BR = (
+        'Interface                  IP-Address      OK? Method Status                Protocol\n'
+        'FastEthernet0/0            10.1.100.45     YES NVRAM  up                    up\n'
+    )
+
+    def setUp(self):
+        for device_class in (IOSDevice, ASADevice):
+            for name in ('_connect', '_enable'):
+                patcher = mock.patch.object(device_class, name)
+                patcher.start()
+                self.addCleanup(patcher.stop)
+
+    def test_show_structured(self):
+        device = IOSDevice('host', 'user', 'pass', lazy=True)
+        with mock.patch.object(IOSDevice, '_send_command', return_value=self.IP_INT_BR) as send:
+            self.assertEqual(device.show('sh ip int br', structured=True),
+                             [{'intf': 'FastEthernet0/0', 'ipaddr': '10.1.100.45', 'status': 'up', 'proto': 'up'}])
+            self.assertEqual(device.show('sh ip int br'), self.IP_INT_BR)
+        self.assertEqual(send.call_count, 2)
+
+    def test_show_structured_without_template(self):
+        device = ASADevice('host', 'user', 'pass', lazy=True)
+        with mock.patch.object(ASADevice, '_send_command') as send:
+            with self.assertRaises(TemplateNotFoundError):
+                device.show('show ip int br', structured=True)
+        send.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
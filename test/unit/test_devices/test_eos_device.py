@@ -2,13 +2,18 @@ import unittest
 import mock
 import os
 
+from pyeapi.eapilib import CommandError as EOSCommandError
+
 from .device_mocks.eos import enable, config
 from pyntc.devices import EOSDevice
 from pyntc.devices.base_device import RollbackError, RebootTimerError
-from pyntc.devices.system_features.file_copy.eos_file_copy import EOSFileCopy
-from pyntc.devices.system_features.vlans.eos_vlans import EOSVlans
+from pyntc.devices.system_features.file_copy import eos_file_copy
 from pyntc.errors import CommandError, CommandListError
 
+CURRNENT_DIR = os.path.dirname(os.path.realpath(__file__))
+LOCAL_FILE = os.path.join(CURRNENT_DIR, '..', 'test_system_features', 'test_file_copy', 'fixtures', 'test_file')
+LOCAL_MD5 = '386b5f9c494abc1fff70de21f6c42136'
+
 
 class TestEOSDevice(unittest.TestCase):
 
@@ -94,26 +99,75 @@ class TestEOSDevice(unittest.TestCase):
         self.assertTrue(result)
         self.device.native.enable.assert_called_with(['copy running-config startup-config'], encoding='json')
 
-    @mock.patch.object(EOSFileCopy, 'remote_file_exists', autospec=True)
-    def test_file_copy_remote_exists(self, mock_fc):
-        mock_fc.return_value = True
-        result = self.device.file_copy_remote_exists('source_file')
+    def _mock_flash(self, files):
+        """Answer ``dir`` and ``verify /md5`` from ``files``, a dict of remote names to MD5s."""
+        def enable_text(commands, encoding='json'):
+            if encoding != 'text':
+                return enable(commands, encoding)
+
+            responses = []
+            for index, command in enumerate(commands):
+                if command == 'dir':
+                    listing = ''.join('       -rwx   5000  Apr 27  2015  %s\n' % name for name in files)
+                    output = 'Directory of flash:/\n\n%s\n2143281152 bytes total (1717510144 bytes free)\n' % listing
+                else:
+                    name = command.split()[-1]
+                    if name not in files:
+                        raise EOSCommandError(1000, 'could not open flash:/%s' % name, commands=commands[:index + 1])
+                    output = 'verify /md5 (flash:/%s) = %s\n' % (name, files[name])
+                responses.append({'command': command, 'result': {'output': output}, 'encoding': 'text'})
+            return responses
+
+        self.device.native.enable.side_effect = enable_text
+
+    def _mock_ssh(self, files):
+        """Patch the cached SSH client and SCP; every ``put`` lands an intact copy in ``files``."""
+        clients_patcher = mock.patch.object(eos_file_copy.ssh_clients, 'get')
+        ssh_get = clients_patcher.start()
+        self.addCleanup(clients_patcher.stop)
+
+        scp_patcher = mock.patch.object(eos_file_copy, 'SCPClient')
+        scp = scp_patcher.start()
+        self.addCleanup(scp_patcher.stop)
+        scp.return_value.put.side_effect = lambda local, remote: files.update({remote: LOCAL_MD5})
+        return ssh_get, scp
+
+    def test_file_copy_remote_exists(self):
+        self._mock_flash({'test_file': LOCAL_MD5})
+        ssh_get, _ = self._mock_ssh({})
+        result = self.device.file_copy_remote_exists(LOCAL_FILE)
 
         self.assertTrue(result)
+        self.device.native.enable.assert_called_with(['dir', 'verify /md5 test_file'], encoding='text')
+        ssh_get.assert_not_called()
+
+    def test_file_copy_remote_exists_failure(self):
+        self._mock_flash({'test_file': 'f' * 32})
+        self.assertFalse(self.device.file_copy_remote_exists(LOCAL_FILE))
+
+        self._mock_flash({})
+        self.assertFalse(self.device.file_copy_remote_exists(LOCAL_FILE))
 
-    @mock.patch.object(EOSFileCopy, 'remote_file_exists', autospec=True)
-    def test_file_copy_remote_exists_failure(self, mock_fc):
-        mock_fc.return_value = False
-        result = self.device.file_copy_remote_exists('source_file')
+    def test_file_copy(self):
+        files = {}
+        self._mock_flash(files)
+        ssh_get, scp = self._mock_ssh(files)
+        self.device.file_copy(LOCAL_FILE)
 
-        self.assertFalse(result)
+        ssh_get.assert_called_once_with(self.device, port=22)
+        scp.assert_called_once_with(ssh_get.return_value.get_transport.return_value, socket_timeout=30.0)
+        scp.return_value.put.assert_called_once_with(LOCAL_FILE, 'test_file')
+        self.assertEqual(files, {'test_file': LOCAL_MD5})
 
-    @mock.patch('pyntc.devices.eos_device.EOSFileCopy', autospec=True)
-    def test_file_copy(self, mock_fc):
-        instance = mock_fc.return_value
-        self.device.file_copy('source_file')
+    def test_file_copy_list(self):
+        files = {'a.swi': LOCAL_MD5}
+        self._mock_flash(files)
+        ssh_get, scp = self._mock_ssh(files)
+        sent = self.device.file_copy_list([(LOCAL_FILE, 'a.swi'), u'' + LOCAL_FILE])
 
-        instance.send.assert_called_with()
+        self.assertEqual(sent, [LOCAL_FILE])
+        ssh_get.assert_called_once_with(self.device, port=22)
+        scp.return_value.put.assert_called_once_with(LOCAL_FILE, 'test_file')
 
     def test_reboot(self):
         self.device.reboot(confirm=True)
@@ -157,9 +211,7 @@ class TestEOSDevice(unittest.TestCase):
         self.device.checkpoint('good_checkpoint')
         self.device.native.enable.assert_called_with(['copy running-config good_checkpoint'], encoding='json')
 
-    @mock.patch.object(EOSVlans, 'get_list', autospec=True)
-    def test_facts(self, mock_vlan_list):
-        mock_vlan_list.return_value = ['1', '2', '10']
+    def test_facts(self):
         facts = self.device.facts
         self.assertIsInstance(facts['uptime'], int)
         self.assertIsInstance(facts['uptime_string'], str)
@@ -185,15 +237,29 @@ class TestEOSDevice(unittest.TestCase):
             'fqdn': 'eos-spine1.ntc.com',
             'serial_number': '',
             'model': 'vEOS',
-            'vlans': ['1', '2', '10']
+            'vlans': ['1', '10', '20']
         }
         self.assertEqual(facts, expected)
+        self.device.native.enable.assert_called_once_with(
+            ['show version', 'show hostname', 'show interfaces status', 'show vlan'], encoding='json')
 
         self.device.native.enable.reset_mock()
         facts = self.device.facts
         self.assertEqual(facts, expected)
         self.device.native.enable.assert_not_called()
 
+    def test_facts_lazy(self):
+        self.assertEqual(self.device.facts['vendor'], 'arista')
+        self.device.native.enable.assert_not_called()
+
+        self.assertEqual(self.device.facts['hostname'], 'eos-spine1')
+        self.device.refresh_facts(['uptime'])
+        self.assertEqual(self.device.facts['hostname'], 'eos-spine1')
+        self.assertEqual(self.device.native.enable.call_count, 1)
+
+        self.assertIsInstance(self.device.facts['uptime'], int)
+        self.assertEqual(self.device.native.enable.call_count, 2)
+
     def test_running_config(self):
         expected = self.device.show('show running-config', raw_text=True)
         self.assertEqual(self.device.running_config, expected)
@@ -0,0 +1,93 @@
+import unittest
+import mock
+import os
+import tempfile
+
+import requests
+
+from pyntc.devices.f5_device import F5Device
+from pyntc.devices.system_features.file_copy.base_file_copy import FileTransferError
+
+
+class TestF5Upload(unittest.TestCase):
+
+    def setUp(self):
+        image = tempfile.NamedTemporaryFile(suffix='.iso')
+        self.addCleanup(image.close)
+        image.write(b'x' * 10)
+        image.flush()
+        self.image = image.name
+
+        self.device = F5Device.__new__(F5Device)
+        self.device.hostname = 'host'
+        self.device.username = 'user'
+        self.device.password = 'pass'
+        self.device._upload_offsets = {}
+
+        time_patcher = mock.patch('pyntc.devices.f5_device.time.sleep')
+        time_patcher.start()
+        self.addCleanup(time_patcher.stop)
+
+        session_patcher = mock.patch('pyntc.devices.f5_device.requests.Session')
+        self.session = session_patcher.start().return_value
+        self.session.__enter__.return_value = self.session
+        self.addCleanup(session_patcher.stop)
+
+    def ranges(self):
+        return sorted(call[1]['headers']['Content-Range'] for call in self.session.post.call_args_list)
+
+    def test_upload_image(self):
+        self.device._upload_image(self.image, chunk_size=4, max_workers=2)
+
+        self.assertEqual(self.ranges(), ['0-3/10', '4-7/10', '8-9/10'])
+        self.session.post.assert_called_with(
+            'https://host/mgmt/cm/autodeploy/software-image-uploads/' + os.path.basename(self.image),
+            data=mock.ANY, headers=mock.ANY, verify=False)
+
+    def test_upload_image_retries_chunk(self):
+        self.session.post.side_effect = [requests.ConnectionError(), mock.MagicMock(), mock.MagicMock()]
+        self.device._upload_image(self.image, chunk_size=5, max_workers=1)
+
+        self.assertEqual(self.ranges(), ['0-4/10', '0-4/10', '5-9/10'])
+
+    def test_upload_image_resumes(self):
+        def post(uri, data, headers, verify):
+            if headers['Content-Range'].startswith('4-'):
+                raise requests.ConnectionError()
+            return mock.MagicMock()
+
+        self.session.post.side_effect = post
+        with self.assertRaises(FileTransferError):
+            self.device._upload_image(self.image, chunk_size=4, max_workers=1, retries=1)
+        self.assertEqual(list(self.device._upload_offsets.values()), [4])
+
+        self.session.post.reset_mock()
+        self.session.post.side_effect = None
+        self.device._upload_image(self.image, chunk_size=4, max_workers=1)
+
+        self.assertEqual(self.ranges(), ['4-7/10', '8-9/10'])
+        self.assertEqual(self.device._upload_offsets, {})
+
+
+class TestF5Lazy(unittest.TestCase):
+
+    @mock.patch('pyntc.devices.f5_device.bigsuds.BIGIP')
+    @mock.patch('pyntc.devices.f5_device.ManagementRoot')
+    def test_lazy_opens_each_session_on_first_use(self, mock_rest, mock_soap):
+        device = F5Device('host', 'user', 'pass', lazy=True)
+        self.assertFalse(mock_rest.called)
+        self.assertFalse(mock_soap.called)
+
+        device.api_handler.tm.sys
+        self.assertEqual(mock_rest.call_count, 1)
+        self.assertFalse(mock_soap.called)
+
+        device.open()
+        device.soap_handler
+        self.assertEqual(mock_rest.call_count, 1)
+        self.assertEqual(mock_soap.call_count, 1)
+        self.assertEqual(device.devices, mock_soap.return_value.Management.Device.get_list.return_value)
+
+
+if __name__ == '__main__':
+    unittest.main()
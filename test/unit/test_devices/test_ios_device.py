@@ -85,7 +85,7 @@ class TestIOSDevice(unittest.TestCase):
         self.assertTrue(result)
         self.device.native.send_command.assert_any_call('copy running-config startup-config')
 
-    @mock.patch('pyntc.devices.ios_device.FileTransfer', autospec=True)
+    @mock.patch('pyntc.devices.ios_device.file_transfer', autospec=True)
     def test_file_copy_remote_exists(self, mock_ft):
         mock_ft_instance = mock_ft.return_value
         mock_ft_instance.check_file_exists.return_value = True
@@ -95,7 +95,7 @@ class TestIOSDevice(unittest.TestCase):
 
         self.assertTrue(result)
 
-    @mock.patch('pyntc.devices.ios_device.FileTransfer', autospec=True)
+    @mock.patch('pyntc.devices.ios_device.file_transfer', autospec=True)
     def test_file_copy_remote_exists_bad_md5(self, mock_ft):
         mock_ft_instance = mock_ft.return_value
         mock_ft_instance.check_file_exists.return_value = True
@@ -105,7 +105,7 @@ class TestIOSDevice(unittest.TestCase):
 
         self.assertFalse(result)
 
-    @mock.patch('pyntc.devices.ios_device.FileTransfer', autospec=True)
+    @mock.patch('pyntc.devices.ios_device.file_transfer', autospec=True)
     def test_file_copy_remote_exists_not(self, mock_ft):
         mock_ft_instance = mock_ft.return_value
         mock_ft_instance.check_file_exists.return_value = False
@@ -115,29 +115,29 @@ class TestIOSDevice(unittest.TestCase):
 
         self.assertFalse(result)
 
-    @mock.patch('pyntc.devices.ios_device.FileTransfer', autospec=True)
+    @mock.patch('pyntc.devices.ios_device.file_transfer', autospec=True)
     def test_file_copy(self, mock_ft):
         mock_ft_instance = mock_ft.return_value
 
         self.device.file_copy('path/to/source_file')
 
-        mock_ft.assert_called_with(self.device.native, 'path/to/source_file', 'source_file', file_system='flash:')
+        mock_ft.assert_called_with(self.device.native, 'path/to/source_file', 'source_file', 'flash:')
         mock_ft_instance.enable_scp.assert_any_call()
         mock_ft_instance.establish_scp_conn.assert_any_call()
         mock_ft_instance.transfer_file.assert_any_call()
 
-    @mock.patch('pyntc.devices.ios_device.FileTransfer', autospec=True)
+    @mock.patch('pyntc.devices.ios_device.file_transfer', autospec=True)
     def test_file_copy_different_dest(self, mock_ft):
         mock_ft_instance = mock_ft.return_value
 
         self.device.file_copy('source_file', 'dest_file')
 
-        mock_ft.assert_called_with(self.device.native, 'source_file', 'dest_file', file_system='flash:')
+        mock_ft.assert_called_with(self.device.native, 'source_file', 'dest_file', 'flash:')
         mock_ft_instance.enable_scp.assert_any_call()
         mock_ft_instance.establish_scp_conn.assert_any_call()
         mock_ft_instance.transfer_file.assert_any_call()
 
-    @mock.patch('pyntc.devices.ios_device.FileTransfer', autospec=True)
+    @mock.patch('pyntc.devices.ios_device.file_transfer', autospec=True)
     def test_file_copy_fail(self, mock_ft):
         mock_ft_instance = mock_ft.return_value
         mock_ft_instance.transfer_file.side_effect = Exception
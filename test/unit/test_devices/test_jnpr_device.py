@@ -8,6 +8,7 @@ from pyntc.devices.jnpr_device import JunosDevice
 from pyntc.errors import CommandError, CommandListError
 
 from jnpr.junos.exception import ConfigLoadError
+from lxml import etree
 
 
 class MockType:
@@ -52,23 +53,38 @@ class TestJnprDevice(unittest.TestCase):
 
         self.assertIsNone(result)
 
-        for command in commands:
-            self.device.cu.load.assert_any_call(command, format='set')
-
+        self.device.cu.load.assert_called_once_with('\n'.join(commands), format='set')
         self.device.cu.commit.assert_called_with()
 
-    def test_bad_config_list(self):
-        commands = ['set interface lo0', 'apons']
+    def test_config_list_xml(self):
+        commands = [
+            '<configuration><system><host-name>r1</host-name></system></configuration>',
+            '<snmp><community><name>jason</name></community></snmp>',
+        ]
+        self.device.config_list(commands, format='xml')
 
-        def load_side_effect(*args, **kwargs):
-            if args[0] == commands[1]:
-                raise ConfigLoadError(args[0])
+        self.device.cu.load.assert_called_once_with(
+            '<configuration><system><host-name>r1</host-name></system>'
+            '<snmp><community><name>jason</name></community></snmp></configuration>',
+            format='xml')
 
-        self.device.cu.load.side_effect = load_side_effect
+    def test_config_list_confirm(self):
+        self.device.config_list(['set interfaces lo0'], confirm=5)
+        self.device.cu.commit.assert_called_with(confirm=5)
 
-        with self.assertRaisesRegexp(CommandListError, commands[1]):
+    def test_bad_config_list(self):
+        commands = ['set interface lo0', 'apons', 'set snmp community jason']
+        rsp = etree.fromstring(
+            '<rpc-error><error-severity>error</error-severity><error-info><bad-element>apons</bad-element>'
+            '</error-info><error-message>syntax error</error-message></rpc-error>')
+        self.device.cu.load.side_effect = ConfigLoadError(rsp)
+
+        with self.assertRaisesRegexp(CommandListError, commands[1]) as context:
             self.device.config_list(commands)
 
+        self.assertEqual(context.exception.command, commands[1])
+        self.device.cu.commit.assert_not_called()
+
     def test_show(self):
         command = 'show configuration snmp'
 
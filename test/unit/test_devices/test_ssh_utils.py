@@ -0,0 +1,224 @@
+import itertools
+import unittest
+import mock
+
+from pyntc.devices.ssh_utils import (
+    COPY_ANSWERS,
+    SSHConnectionPool,
+    iter_command_lines,
+    prompt_pattern,
+    send_command,
+    send_command_blocks,
+    send_config_blocks,
+    send_lines,
+)
+from pyntc.errors import CommandError, CommandListError, ConnectionPoolExhaustedError
+
+
+class FakeChannel(object):
+    """Answers every written line with its echo, an optional response and the prompt, in small chunks."""
+
+    base_prompt = 'router'
+
+    def __init__(self, responses=None, silent=()):
+        self.responses = responses or {}
+        self.silent = silent
+        self.written = []
+        self.output = ''
+
+    def write_channel(self, data):
+        for line in data.splitlines():
+            self.written.append(line)
+            if line in self.silent:
+                self.output += line + '\r\n'
+                break
+            self.output += line + '\r\n' + self.responses.get(line, '') + 'router(config)#'
+
+    def read_channel(self):
+        data, self.output = self.output[:7], self.output[7:]
+        return data
+
+
+class InteractiveChannel(FakeChannel):
+    """Answers each written line with its echo and the scripted output, which ends in a prompt or a question."""
+
+    def write_channel(self, data):
+        for line in data.split('\n')[:-1]:
+            self.written.append(line)
+            self.output += line + '\r\n' + self.responses[line]
+
+
+class TestSSHUtils(unittest.TestCase):
+
+    def test_prompt_pattern(self):
+        prompt = prompt_pattern('router')
+        self.assertTrue(prompt.search('router#'))
+        self.assertTrue(prompt.search('output\nrouter(config-if)#'))
+        self.assertFalse(prompt.search('hostname router'))
+
+    def test_send_lines(self):
+        channel = FakeChannel({'show clock': '12:00\r\n'})
+        responses = send_lines(channel, ['interface Gi1', 'show clock'], prompt_pattern('router'))
+        self.assertEqual(responses, ['', '12:00\n'])
+
+    def test_send_command(self):
+        channel = FakeChannel({'show clock': '12:00\r\n13:00\r\n'})
+        self.assertEqual(send_command(channel, 'show clock', prompt_pattern('router')), '12:00\n13:00\n')
+
+    def test_send_command_answers(self):
+        channel = InteractiveChannel({
+            'copy running-config startup-config': 'Destination filename [startup-config]? ',
+            '': 'Building configuration...\r\n[OK]\r\nrouter#',
+        })
+        response = send_command(
+            channel, 'copy running-config startup-config', prompt_pattern('router'), answers=COPY_ANSWERS, stop=None
+        )
+        self.assertEqual(response, 'Destination filename [startup-config]? \nBuilding configuration...\n[OK]\n')
+        self.assertEqual(channel.written, ['copy running-config startup-config', ''])
+
+    def test_send_command_stops_at_question(self):
+        channel = InteractiveChannel({'reload': 'Proceed with reload? [confirm]'})
+        self.assertEqual(send_command(channel, 'reload', prompt_pattern('router')), 'Proceed with reload? [confirm]')
+
+    def test_iter_command_lines(self):
+        channel = FakeChannel({'show ip int br': ''.join('Gi%d  unassigned\r\n' % index for index in range(20))})
+        lines = iter_command_lines(channel, 'show ip int br', prompt_pattern('router'))
+        self.assertEqual(next(lines), 'Gi0  unassigned')
+        self.assertTrue(channel.output)
+        self.assertEqual(list(lines), ['Gi%d  unassigned' % index for index in range(1, 20)])
+        self.assertEqual(channel.output, '')
+
+    @mock.patch('pyntc.devices.ssh_utils.time.sleep')
+    def test_iter_command_lines_timeout(self, mock_sleep):
+        channel = FakeChannel(silent=['show tech'])
+        with mock.patch('pyntc.devices.ssh_utils.time.time', side_effect=itertools.count(step=10)):
+            with self.assertRaises(CommandError):
+                list(iter_command_lines(channel, 'show tech', prompt_pattern('router')))
+
+    @mock.patch('pyntc.devices.ssh_utils.time.sleep')
+    def test_send_command_timeout(self, mock_sleep):
+        channel = InteractiveChannel({'reload': 'Proceed with reload? [confirm]'})
+        with mock.patch('pyntc.devices.ssh_utils.time.time', side_effect=itertools.count(0, 5)):
+            with self.assertRaises(CommandError):
+                send_command(channel, 'reload', prompt_pattern('router'), stop=None, timeout=30)
+
+    def test_send_config_blocks(self):
+        channel = FakeChannel()
+        commands = ['interface Gi%d' % i for i in range(5)]
+        send_config_blocks(channel, commands, block_size=2)
+        self.assertEqual(channel.written, commands)
+
+    def test_send_config_blocks_error(self):
+        channel = FakeChannel({'bogus': "% Invalid input detected at '^' marker.\r\n"})
+        commands = ['interface Gi1', 'description a', 'bogus', 'exit', 'interface Gi2']
+
+        with self.assertRaises(CommandListError) as context:
+            send_config_blocks(channel, commands, block_size=2)
+
+        self.assertEqual(context.exception.command, 'bogus')
+        self.assertEqual(context.exception.commands, commands[:3])
+        self.assertEqual(channel.written, commands[:4])
+
+    def test_send_command_blocks(self):
+        channel = FakeChannel({'show clock': '12:00\r\n', 'show hostname': 'router\r\n'})
+        commands = ['show clock', 'show hostname', 'show clock']
+        self.assertEqual(send_command_blocks(channel, commands, block_size=2), ['12:00\n', 'router\n', '12:00\n'])
+
+    def test_send_command_blocks_error(self):
+        channel = FakeChannel({'show bogus': 'Error: invalid command\r\n'})
+        with self.assertRaises(CommandListError) as context:
+            send_command_blocks(channel, ['show clock', 'show bogus', 'show clock'], block_size=10)
+        self.assertEqual(context.exception.command, 'show bogus')
+        self.assertEqual(context.exception.commands, ['show clock', 'show bogus'])
+
+    @mock.patch('pyntc.devices.ssh_utils.time.sleep')
+    def test_send_config_blocks_timeout(self, mock_sleep):
+        channel = FakeChannel(silent=['crypto key generate rsa'])
+        commands = ['interface Gi1', 'exit', 'crypto key generate rsa']
+
+        with mock.patch('pyntc.devices.ssh_utils.time.time', side_effect=itertools.count(0, 5)):
+            with self.assertRaises(CommandListError) as context:
+                send_config_blocks(channel, commands, block_size=2, timeout=30)
+
+        self.assertEqual(context.exception.command, 'crypto key generate rsa')
+        self.assertEqual(context.exception.commands, commands)
+
+
+class FakeConnection(object):
+
+    def __init__(self):
+        self.alive = True
+        self.disconnected = False
+
+    def find_prompt(self):
+        if not self.alive:
+            raise OSError('Socket is closed')
+        return 'router#'
+
+    def disconnect(self):
+        self.disconnected = True
+
+
+class TestSSHConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = SSHConnectionPool(max_per_host=2, idle_timeout=60, acquire_timeout=0.05)
+        self.key = ('host', 22, 'user', 'cisco_ios_ssh')
+
+    def test_reuse(self):
+        first = self.pool.acquire(self.key, FakeConnection)
+        self.pool.release(self.key, first)
+
+        self.assertIs(self.pool.acquire(self.key, FakeConnection), first)
+        self.assertEqual((self.pool.hits, self.pool.misses), (1, 1))
+
+    def test_unhealthy_connection_is_replaced(self):
+        first = self.pool.acquire(self.key, FakeConnection)
+        self.pool.release(self.key, first)
+        first.alive = False
+
+        second = self.pool.acquire(self.key, FakeConnection)
+        self.assertIsNot(second, first)
+        self.assertTrue(first.disconnected)
+
+    def test_max_per_host(self):
+        self.pool.acquire(self.key, FakeConnection)
+        borrowed = self.pool.acquire(('host', 22, 'other', 'cisco_ios_ssh'), FakeConnection)
+
+        with self.assertRaises(ConnectionPoolExhaustedError):
+            self.pool.acquire(self.key, FakeConnection)
+
+        self.pool.discard(('host', 22, 'other', 'cisco_ios_ssh'), borrowed)
+        self.pool.acquire(self.key, FakeConnection)
+
+    def test_idle_connection_of_other_key_makes_room(self):
+        self.pool.acquire(self.key, FakeConnection)
+        other_key = ('host', 22, 'other', 'cisco_ios_ssh')
+        other = self.pool.acquire(other_key, FakeConnection)
+        self.pool.release(other_key, other)
+
+        self.pool.acquire(self.key, FakeConnection)
+        self.assertTrue(other.disconnected)
+
+    @mock.patch('pyntc.devices.ssh_utils.time.time')
+    def test_idle_eviction(self, mock_time):
+        mock_time.return_value = 1000
+        first = self.pool.acquire(self.key, FakeConnection)
+        self.pool.release(self.key, first)
+
+        mock_time.return_value = 1061
+        second = self.pool.acquire(self.key, FakeConnection)
+        self.assertIsNot(second, first)
+        self.assertTrue(first.disconnected)
+
+    def test_clear(self):
+        first = self.pool.acquire(self.key, FakeConnection)
+        self.pool.release(self.key, first)
+        self.pool.clear()
+
+        self.assertTrue(first.disconnected)
+        self.assertIsNot(self.pool.acquire(self.key, FakeConnection), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+import mock
+import os
+import tempfile
+import threading
+import time
+
+from pyntc import fleet
+from pyntc.devices import supported_devices
+from pyntc.errors import DeviceTimeoutError, DeviceNameNotFoundError, UnsupportedDeviceError
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+
+
+class FakeDevice(object):
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+    release = threading.Event()
+
+    def __init__(self, host, username=None, password=None, delay=0, **kwargs):
+        self.host = host
+        self.delay = float(delay)
+        self.closed = False
+
+    def hostname(self):
+        with FakeDevice.lock:
+            FakeDevice.active += 1
+            FakeDevice.peak = max(FakeDevice.peak, FakeDevice.active)
+        if self.host.startswith('hung'):
+            FakeDevice.release.wait(5)
+        time.sleep(self.delay)
+        with FakeDevice.lock:
+            FakeDevice.active -= 1
+        if self.host == 'broken':
+            raise ValueError('broken device')
+        return self.host
+
+    def close(self):
+        self.closed = True
+
+
+@mock.patch.dict(supported_devices, {'fake': FakeDevice})
+class TestFleet(unittest.TestCase):
+
+    def setUp(self):
+        FakeDevice.active = 0
+        FakeDevice.peak = 0
+        FakeDevice.release = threading.Event()
+
+    def test_run(self):
+        inventory = [{'device_type': 'fake', 'host': 'host%d' % i} for i in range(5)]
+        results = list(fleet.run(inventory, lambda d: d.hostname(), workers=2))
+
+        self.assertEqual(sorted(r.result for r in results), ['host%d' % i for i in range(5)])
+        self.assertTrue(all(r.error is None for r in results))
+        self.assertTrue(all(r.device_type == 'fake' for r in results))
+
+    def test_run_streams_errors(self):
+        inventory = [
+            {'device_type': 'fake', 'host': 'broken'},
+            {'device_type': 'bad_type', 'host': 'host1'},
+            {'device_type': 'fake', 'host': 'host2', 'name': 'second'},
+        ]
+        results = dict((r.name, r) for r in fleet.run(inventory, lambda d: d.hostname()))
+
+        self.assertIsInstance(results['broken'].error, ValueError)
+        self.assertIsInstance(results['host1'].error, UnsupportedDeviceError)
+        self.assertEqual(results['second'].result, 'host2')
+
+    def test_workers_bound(self):
+        inventory = [{'device_type': 'fake', 'host': 'host%d' % i, 'delay': 0.05} for i in range(8)]
+        list(fleet.run(inventory, lambda d: d.hostname(), workers=3))
+        self.assertEqual(FakeDevice.peak, 3)
+
+    def test_vendor_limits(self):
+        inventory = [{'device_type': 'fake', 'host': 'host%d' % i, 'delay': 0.05} for i in range(8)]
+        list(fleet.run(inventory, lambda d: d.hostname(), workers=8, vendor_limits={'fake': 2}))
+        self.assertEqual(FakeDevice.peak, 2)
+
+    def test_timeout(self):
+        inventory = [
+            {'device_type': 'fake', 'host': 'slow', 'delay': 1},
+            {'device_type': 'fake', 'host': 'fast'},
+        ]
+        results = dict((r.name, r) for r in fleet.run(inventory, lambda d: d.hostname(), timeout=0.2))
+
+        self.assertIsInstance(results['slow'].error, DeviceTimeoutError)
+        self.assertEqual(results['fast'].result, 'fast')
+
+    def test_timed_out_workers_keep_their_slots(self):
+        for limits in ({'workers': 2}, {'workers': 8, 'vendor_limits': {'fake': 2}}):
+            FakeDevice.peak = 0
+            FakeDevice.release = threading.Event()
+            inventory = [{'device_type': 'fake', 'host': 'hung%d' % i} for i in range(2)]
+            inventory += [{'device_type': 'fake', 'host': 'host%d' % i, 'delay': 0.05} for i in range(3)]
+            timer = threading.Timer(0.5, FakeDevice.release.set)
+            timer.start()
+            self.addCleanup(timer.cancel)
+
+            results = dict((r.name, r) for r in fleet.run(inventory, lambda d: d.hostname(), timeout=0.2, **limits))
+
+            self.assertIsInstance(results['hung0'].error, DeviceTimeoutError)
+            self.assertIsInstance(results['hung1'].error, DeviceTimeoutError)
+            self.assertEqual(sorted(results[name].result for name in ('host0', 'host1', 'host2')),
+                             ['host0', 'host1', 'host2'])
+            self.assertEqual(FakeDevice.peak, 2)
+
+    def test_run_by_name(self):
+        conf = tempfile.NamedTemporaryFile(mode='w', suffix='.conf')
+        self.addCleanup(conf.close)
+        conf.write('[fake:fake1]\nusername: user\n\n[fake:fake2]\nhost: 10.0.0.2\n')
+        conf.flush()
+
+        results = fleet.run(['fake1', 'fake2'], lambda d: d.hostname(), filename=conf.name)
+        self.assertEqual(sorted(r.result for r in results), ['10.0.0.2', 'fake1'])
+
+    def test_run_name_not_found(self):
+        config_filepath = os.path.join(FIXTURES_DIR, '.ntc.conf.sample')
+        results = list(fleet.run(['missing'], lambda d: d.hostname(), filename=config_filepath))
+
+        self.assertEqual(results[0].name, 'missing')
+        self.assertIsInstance(results[0].error, DeviceNameNotFoundError)
+
+
+if __name__ == '__main__':
+    unittest.main()
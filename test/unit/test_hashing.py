@@ -0,0 +1,139 @@
+import hashlib
+import unittest
+import mock
+import os
+import shutil
+import tempfile
+
+from pyntc import hashing
+from pyntc.hashing import FileHashCache, HASH_INDEX_ENV_VAR, get_file_hash, hash_file
+
+
+class TestFileHashCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+        self.local_file = os.path.join(self.temp_dir, 'image.bin')
+        with open(self.local_file, 'wb') as f:
+            f.write(b'pyntc' * 1000)
+
+        self.index_file = os.path.join(self.temp_dir, 'index.json')
+        self.cache = FileHashCache(index_file=self.index_file)
+
+    def test_digests(self):
+        self.assertEqual(self.cache.get(self.local_file), '5047b21afe15c36b8445e3a58c10988c')
+        self.assertEqual(
+            self.cache.get(self.local_file, 'sha256'),
+            'd63dd906da1b0ccc1a66570399cc16ef40c6c8347e087482545036a8d09bbc59',
+        )
+
+    def test_single_read_for_all_digests(self):
+        with mock.patch('pyntc.hashing.hash_file', wraps=hashing.hash_file) as hash_file:
+            self.cache.get(self.local_file)
+            self.cache.get(self.local_file, 'sha256')
+            self.cache.get(self.local_file)
+
+        self.assertEqual(hash_file.call_count, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+    def test_missing_file(self):
+        self.assertIsNone(self.cache.get(os.path.join(self.temp_dir, 'missing')))
+
+    def test_file_change_invalidates(self):
+        first = self.cache.get(self.local_file)
+        with open(self.local_file, 'ab') as f:
+            f.write(b'more')
+
+        self.assertNotEqual(self.cache.get(self.local_file), first)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_persisted_index(self):
+        digest = self.cache.get(self.local_file)
+
+        other_process_cache = FileHashCache(index_file=self.index_file)
+        with mock.patch('pyntc.hashing.hash_file') as hash_file:
+            self.assertEqual(other_process_cache.get(self.local_file), digest)
+        hash_file.assert_not_called()
+
+    def test_max_entries(self):
+        cache = FileHashCache(index_file=self.index_file, max_entries=1)
+        other_file = os.path.join(self.temp_dir, 'other.bin')
+        shutil.copy(self.local_file, other_file)
+
+        cache.get(self.local_file)
+        cache.get(other_file)
+        cache.get(self.local_file)
+        self.assertEqual(cache.misses, 3)
+
+    def test_index_disabled_by_env(self):
+        with mock.patch.dict(os.environ, {HASH_INDEX_ENV_VAR: ''}):
+            cache = FileHashCache()
+            cache.get(self.local_file)
+        self.assertFalse(os.path.exists(self.index_file))
+
+    def test_index_disabled_by_default(self):
+        with mock.patch.dict(os.environ, clear=True), mock.patch('pyntc.hashing.FileHashCache._write_index') as write:
+            cache = FileHashCache()
+            cache.get(self.local_file)
+        write.assert_not_called()
+
+    def test_get_file_hash(self):
+        with mock.patch.dict(os.environ, {HASH_INDEX_ENV_VAR: self.index_file}):
+            self.assertEqual(get_file_hash(self.local_file), '5047b21afe15c36b8445e3a58c10988c')
+
+    def test_prefetch(self):
+        with mock.patch('pyntc.hashing.hash_file', wraps=hashing.hash_file) as hash_file:
+            pending = self.cache.prefetch(self.local_file)
+            self.assertEqual(self.cache.get(self.local_file), '5047b21afe15c36b8445e3a58c10988c')
+            self.assertEqual(pending.result()['md5'], '5047b21afe15c36b8445e3a58c10988c')
+            self.assertIsNone(self.cache.prefetch(self.local_file))
+
+        self.assertEqual(hash_file.call_count, 1)
+        self.assertIsNone(self.cache.prefetch(os.path.join(self.temp_dir, 'missing')))
+
+
+class TestHashFile(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def write(self, data):
+        path = os.path.join(self.temp_dir, 'image.bin')
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_digests_across_blocks(self):
+        data = os.urandom(3 * 4096 + 17)
+        path = self.write(data)
+        expected = {'md5': hashlib.md5(data).hexdigest(), 'sha256': hashlib.sha256(data).hexdigest()}
+        for blocksize in (4096, 2 ** 20):
+            self.assertEqual(hash_file(path, blocksize=blocksize), expected)
+        self.assertEqual(hash_file(path, algorithms=('sha1',)), {'sha1': hashlib.sha1(data).hexdigest()})
+
+    def test_memory_mapped(self):
+        data = os.urandom(2 * 4096 + 5)
+        path = self.write(data)
+        mappings = []
+        real_map_file = hashing._map_file
+
+        def map_file(f):
+            mappings.append(real_map_file(f))
+            return mappings[-1]
+
+        with mock.patch('pyntc.hashing._map_file', side_effect=map_file):
+            digests = hash_file(path, algorithms=('md5',), blocksize=4096)
+
+        self.assertEqual(len(mappings), 1)
+        self.assertIsNotNone(mappings[0])
+        self.assertEqual(digests, {'md5': hashlib.md5(data).hexdigest()})
+
+    def test_empty_file(self):
+        self.assertEqual(hash_file(self.write(b''), algorithms=('md5',)), {'md5': hashlib.md5(b'').hexdigest()})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
 import os
+import subprocess
+import sys
 import mock
 
 from pyntc import ntc_device, ntc_device_by_name
@@ -10,6 +12,8 @@ from pyntc.devices import EOSDevice, NXOSDevice, IOSDevice
 
 BAD_DEVICE_TYPE = '238nzsvkn3981'
 FIXTURES_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+REPO_DIR = os.path.join(os.path.dirname(__file__), '..', '..')
+VENDOR_SDKS = ['netmiko', 'paramiko', 'pyeapi', 'pynxos', 'jnpr', 'f5', 'bigsuds', 'textfsm', 'requests']
 
 
 class TestInfra(unittest.TestCase):
@@ -42,3 +46,33 @@ class TestInfra(unittest.TestCase):
     def test_no_conf_file(self):
         with self.assertRaises(ConfFileNotFoundError):
             ntc_device_by_name('test_bad_device', filename='/bad/file/path')
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def _imported_modules(self, code):
+        script = code + '; import sys; print(",".join(sys.modules))'
+        output = subprocess.check_output([sys.executable, '-c', script], cwd=REPO_DIR)
+        return set(output.decode().strip().split(','))
+
+    def test_import_does_not_load_vendor_sdks(self):
+        # Some SDKs register namespace packages that site imports at startup.
+        modules = self._imported_modules('import pyntc') - self._imported_modules('pass')
+        self.assertEqual([sdk for sdk in VENDOR_SDKS if sdk in modules], [])
+
+    def test_import_does_not_load_yaml(self):
+        self.assertNotIn('yaml', self._imported_modules('import pyntc'))
+
+    def test_supported_devices_loads_single_driver(self):
+        modules = self._imported_modules(
+            'from pyntc.devices import supported_devices; supported_devices["arista_eos_eapi"]'
+        )
+        self.assertIn('pyntc.devices.eos_device', modules)
+        self.assertNotIn('pyntc.devices.ios_device', modules)
+        self.assertNotIn('netmiko', modules)
+
+    def test_device_class_attribute(self):
+        from pyntc import devices
+        self.assertIs(devices.EOSDevice, supported_devices['arista_eos_eapi'])
+        with self.assertRaises(AttributeError):
+            devices.NotADevice
@@ -0,0 +1,96 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+
+from pyntc import ntc_device_by_name
+from pyntc.devices import EOSDevice, NXOSDevice
+from pyntc.errors import ConfFileNotFoundError, DeviceNameNotFoundError, InventoryFormatError
+from pyntc.inventory import Inventory, get_inventory
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
+
+DEVICES = {
+    'spine1': {'device_type': 'arista_eos_eapi', 'host': '10.0.0.1', 'username': 'admin', 'password': 'admin'},
+    'leaf1': {'device_type': 'cisco_nxos_nxapi', 'username': 'admin', 'password': 'admin'},
+}
+
+
+class TestInventory(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+
+    def write(self, filename, text):
+        path = os.path.join(self.tempdir, filename)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_ini(self):
+        inventory = Inventory(os.path.join(FIXTURES_DIR, '.ntc.conf.sample'))
+        self.assertEqual(inventory.names(), ['test_eos', 'test_ios', 'test_nxos'])
+        self.assertEqual(
+            inventory.get('test_eos'),
+            ('arista_eos_eapi', {'host': 'test_eos', 'username': 'user', 'password': 'arista', 'transport': 'http'}),
+        )
+        with self.assertRaises(DeviceNameNotFoundError):
+            inventory.get('test_bad_device')
+
+    def test_json(self):
+        inventory = Inventory(self.write('inventory.json', json.dumps(DEVICES)))
+        self.assertEqual(len(inventory), 2)
+        self.assertEqual(inventory.get('leaf1'), ('cisco_nxos_nxapi', {'host': 'leaf1', 'username': 'admin',
+                                                                       'password': 'admin'}))
+
+    def test_yaml(self):
+        path = self.write('inventory.yml', 'spine1:\n  device_type: arista_eos_eapi\n  host: 10.0.0.1\n')
+        self.assertEqual(Inventory(path).get('spine1'), ('arista_eos_eapi', {'host': '10.0.0.1'}))
+
+    def test_missing_device_type(self):
+        inventory = Inventory(self.write('inventory.json', json.dumps({'spine1': {'host': '10.0.0.1'}})))
+        with self.assertRaises(InventoryFormatError):
+            inventory.names()
+
+    def test_missing_or_empty_file(self):
+        with self.assertRaises(ConfFileNotFoundError):
+            Inventory('/bad/file/path').get('spine1')
+        with self.assertRaises(ConfFileNotFoundError):
+            Inventory(self.write('empty.conf', '')).get('spine1')
+
+    def test_parses_once_until_file_changes(self):
+        path = self.write('inventory.json', json.dumps(DEVICES))
+        inventory = Inventory(path)
+        with mock.patch.object(Inventory, '_parse', wraps=inventory._parse) as parse:
+            inventory.get('spine1')
+            inventory.get('leaf1')
+            self.assertEqual(parse.call_count, 1)
+
+            self.write('inventory.json', json.dumps({'spine2': DEVICES['spine1']}))
+            os.utime(path, (0, 0))
+            self.assertEqual(inventory.names(), ['spine2'])
+            self.assertEqual(parse.call_count, 2)
+
+    def test_devices(self):
+        inventory = Inventory(self.write('inventory.json', json.dumps(DEVICES)))
+        spine, leaf = inventory.devices(['spine1', 'leaf1'], timeout=5)
+        self.assertIsInstance(spine, EOSDevice)
+        self.assertIsInstance(leaf, NXOSDevice)
+        self.assertEqual((spine.host, leaf.host), ('10.0.0.1', 'leaf1'))
+        self.assertEqual(spine.timeout, 5)
+
+        with self.assertRaises(DeviceNameNotFoundError):
+            inventory.devices(['spine1', 'spine9'])
+
+    def test_ntc_device_by_name_uses_shared_inventory(self):
+        path = self.write('inventory.json', json.dumps(DEVICES))
+        self.assertIs(get_inventory(path), get_inventory(path))
+        self.assertIsInstance(ntc_device_by_name('spine1', filename=path), EOSDevice)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,13 @@
 import unittest
 import mock
 import os
+import threading
 
-from pyntc.devices.system_features.file_copy.eos_file_copy import EOSFileCopy
+from pyntc.devices.system_features.file_copy import eos_file_copy
+from pyntc.devices.system_features.file_copy.base_file_copy import FileTransferError
+from pyntc.devices.system_features.file_copy.eos_file_copy import EOSFileCopy, SSHClientCache
+from pyntc.errors import CommandListError
+from pyntc.hashing import HASH_INDEX_ENV_VAR
 
 CURRNENT_DIR = os.path.dirname(os.path.realpath(__file__))
 
@@ -11,6 +16,10 @@ class TestEOSFileCopy(unittest.TestCase):
 
     @mock.patch('pyntc.devices.eos_device.EOSDevice', autospec=True)
     def setUp(self, mock_eos_device):
+        env_patcher = mock.patch.dict(os.environ, {HASH_INDEX_ENV_VAR: ''})
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+
         self.mock_device = mock_eos_device.return_value
         self.eos_fc = EOSFileCopy(self.mock_device, os.path.join(CURRNENT_DIR, 'fixtures', 'test_file'))
 
@@ -58,6 +67,156 @@ class TestEOSFileCopy(unittest.TestCase):
 #        mock_scp.put.assert_called_with(self.eos_fc.local, self.eos_fc.remote)
 
 
+DIR_OUT = 'Directory of flash:/\n\n       -rwx   211532893           Apr 27  2015  EOS.swi\n\n2143281152 bytes total (1717510144 bytes free)\n'
+LOCAL_MD5 = '386b5f9c494abc1fff70de21f6c42136'
+
+
+class TestEOSFileCopyBatch(unittest.TestCase):
+
+    def setUp(self):
+        env_patcher = mock.patch.dict(os.environ, {HASH_INDEX_ENV_VAR: ''})
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+
+        self.device = mock.Mock(host='host', username='user', password='pass')
+        self.local = os.path.join(CURRNENT_DIR, 'fixtures', 'test_file')
+        self.file_copies = [EOSFileCopy(self.device, self.local, name) for name in ('a.swi', 'b.swi')]
+
+        self.ssh = mock.Mock()
+        clients_patcher = mock.patch.object(eos_file_copy.ssh_clients, 'get', return_value=self.ssh)
+        clients_patcher.start()
+        self.addCleanup(clients_patcher.stop)
+
+    def test_check_remote_single_request(self):
+        self.device.show_list.return_value = [DIR_OUT, 'verify /md5 (flash:/a.swi) = ' + LOCAL_MD5, 'verify = ' + 'f' * 32]
+        md5s, bytes_free = EOSFileCopy.check_remote(self.device, self.file_copies)
+
+        self.assertEqual(md5s, [LOCAL_MD5, 'f' * 32])
+        self.assertEqual(bytes_free, 1717510144)
+        self.device.show_list.assert_called_once_with(['dir', 'verify /md5 a.swi', 'verify /md5 b.swi'], raw_text=True)
+
+    def test_check_remote_missing_file(self):
+        self.device.show_list.side_effect = [CommandListError([], 'verify /md5 a.swi', 'not found'),
+                                             ['verify = ' + LOCAL_MD5]]
+        self.device.show.return_value = DIR_OUT.replace('EOS.swi', 'b.swi')
+
+        md5s, _ = EOSFileCopy.check_remote(self.device, self.file_copies)
+        self.assertEqual(md5s, [None, LOCAL_MD5])
+        self.device.show_list.assert_called_with(['verify /md5 b.swi'], raw_text=True)
+
+    @mock.patch.object(eos_file_copy, 'SCPClient')
+    def test_send_many_over_one_session(self, mock_scp):
+        self.file_copies.append(EOSFileCopy(self.device, self.local, 'c.swi'))
+        self.device.show_list.side_effect = [
+            CommandListError([], 'verify /md5 c.swi', 'not found'),
+            ['verify = ' + LOCAL_MD5, 'verify = ' + 'f' * 32],
+            [DIR_OUT, 'verify = ' + LOCAL_MD5, 'verify = ' + LOCAL_MD5],
+        ]
+        self.device.show.return_value = DIR_OUT.replace('EOS.swi', 'a.swi\n       -rwx   2115  Apr 27  2015  b.swi')
+
+        sent = EOSFileCopy.send_many(self.device, self.file_copies)
+
+        self.assertEqual([fc.remote for fc in sent], ['b.swi', 'c.swi'])
+        mock_scp.assert_called_once_with(self.ssh.get_transport.return_value, socket_timeout=30.0)
+        self.assertEqual(mock_scp.return_value.put.call_args_list,
+                         [mock.call(self.local, 'b.swi'), mock.call(self.local, 'c.swi')])
+
+    @mock.patch.object(eos_file_copy, 'SCPClient')
+    def test_send_many_validates(self, mock_scp):
+        self.device.show_list.side_effect = [
+            [DIR_OUT, 'verify = ' + 'f' * 32, 'verify = ' + LOCAL_MD5],
+            [DIR_OUT, 'verify = ' + 'f' * 32],
+        ]
+        with self.assertRaises(FileTransferError):
+            EOSFileCopy.send_many(self.device, self.file_copies)
+
+    @mock.patch.object(eos_file_copy, 'sftp_resume_put')
+    @mock.patch.object(eos_file_copy, 'open_sftp')
+    @mock.patch.object(eos_file_copy, 'SCPClient')
+    def test_transfer_file_resume(self, mock_scp, mock_open_sftp, mock_put):
+        fc = self.file_copies[0]
+        fc.enough_remote_space = mock.Mock(return_value=True)
+
+        self.assertTrue(fc.transfer_file(resume=True))
+        mock_put.assert_called_with(mock_open_sftp.return_value, self.local, 'a.swi')
+        mock_scp.assert_not_called()
+
+        mock_open_sftp.return_value = None
+        self.assertTrue(fc.transfer_file(resume=True))
+        mock_scp.return_value.put.assert_called_with(self.local, 'a.swi')
+
+    @mock.patch.object(eos_file_copy, 'SCPClient')
+    def test_failed_transfer_discards_client(self, mock_scp):
+        mock_scp.return_value.put.side_effect = IOError
+        with mock.patch.object(eos_file_copy.ssh_clients, 'discard') as discard:
+            with self.assertRaises(FileTransferError):
+                eos_file_copy._transfer(self.device, self.file_copies)
+        discard.assert_called_with(self.device, port=22)
+
+
+class TestSSHClientCache(unittest.TestCase):
+
+    @mock.patch.object(eos_file_copy.paramiko, 'SSHClient')
+    def test_reuse_and_reconnect(self, mock_ssh):
+        cache = SSHClientCache()
+        device = mock.Mock(host='host', username='user', password='pass')
+
+        client = cache.get(device)
+        self.assertIs(cache.get(device), client)
+        self.assertEqual(client.connect.call_count, 1)
+
+        client.get_transport.return_value.is_active.return_value = False
+        cache.get(device)
+        self.assertEqual(mock_ssh.call_count, 2)
+
+        cache.clear('host')
+        client.close.assert_called_with()
+
+    def _connect_concurrently(self, devices):
+        """Call ``get`` for every device in its own thread, with connects that wait for each other."""
+        cache = SSHClientCache()
+        connecting = []
+        all_connecting = threading.Event()
+        serialized = []
+        created = []
+
+        def connect(**kwargs):
+            connecting.append(kwargs['hostname'])
+            if len(connecting) == len(devices):
+                all_connecting.set()
+            if not all_connecting.wait(2):
+                serialized.append(kwargs['hostname'])
+
+        def ssh_client():
+            created.append(mock.Mock(**{'connect.side_effect': connect}))
+            return created[-1]
+
+        results = []
+        with mock.patch.object(eos_file_copy.paramiko, 'SSHClient', side_effect=ssh_client):
+            threads = [threading.Thread(target=lambda d=d: results.append(cache.get(d))) for d in devices]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(serialized, [])
+        return cache, created, results
+
+    def test_concurrent_connects(self):
+        devices = [mock.Mock(host=host, username='user', password='pass') for host in ('host1', 'host2')]
+        cache, created, results = self._connect_concurrently(devices)
+        self.assertEqual(len(set(map(id, results))), 2)
+        for client in created:
+            client.close.assert_not_called()
+
+    def test_connect_race_closes_loser(self):
+        device = mock.Mock(host='host', username='user', password='pass')
+        cache, created, results = self._connect_concurrently([device, device])
+        self.assertIs(results[0], results[1])
+        self.assertIs(cache.get(device), results[0])
+        loser = created[1] if created[0] is results[0] else created[0]
+        loser.close.assert_called_with()
+        results[0].close.assert_not_called()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,111 @@
+import os
+import shutil
+import tempfile
+import unittest
+import mock
+
+import paramiko
+
+from pyntc.devices.system_features.file_copy import resumable
+from pyntc.devices.system_features.file_copy.base_file_copy import FileTransferError
+from pyntc.devices.system_features.file_copy.resumable import open_sftp, resume_offset, sftp_resume_put
+
+
+class LocalFile(object):
+    """An SFTP file backed by a local file."""
+
+    def __init__(self, path, mode):
+        self.f = open(path, mode)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.f.close()
+
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+
+    def set_pipelined(self, pipelined=True):
+        pass
+
+
+class LocalSFTP(object):
+    """An SFTP client serving a local directory."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def stat(self, path):
+        # paramiko raises IOError for a missing file; on Python 2 os.stat raises OSError.
+        try:
+            return os.stat(os.path.join(self.root, path))
+        except OSError as e:
+            raise IOError(e.errno, e.strerror)
+
+    def open(self, path, mode):
+        return LocalFile(os.path.join(self.root, path), mode)
+
+
+class TestResumable(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.data = os.urandom(300 * 1024)
+        self.local = os.path.join(self.temp_dir, 'image.bin')
+        with open(self.local, 'wb') as f:
+            f.write(self.data)
+
+        self.remote_dir = os.path.join(self.temp_dir, 'flash')
+        os.mkdir(self.remote_dir)
+        self.sftp = LocalSFTP(self.remote_dir)
+
+    def write_remote(self, data):
+        with open(os.path.join(self.remote_dir, 'image.bin'), 'wb') as f:
+            f.write(data)
+
+    def read_remote(self):
+        with open(os.path.join(self.remote_dir, 'image.bin'), 'rb') as f:
+            return f.read()
+
+    def test_resume_sends_only_the_tail(self):
+        self.write_remote(self.data[:200 * 1024])
+        self.assertEqual(resume_offset(self.sftp, self.local, 'image.bin'), 200 * 1024)
+        self.assertEqual(sftp_resume_put(self.sftp, self.local, 'image.bin', block_size=4096), 100 * 1024)
+        self.assertEqual(self.read_remote(), self.data)
+
+    def test_missing_remote_file(self):
+        self.assertEqual(sftp_resume_put(self.sftp, self.local, 'image.bin'), len(self.data))
+        self.assertEqual(self.read_remote(), self.data)
+
+    def test_mismatching_partial_file_starts_over(self):
+        self.write_remote(self.data[:100 * 1024] + b'x' * 1024)
+        self.assertEqual(sftp_resume_put(self.sftp, self.local, 'image.bin'), len(self.data))
+        self.assertEqual(self.read_remote(), self.data)
+
+    def test_other_file_of_same_size_starts_over(self):
+        self.write_remote(self.data[::-1])
+        self.assertEqual(resume_offset(self.sftp, self.local, 'image.bin'), 0)
+        sftp_resume_put(self.sftp, self.local, 'image.bin')
+        self.assertEqual(self.read_remote(), self.data)
+
+    @mock.patch.object(paramiko.SFTPClient, 'from_transport', side_effect=paramiko.SSHException('subsystem'))
+    def test_open_sftp_unsupported(self, mock_from_transport):
+        self.assertIsNone(open_sftp(mock.Mock()))
+
+    @mock.patch.object(resumable, 'open_sftp', return_value=None)
+    @mock.patch.object(paramiko, 'SSHClient')
+    def test_resume_upload_without_sftp(self, mock_ssh, mock_open_sftp):
+        self.assertIsNone(resumable.resume_upload('host', 'user', 'pass', self.local, 'image.bin'))
+        mock_ssh.return_value.close.assert_called_with()
+
+    @mock.patch.object(paramiko, 'SSHClient')
+    def test_resume_upload_connect_failure(self, mock_ssh):
+        mock_ssh.return_value.connect.side_effect = paramiko.SSHException('refused')
+        with self.assertRaises(FileTransferError):
+            resumable.resume_upload('host', 'user', 'pass', self.local, 'image.bin')
+
+
+if __name__ == '__main__':
+    unittest.main()
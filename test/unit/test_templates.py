@@ -0,0 +1,196 @@
+import unittest
+import mock
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from pyntc import templates
+from pyntc.errors import TemplateNotFoundError
+from pyntc.templates import (
+    ParsePool,
+    TemplateIndex,
+    clear_template_cache,
+    find_template,
+    get_structured_data,
+    iter_structured_data,
+    parse_many,
+    template_cache_info,
+)
+
+
+IP_INT_BR_TEMPLATE = 'cisco_ios_show_ip_int_brief.template'
+IP_INT_BR_OUTPUT = (
+    'Interface                  IP-Address      OK? Method Status                Protocol\n'
+    'FastEthernet0/0            10.1.100.45     YES NVRAM  up                    up\n'
+    'FastEthernet0/1            unassigned      YES NVRAM  up                    down\n'
+)
+
+
+class TestTemplateCache(unittest.TestCase):
+
+    def setUp(self):
+        clear_template_cache()
+
+    def test_get_structured_data(self):
+        result = get_structured_data(IP_INT_BR_TEMPLATE, IP_INT_BR_OUTPUT)
+        expected = [
+            {'intf': 'FastEthernet0/0', 'ipaddr': '10.1.100.45', 'status': 'up', 'proto': 'up'},
+            {'intf': 'FastEthernet0/1', 'ipaddr': 'unassigned', 'status': 'up', 'proto': 'down'},
+        ]
+        self.assertEqual(result, expected)
+
+    def test_get_structured_data_columnar(self):
+        result = get_structured_data(IP_INT_BR_TEMPLATE, IP_INT_BR_OUTPUT, columnar=True)
+        self.assertEqual(result, {
+            'intf': ['FastEthernet0/0', 'FastEthernet0/1'],
+            'ipaddr': ['10.1.100.45', 'unassigned'],
+            'status': ['up', 'up'],
+            'proto': ['up', 'down'],
+        })
+        self.assertEqual(get_structured_data(IP_INT_BR_TEMPLATE, '', columnar=True),
+                         {'intf': [], 'ipaddr': [], 'status': [], 'proto': []})
+
+    def test_iter_structured_data(self):
+        rows = iter_structured_data(IP_INT_BR_TEMPLATE, iter(IP_INT_BR_OUTPUT.splitlines(True)))
+        self.assertEqual(next(rows)['intf'], 'FastEthernet0/0')
+        self.assertEqual(list(rows), get_structured_data(IP_INT_BR_TEMPLATE, IP_INT_BR_OUTPUT)[1:])
+
+    def test_iter_structured_data_matches_get_structured_data(self):
+        mocks_dir = os.path.join(os.path.dirname(__file__), 'test_devices', 'device_mocks', 'ios', 'send_command')
+        for template_name, mock_file in (('cisco_ios_show_version.template', 'show_version'),
+                                         (IP_INT_BR_TEMPLATE, 'show_ip_int_br')):
+            with open(os.path.join(mocks_dir, mock_file)) as f:
+                output = f.read()
+            expected = get_structured_data(template_name, output)
+            self.assertTrue(expected)
+            self.assertEqual(list(iter_structured_data(template_name, output.splitlines(True))), expected)
+            with mock.patch.object(templates, '_STREAMING_MEMBERS', ('_NotATextFSMMember',)):
+                self.assertEqual(list(iter_structured_data(template_name, output.splitlines())), expected)
+
+    def test_iter_structured_data_fillup(self):
+        template_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, template_dir)
+        with open(os.path.join(template_dir, 'fillup.template'), 'w') as f:
+            f.write('Value Name (\\S+)\nValue Fillup Group (\\d+)\n\n'
+                    'Start\n  ^name ${Name} -> Record\n  ^group ${Group}\n')
+        output = 'name a\nname b\ngroup 1\n'
+
+        with mock.patch.dict(os.environ, {templates.TEMPLATE_PATH_ENV_VAR: template_dir}):
+            rows = list(iter_structured_data('fillup.template', output.splitlines()))
+            self.assertEqual(rows, get_structured_data('fillup.template', output))
+
+        self.assertEqual([row['group'] for row in rows], ['1', '1', '1'])
+
+    def test_cache_hits(self):
+        first = get_structured_data(IP_INT_BR_TEMPLATE, IP_INT_BR_OUTPUT)
+        second = get_structured_data(IP_INT_BR_TEMPLATE, IP_INT_BR_OUTPUT)
+
+        self.assertEqual(first, second)
+        self.assertEqual(template_cache_info(), {'hits': 1, 'misses': 1, 'size': 1})
+
+    def test_fsm_state_reset_between_parses(self):
+        get_structured_data(IP_INT_BR_TEMPLATE, IP_INT_BR_OUTPUT)
+        result = get_structured_data(IP_INT_BR_TEMPLATE, IP_INT_BR_OUTPUT.splitlines()[1])
+        self.assertEqual(len(result), 1)
+
+    def test_template_dir_change(self):
+        template_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, template_dir)
+        shutil.copy(templates.get_template(IP_INT_BR_TEMPLATE), template_dir)
+
+        get_structured_data(IP_INT_BR_TEMPLATE, IP_INT_BR_OUTPUT)
+        with mock.patch.dict(os.environ, {templates.TEMPLATE_PATH_ENV_VAR: template_dir}):
+            get_structured_data(IP_INT_BR_TEMPLATE, IP_INT_BR_OUTPUT)
+
+        self.assertEqual(template_cache_info(), {'hits': 0, 'misses': 2, 'size': 2})
+
+    def test_template_file_change(self):
+        template_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, template_dir)
+        template_file = os.path.join(template_dir, IP_INT_BR_TEMPLATE)
+        shutil.copy(templates.get_template(IP_INT_BR_TEMPLATE), template_file)
+
+        with mock.patch.dict(os.environ, {templates.TEMPLATE_PATH_ENV_VAR: template_dir}):
+            get_structured_data(IP_INT_BR_TEMPLATE, IP_INT_BR_OUTPUT)
+            with open(template_file, 'a') as f:
+                f.write('\n')
+            get_structured_data(IP_INT_BR_TEMPLATE, IP_INT_BR_OUTPUT)
+
+        self.assertEqual(template_cache_info()['misses'], 2)
+
+
+class TestTemplateIndex(unittest.TestCase):
+
+    def test_find_template(self):
+        for command in ('show ip int br', 'sh ip interface brief', ' SHOW  IP INT BRIEF '):
+            self.assertEqual(find_template('cisco_ios', command), IP_INT_BR_TEMPLATE)
+        self.assertEqual(find_template('cisco_asa', 'sh ver'), 'cisco_asa_show_version.template')
+
+    def test_find_template_not_found(self):
+        for platform, command in (('cisco_ios', 'show ip'), ('cisco_ios', 'show ipv6 int br'),
+                                  ('cisco_asa', 'show vlan'), ('juniper_junos', 'show version')):
+            with self.assertRaises(TemplateNotFoundError):
+                find_template(platform, command)
+
+    def test_ambiguous_abbreviation(self):
+        template_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, template_dir)
+        for name in ('cisco_ios_show_interfaces.template', 'cisco_ios_show_inventory.template', 'README.md'):
+            open(os.path.join(template_dir, name), 'w').close()
+
+        index = TemplateIndex(template_dir)
+        self.assertEqual(index.platforms(), ['cisco_ios'])
+        self.assertEqual(index.lookup('cisco_ios', 'show inv'), 'cisco_ios_show_inventory.template')
+        with self.assertRaises(TemplateNotFoundError):
+            index.lookup('cisco_ios', 'show in')
+
+    def test_index_built_on_first_lookup(self):
+        script = 'from pyntc import templates; print(len(templates._template_indexes))'
+        repo_dir = os.path.join(os.path.dirname(__file__), '..', '..')
+        self.assertEqual(subprocess.check_output([sys.executable, '-c', script], cwd=repo_dir).strip(), b'0')
+
+    def test_lookups_are_remembered(self):
+        index = TemplateIndex(templates.get_template_dir())
+        index.lookup('cisco_ios', 'show ver')
+        with mock.patch.object(TemplateIndex, '_resolve') as resolve:
+            index.lookup('cisco_ios', 'show  ver')
+        resolve.assert_not_called()
+
+
+class TestParsePool(unittest.TestCase):
+
+    def setUp(self):
+        lines = IP_INT_BR_OUTPUT.splitlines(True)
+        self.jobs = [(IP_INT_BR_TEMPLATE, ''.join(lines[:1 + index % 3])) for index in range(10)]
+        self.expected = [get_structured_data(template_name, rawtxt) for template_name, rawtxt in self.jobs]
+
+    def test_imap(self):
+        with ParsePool(processes=2, chunksize=3) as pool:
+            self.assertEqual(list(pool.imap(iter(self.jobs))), self.expected)
+
+    def test_imap_unordered(self):
+        with ParsePool(processes=2, chunksize=3) as pool:
+            results = list(pool.imap_unordered(self.jobs))
+        self.assertEqual(sorted(index for index, _ in results), list(range(10)))
+        for index, result in results:
+            self.assertEqual(result, self.expected[index])
+
+    def test_parse_many_raises_job_error(self):
+        with self.assertRaises(EnvironmentError):
+            parse_many(self.jobs + [('missing.template', '')], processes=2)
+
+    def test_default_processes(self):
+        with ParsePool() as pool:
+            self.assertGreaterEqual(pool.processes, 1)
+            self.assertEqual(list(pool.imap(self.jobs[:2])), self.expected[:2])
+
+    def test_worker_warms_templates(self):
+        clear_template_cache()
+        templates._init_parse_worker(None, [IP_INT_BR_TEMPLATE])
+        self.assertEqual(template_cache_info(), {'hits': 0, 'misses': 1, 'size': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()